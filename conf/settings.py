@@ -137,4 +137,60 @@ load_dotenv()
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
 SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 SPOTIFY_REDIRECT_URI = 'http://127.0.0.1:8888/callback'
-SPOTIFY_SCOPE = 'playlist-modify-public playlist-modify-private'
\ No newline at end of file
+SPOTIFY_SCOPE = 'playlist-modify-public playlist-modify-private'
+# Spotify HTTPクライアント（コネクションプール・既定タイムアウト秒）
+SPOTIFY_HTTP_POOL_SIZE = int(os.getenv("SPOTIFY_HTTP_POOL_SIZE", 10))
+SPOTIFY_HTTP_TIMEOUT = float(os.getenv("SPOTIFY_HTTP_TIMEOUT", 10))
+# Spotify API 並行リクエスト数（トップトラック取得など）
+SPOTIFY_MAX_WORKERS = int(os.getenv("SPOTIFY_MAX_WORKERS", 8))
+# トップトラックキャッシュの有効期間（秒）と、期限切れ後も返しつつ裏で更新する期間（秒）
+SPOTIFY_TOP_TRACKS_TTL = int(os.getenv("SPOTIFY_TOP_TRACKS_TTL", 60 * 60 * 24))
+SPOTIFY_TOP_TRACKS_STALE_TTL = int(os.getenv("SPOTIFY_TOP_TRACKS_STALE_TTL", 60 * 60 * 24 * 7))
+# Spotify API のクライアント側レート制限（件/秒・バースト）と 429/5xx 時の最大リトライ回数
+SPOTIFY_RATE_LIMIT_PER_SECOND = float(os.getenv("SPOTIFY_RATE_LIMIT_PER_SECOND", 10))
+SPOTIFY_RATE_LIMIT_BURST = int(os.getenv("SPOTIFY_RATE_LIMIT_BURST", 20))
+SPOTIFY_MAX_RETRIES = int(os.getenv("SPOTIFY_MAX_RETRIES", 3))
+
+# バックグラウンドジョブ（Spotify一括処理など）のワーカースレッド数
+# ジョブはプロセス内でしか動かないので、再起動時はワーカー起動前に
+# python manage.py fail_interrupted_jobs で中断されたジョブを失敗扱いにする
+BACKGROUND_JOB_WORKERS = int(os.getenv("BACKGROUND_JOB_WORKERS", 2))
+# True にするとジョブを登録時に同期実行する（テスト用）
+BACKGROUND_JOBS_EAGER = False
+
+# Spotify APIの接続先（ローカルのフェイクサーバーで負荷試験する場合に変更）
+# 例: python manage.py fake_spotify --port 8900 を起動して
+#     SPOTIFY_API_BASE_URL=http://127.0.0.1:8900/v1 SPOTIFY_ACCOUNTS_BASE_URL=http://127.0.0.1:8900
+SPOTIFY_API_BASE_URL = os.getenv("SPOTIFY_API_BASE_URL", "https://api.spotify.com/v1")
+SPOTIFY_ACCOUNTS_BASE_URL = os.getenv("SPOTIFY_ACCOUNTS_BASE_URL", "https://accounts.spotify.com")
+
+# True にすると WSGI 起動時に pykakasi の辞書を読み込んでおく（初回リクエストの遅延対策）
+FURIGANA_WARMUP = os.getenv("FURIGANA_WARMUP", "") == "1"
+
+# キャッシュ（既定はプロセス内メモリ）
+# 複数プロセスで動かす場合は、シグナルによる無効化が全プロセスに届くよう
+# FileBasedCache / DatabaseCache などの共有バックエンドに変更すること
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+# レンダリング済みタイムテーブルのキャッシュ先と有効期間（秒）
+TIMETABLE_CACHE_ALIAS = 'default'
+TIMETABLE_CACHE_TTL = int(os.getenv("TIMETABLE_CACHE_TTL", 60 * 60))
+
+# データベースのプロファイル（DATABASE_PROFILE=production で本番向けの SQLite 設定にする）
+# - 接続ごとに WAL・synchronous・cache_size・mmap_size・busy_timeout を設定
+#   （festival/utils/db_utils.py の PRODUCTION_SQLITE_PRAGMAS。SQLITE_PRAGMAS で個別に上書きできる）
+# - 接続を使い回す（CONN_MAX_AGE 秒。スレッドごとに1接続）
+# - トランザクションは BEGIN IMMEDIATE で始め、書き込み同士の競合はロック待ちにする
+#   （途中で読み取りロックから書き込みロックへ昇格できずに即エラーになるのを防ぐ）
+# 効果の確認: python manage.py bench_sqlite_concurrency
+DATABASE_PROFILE = os.getenv("DATABASE_PROFILE", "development")
+SQLITE_PRAGMAS = {}
+if DATABASE_PROFILE == "production":
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': int(os.getenv("DATABASE_CONN_MAX_AGE", 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    })
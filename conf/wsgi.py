@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'conf.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.FURIGANA_WARMUP:
+    from festival.utils.text_utils import warm_up_furigana
+
+    warm_up_furigana()
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Artist, Event, Performance, EventDay, Stage
+from .models import Artist, Event, Performance, EventDay, Stage, BackgroundJob
 
 # Register your models here.
 @admin.register(Artist)
@@ -38,4 +38,9 @@ class StageAdmin(admin.ModelAdmin):
     list_display = ('name', 'event', 'order', 'color_code')
     list_filter = ('event',)
     ordering = ('event', 'order')
-    fields = ('event', 'name', 'order', 'color_code')
\ No newline at end of file
+    fields = ('event', 'name', 'order', 'color_code')
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'status', 'done', 'total', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
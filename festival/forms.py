@@ -44,7 +44,7 @@ class ArtistSchedulePasteForm(forms.Form):
     raw_text = forms.CharField(
         label='出演日程（コピペ）',
         widget=forms.Textarea(attrs={'rows': 10}),
-        help_text='例:\n2025-11-10 Zepp Tokyo\n2025-11-12 名古屋ダイアモンドホール'
+        help_text='例:\n2025-11-10 Zepp Tokyo\n2025/11/12 名古屋ダイアモンドホール\n11/15(土) なんばHatch（年を省略すると直前の日付から推定）'
     )
 
 class EventForm(forms.ModelForm):
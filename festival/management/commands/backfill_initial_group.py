@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from festival.models import Artist
+
+
+class Command(BaseCommand):
+    help = "全アーティストの頭文字グループ（initial_group）と検索用ローマ字（romaji）を再計算して保存する"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fields = list(Artist.DERIVED_FIELDS)
+        artists = Artist.objects.only('id', 'name', 'furigana', *fields).order_by('id')
+
+        changed = []
+        total = 0
+        updated = 0
+        for artist in artists.iterator(chunk_size=batch_size):
+            total += 1
+            values = {'initial_group': artist.compute_initial_group(), 'romaji': artist.compute_romaji()}
+            if any(getattr(artist, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(artist, field, value)
+                changed.append(artist)
+                updated += 1
+            if len(changed) >= batch_size:
+                Artist.objects.bulk_update(changed, fields)
+                changed = []
+        if changed:
+            Artist.objects.bulk_update(changed, fields)
+
+        self.stdout.write(f"{total} 件中 {updated} 件の頭文字グループ・ローマ字を更新しました。")
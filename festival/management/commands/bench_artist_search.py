@@ -0,0 +1,54 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from festival.models import Artist
+from festival.utils.db_utils import rolled_back_atomic
+from festival.utils.search_utils import FTS_TABLE, _fts_match_expression, search_artists, search_terms
+
+SYLLABLES = 'あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわん'
+QUERIES = ['よねづ', 'yonezu', 'ヨネヅ', '米津玄', 'artist 4242', 'かきく', 'zzzzz']
+
+
+class Command(BaseCommand):
+    help = "ダミーのアーティストを一時的に投入してアーティスト検索の速度を計測する（投入データはロールバック）"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--artists', type=int, default=100000, help='投入するアーティスト数')
+        parser.add_argument('--repeat', type=int, default=50, help='検索語ごとの計測回数')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def measure(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1000
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with rolled_back_atomic():
+            start = time.perf_counter()
+            artists = [Artist(name='米津玄師', furigana='よねづけんし', spotify_id='bench-target')]
+            for n in range(options['artists']):
+                furigana = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 8)))
+                artists.append(Artist(name=f"Artist {n}", furigana=furigana, spotify_id=f"bench-{n}"))
+            Artist.objects.bulk_create(artists, batch_size=2000)
+            self.stdout.write(f"{len(artists)} 件投入: {time.perf_counter() - start:.1f} 秒")
+
+            index_sql = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY rank LIMIT 50"
+            for query in QUERIES:
+                match = _fts_match_expression(search_terms(query))
+                with connection.cursor() as cursor:
+                    index = self.measure(lambda: cursor.execute(index_sql, [match]).fetchall(), options['repeat'])
+                fts = self.measure(lambda: list(search_artists(query)[:50]), options['repeat'])
+                scan = self.measure(lambda: list(Artist.objects.filter(name__icontains=query)[:50]), options['repeat'])
+                hits = search_artists(query).count()
+                self.stdout.write(
+                    f"  {query!r}: インデックス {index:.3f}ms / 検索（ORM込み） {fts:.3f}ms（{hits} 件）"
+                    f" / name__icontains {scan:.3f}ms"
+                )
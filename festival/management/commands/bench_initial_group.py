@@ -0,0 +1,73 @@
+import random
+import time
+import unicodedata
+
+from django.core.management.base import BaseCommand
+
+from festival.utils import text_utils
+
+SAMPLE_NAMES = [
+    'YOASOBI', 'あいみょん', 'King Gnu', '米津玄師', 'ヨルシカ', 'Official髭男dism', 'ずっと真夜中でいいのに。',
+    'ＳＥＫＡＩ　ＮＯ　ＯＷＡＲＩ', 'ｻｶﾅｸｼｮﾝ', '10-FEET', '★STAR GUiTAR', 'ヴィレッジヴァンガード', 'ーなにか',
+    'マカロニえんぴつ', 'Vaundy', '緑黄色社会', 'back number', 'スピッツ', 'ゲスの極み乙女', '東京事変',
+]
+
+
+def legacy_group_of_reading(reading):
+    """以前の判定処理（比較用）：毎回辞書を組み立て、正規表現と線形探索で判定する"""
+    import re
+
+    char = unicodedata.normalize('NFKC', reading)[0].lower()
+    if re.match(r'[a-z]', char):
+        return char.upper()
+    kana_groups = {
+        'あ': ['あ', 'い', 'う', 'え', 'お'],
+        'か': ['か', 'き', 'く', 'け', 'こ', 'が', 'ぎ', 'ぐ', 'げ', 'ご'],
+        'さ': ['さ', 'し', 'す', 'せ', 'そ', 'ざ', 'じ', 'ず', 'ぜ', 'ぞ'],
+        'た': ['た', 'ち', 'つ', 'て', 'と', 'だ', 'ぢ', 'づ', 'で', 'ど'],
+        'な': ['な', 'に', 'ぬ', 'ね', 'の'],
+        'は': ['は', 'ひ', 'ふ', 'へ', 'ほ', 'ば', 'び', 'ぶ', 'べ', 'ぼ', 'ぱ', 'ぴ', 'ぷ', 'ぺ', 'ぽ'],
+        'ま': ['ま', 'み', 'む', 'め', 'も'],
+        'や': ['や', 'ゆ', 'よ'],
+        'ら': ['ら', 'り', 'る', 'れ', 'ろ'],
+        'わ': ['わ', 'を', 'ん'],
+    }
+    for group, chars in kana_groups.items():
+        if char in chars:
+            return group
+    return char
+
+
+class Command(BaseCommand):
+    help = "get_initial_group の頭文字判定を計測する（旧実装との比較・一括判定・変換キャッシュの効果）"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--names', type=int, default=10000, help='判定する名前の数')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def measure(self, label, func, count):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"  {label}: {elapsed * 1000:.1f}ms（{elapsed / count * 1e6:.2f}µs/件）")
+        return elapsed
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        names = [rng.choice(SAMPLE_NAMES) for _ in range(options['names'])]
+        count = len(names)
+
+        text_utils.warm_up_furigana()  # 辞書の読み込み時間は含めない
+        text_utils.clear_furigana_cache()
+        self.stdout.write(f"{count} 件（ユニーク {len(set(names))} 件）")
+        self.measure('一括判定 get_initial_groups（キャッシュなし）', lambda: text_utils.get_initial_groups(names), count)
+        self.measure('1件ずつ get_initial_group（キャッシュあり）', lambda: [text_utils.get_initial_group(n) for n in names], count)
+        self.measure('一括判定 get_initial_groups（キャッシュあり）', lambda: text_utils.get_initial_groups(names), count)
+
+        # 読みからグループを引く部分だけを旧実装と比較する
+        readings = text_utils.get_furigana_many(names)
+        self.stdout.write("読み → グループの判定のみ:")
+        old = self.measure('旧実装', lambda: [legacy_group_of_reading(r) for r in readings], count)
+        new = self.measure('対応表', lambda: [text_utils._group_of_reading(r) for r in readings], count)
+        self.stdout.write(f"  {old / new:.1f} 倍")
+        self.stdout.write(f"変換キャッシュ: {text_utils.furigana_cache_stats()}")
@@ -0,0 +1,122 @@
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from festival.utils.db_utils import PRODUCTION_SQLITE_PRAGMAS, sqlite_pragma_statements
+
+DAYS = 100
+ROWS_PER_DAY = 150
+
+# (表示名, PRAGMA, 接続を使い回すか)
+PROFILES = [
+    ('既定（DELETE・毎回接続）', {}, False),
+    ('WAL のみ（毎回接続）', PRODUCTION_SQLITE_PRAGMAS, False),
+    ('本番（WAL・接続再利用）', PRODUCTION_SQLITE_PRAGMAS, True),
+]
+
+
+class Command(BaseCommand):
+    help = "一時ファイルの SQLite で、読み取りスレッドと書き込みスレッドを同時に動かしてプロファイルごとのスループットを比較する"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8, help='読み取りスレッド数（タイムテーブル閲覧）')
+        parser.add_argument('--writers', type=int, default=1, help='書き込みスレッド数（管理画面での保存）')
+        parser.add_argument('--seconds', type=float, default=5.0, help='プロファイルごとの計測時間')
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for label, pragmas, persistent in PROFILES:
+                path = os.path.join(tmpdir, f"bench-{len(os.listdir(tmpdir))}.sqlite3")
+                self.create_database(path)
+                result = self.run_profile(path, pragmas, persistent, options)
+                latencies = sorted(result['read_latencies']) or [0]
+                p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else latencies[0]
+                self.stdout.write(
+                    f"{label}: 読み取り {result['reads'] / options['seconds']:.0f} 件/秒"
+                    f"（p99 {p99 * 1000:.2f}ms・最大 {latencies[-1] * 1000:.1f}ms）"
+                    f" / 書き込み {result['writes'] / options['seconds']:.1f} 件/秒"
+                    f" / ロックエラー {result['errors']} 件"
+                )
+
+    def create_database(self, path):
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE performance (id INTEGER PRIMARY KEY, event_day_id INTEGER, artist TEXT, start_time TEXT)"
+        )
+        conn.execute("CREATE INDEX performance_day ON performance (event_day_id)")
+        conn.executemany(
+            "INSERT INTO performance (event_day_id, artist, start_time) VALUES (?, ?, ?)",
+            (
+                (day, f"Artist {day}-{n}", f"{10 + n // 12:02d}:{n % 12 * 5:02d}")
+                for day in range(DAYS) for n in range(ROWS_PER_DAY)
+            ),
+        )
+        conn.commit()
+        conn.close()
+
+    def run_profile(self, path, pragmas, persistent, options):
+        statements = sqlite_pragma_statements(pragmas)
+        # Django の SQLite 接続と同じく timeout=5 秒・トランザクションは自前で管理
+        def connect():
+            conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+            for statement in statements:
+                conn.execute(statement)
+            return conn
+
+        counts = {'reads': 0, 'writes': 0, 'errors': 0, 'read_latencies': []}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options['seconds']
+
+        def worker(operation, kind):
+            rng = random.Random()
+            conn = connect() if persistent else None
+            done = errors = 0
+            latencies = []
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                current = conn or connect()
+                try:
+                    operation(current, rng.randrange(DAYS))
+                    done += 1
+                    latencies.append(time.perf_counter() - start)
+                except sqlite3.OperationalError:
+                    errors += 1
+                finally:
+                    if not persistent:
+                        current.close()
+            if conn:
+                conn.close()
+            with lock:
+                counts[kind] += done
+                counts['errors'] += errors
+                if kind == 'reads':
+                    counts['read_latencies'] += latencies
+
+        def read(conn, day):
+            conn.execute(
+                "SELECT artist, start_time FROM performance WHERE event_day_id = ? ORDER BY start_time", (day,)
+            ).fetchall()
+
+        def write(conn, day):
+            # タイムテーブル1日分の一括保存に相当
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("UPDATE performance SET start_time = start_time WHERE event_day_id = ?", (day,))
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+
+        threads = [threading.Thread(target=worker, args=(read, 'reads')) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=worker, args=(write, 'writes')) for _ in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counts
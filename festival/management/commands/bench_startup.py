@@ -0,0 +1,53 @@
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+SETUP_SNIPPET = "import django; django.setup()"
+
+
+def parse_importtime(stderr):
+    """python -X importtime の出力を {モジュール名: 累積マイクロ秒} にする"""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        try:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            times[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # ヘッダー行
+    return times
+
+
+class Command(BaseCommand):
+    help = "新しいプロセスで django.setup() を実行し、python -X importtime で起動時間を計測する"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='計測回数')
+        parser.add_argument('--top', type=int, default=15, help='表示する遅いモジュールの数')
+
+    def run_once(self):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'conf.settings')}
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', SETUP_SNIPPET],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        return parse_importtime(proc.stderr)
+
+    def handle(self, *args, **options):
+        runs = [self.run_once() for _ in range(options['runs'])]
+        # トップレベル import の累積時間の合計 ≒ django.setup() までの import 時間
+        totals = [sum(t for name, t in run.items() if '.' not in name) / 1000 for run in runs]
+        self.stdout.write(
+            f"django.setup() import 時間: 中央値 {statistics.median(totals):.1f}ms "
+            f"(最小 {min(totals):.1f}ms / 最大 {max(totals):.1f}ms, {len(runs)} 回)"
+        )
+        last = runs[-1]
+        self.stdout.write(f"pykakasi 読み込み: {'あり' if 'pykakasi' in last else 'なし'}")
+        self.stdout.write("遅いモジュール（累積）:")
+        for name, t in sorted(last.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f"  {t / 1000:8.1f}ms  {name}")
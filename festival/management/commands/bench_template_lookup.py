@@ -0,0 +1,65 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.template import engines
+from django.test.utils import CaptureQueriesContext
+
+from festival.models import Artist
+from festival.utils.db_utils import rolled_back_atomic
+from festival.utils.template_utils import id_map
+
+# timetable_register.html の時間入力欄と同じ形のループ
+GET_BY_ID_TEMPLATE = (
+    "{% load custom_filters %}{% for artist_id in selected_artist_ids %}"
+    "{% with artist=artists|get_by_id:artist_id %}<h5>{{ artist.name }}</h5>{% endwith %}{% endfor %}"
+)
+LOOKUP_TEMPLATE = (
+    "{% load custom_filters %}{% for artist_id in selected_artist_ids %}"
+    "{% with artist=artists_by_id|lookup:artist_id %}<h5>{{ artist.name }}</h5>{% endwith %}{% endfor %}"
+)
+
+
+class Command(BaseCommand):
+    help = "get_by_id フィルタと id_map + lookup フィルタでテンプレート描画のクエリ数・時間を比較する（投入データはロールバック）"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--artists', type=int, default=150, help='選択アーティスト数')
+        parser.add_argument('--repeat', type=int, default=20, help='計測回数')
+
+    def render(self, template, make_context, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                html = template.render(make_context())
+            timings.append(time.perf_counter() - start)
+        return html, len(queries), statistics.median(timings) * 1000
+
+    def handle(self, *args, **options):
+        engine = engines['django']
+        with rolled_back_atomic():
+            Artist.objects.bulk_create([
+                Artist(name=f"Artist {n}", furigana=f"あーてぃすと{n}", spotify_id=f"bench-{n}")
+                for n in range(options['artists'])
+            ])
+            queryset = Artist.objects.filter(spotify_id__startswith='bench-')
+            # フォームの POST 値と同じく文字列の ID
+            selected = [str(pk) for pk in queryset.values_list('pk', flat=True)]
+
+            before, before_queries, before_ms = self.render(
+                engine.from_string(GET_BY_ID_TEMPLATE),
+                lambda: {'artists': queryset.all(), 'selected_artist_ids': selected},
+                options['repeat'],
+            )
+            after, after_queries, after_ms = self.render(
+                engine.from_string(LOOKUP_TEMPLATE),
+                lambda: {'artists_by_id': id_map(queryset.all()), 'selected_artist_ids': selected},
+                options['repeat'],
+            )
+            assert before == after, "描画結果が一致しません"
+
+            self.stdout.write(f"{len(selected)} 件のアーティストを描画")
+            self.stdout.write(f"  get_by_id      : {before_queries} クエリ / {before_ms:.2f}ms")
+            self.stdout.write(f"  id_map + lookup: {after_queries} クエリ / {after_ms:.2f}ms")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from festival.utils.job_utils import fail_interrupted_jobs
+
+
+class Command(BaseCommand):
+    help = "再起動で中断されたバックグラウンドジョブ（待機中・実行中のまま残ったもの）を失敗扱いにする（ワーカー起動前に実行）"
+
+    def handle(self, *args, **options):
+        count = fail_interrupted_jobs()
+        self.stdout.write(f"{count} 件の中断されたジョブを失敗扱いにしました。")
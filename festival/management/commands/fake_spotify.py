@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from festival.utils.fake_spotify import FakeSpotifyServer
+
+
+class Command(BaseCommand):
+    help = "ローカルのフェイク Spotify API サーバーを起動する（オフライン結合テスト・負荷試験用）"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8900)
+        parser.add_argument('--latency-ms', type=float, default=0, help='全リクエストに加える遅延（ミリ秒）')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='500 を返す確率（0〜1）')
+        parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='429 を返す確率（0〜1）')
+        parser.add_argument('--retry-after', type=int, default=1, help='429 の Retry-After（秒）')
+        parser.add_argument('--verbose', action='store_true', help='アクセスログを出力する')
+
+    def handle(self, *args, **options):
+        server = FakeSpotifyServer(
+            host=options['host'],
+            port=options['port'],
+            latency_ms=options['latency_ms'],
+            error_rate=options['error_rate'],
+            rate_limit_rate=options['rate_limit_rate'],
+            retry_after=options['retry_after'],
+            verbose=options['verbose'],
+        )
+        self.stdout.write(f"フェイク Spotify サーバー起動: {server.base_url}")
+        self.stdout.write(f"  SPOTIFY_API_BASE_URL={server.base_url}/v1")
+        self.stdout.write(f"  SPOTIFY_ACCOUNTS_BASE_URL={server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            for key, count in sorted(server.requests.items()):
+                self.stdout.write(f"{key}: {count}")
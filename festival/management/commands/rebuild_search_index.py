@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from festival.utils.search_utils import missing_search_index_objects, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "アーティスト検索用 FTS5 インデックスの同期トリガーを確認し、消えていれば作り直してインデックスを再構築する（SQLite のみ）"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='確認だけ行い、不足があれば終了コード1で終了する')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write("SQLite 以外では FTS5 インデックスを使わないので何もしません。")
+            return
+
+        missing = missing_search_index_objects()
+        if options['check']:
+            if missing:
+                raise CommandError(f"検索インデックスのオブジェクトがありません: {', '.join(missing)}")
+            self.stdout.write("検索インデックスのトリガーはすべて揃っています。")
+            return
+
+        try:
+            recreated = rebuild_search_index()
+        except RuntimeError as e:
+            raise CommandError(str(e)) from e
+        if recreated:
+            self.stdout.write(f"トリガーを作り直しました: {', '.join(recreated)}")
+        self.stdout.write("検索インデックスを再構築しました。")
@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from festival.utils.fake_spotify import fake_spotify_id
+from festival.utils.spotify_client import spotify_client
+from festival.utils.spotify_utils import app_token_cache, get_top_tracks_many, fetch_artists_metadata
+
+
+class Command(BaseCommand):
+    help = "設定中の Spotify API（通常はフェイクサーバー）に対してトップトラック・アーティスト一括取得の負荷をかける"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--artists', type=int, default=200, help='対象アーティスト数')
+        parser.add_argument('--workers', type=int, default=None, help='並行数（既定は SPOTIFY_MAX_WORKERS）')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"接続先: {settings.SPOTIFY_API_BASE_URL}")
+        ids = [fake_spotify_id(f"loadtest-{n}") for n in range(options['artists'])]
+        spotify_client.reset_stats()
+
+        start = time.perf_counter()
+        results = get_top_tracks_many(ids, max_workers=options['workers'])
+        elapsed = time.perf_counter() - start
+        failed = sum(1 for r in results if r['error'])
+        self.stdout.write(f"top-tracks: {len(ids)} 件 / {elapsed:.2f} 秒（失敗 {failed} 件）")
+
+        start = time.perf_counter()
+        metadata = fetch_artists_metadata(ids)
+        self.stdout.write(f"artists(一括): {len(metadata)} 件 / {time.perf_counter() - start:.2f} 秒")
+
+        for endpoint, stat in sorted(spotify_client.stats().items()):
+            self.stdout.write(
+                f"  {endpoint}: {stat['count']} 回, 平均 {stat['avg_time'] * 1000:.1f}ms, "
+                f"最大 {stat['max_time'] * 1000:.1f}ms, エラー {stat['errors']} 回"
+            )
+        self.stdout.write(f"トークンキャッシュ: {app_token_cache.stats()}")
+        self.stdout.write(f"スロットリング: {spotify_client.throttle_stats()}")
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('festival', '0013_tag_artist_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TopTrackCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('spotify_id', models.CharField(max_length=100)),
+                ('market', models.CharField(default='JP', max_length=2)),
+                ('tracks', models.JSONField(blank=True, default=list)),
+                ('fetched_at', models.DateTimeField()),
+            ],
+            options={
+                'unique_together': {('spotify_id', 'market')},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:59
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def backfill_initial_group(apps, schema_editor):
+    """既存アーティストの頭文字グループを埋める（以降は Artist.save / bulk_create で自動設定）"""
+    from festival.utils.text_utils import get_initial_groups
+
+    Artist = apps.get_model('festival', 'Artist')
+    artists = list(Artist.objects.only('id', 'name', 'furigana').order_by('id'))
+    for i in range(0, len(artists), BATCH_SIZE):
+        batch = artists[i:i + BATCH_SIZE]
+        groups = get_initial_groups([artist.furigana or artist.name for artist in batch])
+        for artist, group in zip(batch, groups):
+            artist.initial_group = group
+        Artist.objects.bulk_update(batch, ['initial_group'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('festival', '0014_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artist',
+            name='initial_group',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=10),
+        ),
+        migrations.RunPython(backfill_initial_group, migrations.RunPython.noop),
+    ]
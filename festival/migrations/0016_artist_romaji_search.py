@@ -0,0 +1,101 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:07
+
+from django.db import migrations, models
+
+# アーティスト検索用の全文検索インデックス
+# - SQLite: FTS5（trigram トークナイザ）の外部コンテンツテーブルをトリガーで同期
+#   （bulk_create / bulk_update / QuerySet.update でもトリガーが動く）
+# 注意: SQLite でテーブルを作り直すマイグレーション（AlterField など）はトリガーも消えるため、
+#       その場合は rebuild_search_index コマンド（search_utils.rebuild_search_index）で作り直すこと
+#       （test_search_utils がトリガーの有無を確認している）
+# - PostgreSQL: pg_trgm の GIN インデックス（icontains の UPPER(...) LIKE に効く）
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE festival_artist_fts USING fts5(
+        name, furigana, romaji,
+        content='festival_artist', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER festival_artist_fts_ai AFTER INSERT ON festival_artist BEGIN
+        INSERT INTO festival_artist_fts(rowid, name, furigana, romaji)
+        VALUES (new.id, new.name, new.furigana, new.romaji);
+    END
+    """,
+    """
+    CREATE TRIGGER festival_artist_fts_ad AFTER DELETE ON festival_artist BEGIN
+        INSERT INTO festival_artist_fts(festival_artist_fts, rowid, name, furigana, romaji)
+        VALUES ('delete', old.id, old.name, old.furigana, old.romaji);
+    END
+    """,
+    """
+    CREATE TRIGGER festival_artist_fts_au AFTER UPDATE OF name, furigana, romaji ON festival_artist BEGIN
+        INSERT INTO festival_artist_fts(festival_artist_fts, rowid, name, furigana, romaji)
+        VALUES ('delete', old.id, old.name, old.furigana, old.romaji);
+        INSERT INTO festival_artist_fts(rowid, name, furigana, romaji)
+        VALUES (new.id, new.name, new.furigana, new.romaji);
+    END
+    """,
+    "INSERT INTO festival_artist_fts(festival_artist_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS festival_artist_fts_ai",
+    "DROP TRIGGER IF EXISTS festival_artist_fts_ad",
+    "DROP TRIGGER IF EXISTS festival_artist_fts_au",
+    "DROP TABLE IF EXISTS festival_artist_fts",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    *(
+        f"CREATE INDEX IF NOT EXISTS festival_artist_{column}_trgm "
+        f"ON festival_artist USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+        for column in ('name', 'furigana', 'romaji')
+    ),
+]
+POSTGRES_BACKWARD = [
+    f"DROP INDEX IF EXISTS festival_artist_{column}_trgm" for column in ('name', 'furigana', 'romaji')
+]
+
+
+BATCH_SIZE = 500
+
+
+def backfill_romaji(apps, schema_editor):
+    """既存アーティストの検索用ローマ字を埋める（インデックスの rebuild より前に実行する）"""
+    from festival.utils.text_utils import get_romaji_many
+
+    Artist = apps.get_model('festival', 'Artist')
+    artists = list(Artist.objects.only('id', 'name', 'furigana').order_by('id'))
+    for i in range(0, len(artists), BATCH_SIZE):
+        batch = artists[i:i + BATCH_SIZE]
+        for artist, romaji in zip(batch, get_romaji_many([artist.furigana or artist.name for artist in batch])):
+            artist.romaji = romaji
+        Artist.objects.bulk_update(batch, ['romaji'])
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for sql in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('festival', '0015_artist_initial_group'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artist',
+            name='romaji',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_romaji, migrations.RunPython.noop),
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
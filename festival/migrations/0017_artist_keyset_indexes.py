@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('festival', '0016_artist_romaji_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='artist',
+            index=models.Index(fields=['furigana', 'id'], name='artist_furigana_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='artist',
+            index=models.Index(fields=['initial_group', 'furigana', 'id'], name='artist_initial_furigana_idx'),
+        ),
+    ]
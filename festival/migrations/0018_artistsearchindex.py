@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:46
+
+import django.db.models.deletion
+import festival.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('festival', '0017_artist_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtistSearchIndex',
+            fields=[
+                ('artist', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='festival.artist')),
+                ('document', festival.models.FullTextField(db_column='festival_artist_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'festival_artist_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:03
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def backfill_name_key(apps, schema_editor):
+    """既存アーティストの name_key を埋める（以降は Artist.save / bulk_create で自動設定）"""
+    from festival.utils.text_utils import get_name_key
+
+    Artist = apps.get_model('festival', 'Artist')
+    artists = list(Artist.objects.only('id', 'name').order_by('id'))
+    for i in range(0, len(artists), BATCH_SIZE):
+        batch = artists[i:i + BATCH_SIZE]
+        for artist in batch:
+            artist.name_key = get_name_key(artist.name)
+        Artist.objects.bulk_update(batch, ['name_key'])
+
+
+def recreate_search_triggers(apps, schema_editor):
+    """SQLite ではテーブルの作り直しで FTS5 の同期トリガーが消えるので作り直す（0016 参照）"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from festival.utils.search_utils import FTS_TRIGGERS
+
+    for sql in FTS_TRIGGERS.values():
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('festival', '0018_artistsearchindex'),
+    ]
+
+    operations = [
+        # 逆適用の RemoveField でもテーブルが作り直されるので、その後にトリガーを戻す
+        migrations.RunPython(migrations.RunPython.noop, recreate_search_triggers),
+        migrations.AddField(
+            model_name='artist',
+            name='name_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(recreate_search_triggers, migrations.RunPython.noop),
+        migrations.RunPython(backfill_name_key, migrations.RunPython.noop),
+    ]
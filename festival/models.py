@@ -1,5 +1,6 @@
 from django.db import models
-from .utils.text_utils import get_initial_group
+from django.utils import timezone
+from .utils.text_utils import get_initial_group, get_initial_groups, get_name_key, get_romaji, get_romaji_many
 
 class Event(models.Model):
     """イベント全体のクラス"""
@@ -43,10 +44,40 @@ class Tag(models.Model):
     def __str__(self):
         return self.name
 
+class ArtistQuerySet(models.QuerySet):
+    """bulk_create / bulk_update でも名前から求める列（initial_group・romaji・name_key）を更新するクエリセット"""
+
+    @staticmethod
+    def _assign_derived_fields(objs):
+        readings = [obj.furigana or obj.name for obj in objs]
+        for obj, group, romaji in zip(objs, get_initial_groups(readings), get_romaji_many(readings)):
+            obj.initial_group = group
+            obj.romaji = romaji
+            obj.name_key = get_name_key(obj.name)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        self._assign_derived_fields(objs)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        fields = list(fields)
+        if {'name', 'furigana'} & set(fields):
+            self._assign_derived_fields(objs)
+            fields.extend(f for f in Artist.DERIVED_FIELDS if f not in fields)
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
 class Artist(models.Model):
     """アーティストクラス"""
     name = models.CharField(max_length=255)
     furigana = models.CharField(max_length=100, blank=True, null=True)
+    # ふりがなまたは名前から求めた頭文字グループ（保存時に自動更新、一覧の絞り込み用）
+    initial_group = models.CharField(max_length=10, blank=True, default='', db_index=True, editable=False)
+    # ふりがなまたは名前のローマ字表記（保存時に自動更新、検索用）
+    romaji = models.CharField(max_length=255, blank=True, default='', editable=False)
+    # 名前の同一判定用キー（NFKC + casefold、保存時に自動更新、一括登録の登録済み判定用）
+    name_key = models.CharField(max_length=255, blank=True, default='', db_index=True, editable=False)
     popularity = models.IntegerField(null=True, blank=True)
     genres = models.JSONField(default=list, blank=True)
     spotify_id = models.CharField(max_length=100, unique=True)
@@ -55,17 +86,124 @@ class Artist(models.Model):
     official_url = models.URLField(blank=True, null=True)
     tags = models.ManyToManyField(Tag, blank=True, related_name='artists')
 
+    objects = ArtistQuerySet.as_manager()
+
     def __str__(self):
         return self.name
     
     class Meta:
         ordering = ['furigana']  # ふりがな順で並び替え
-    
-    @property
-    def initial_group(self):
+        indexes = [
+            # 一覧のキーセットページネーション用（全件 / 頭文字で絞り込み）
+            models.Index(fields=['furigana', 'id'], name='artist_furigana_id_idx'),
+            models.Index(fields=['initial_group', 'furigana', 'id'], name='artist_initial_furigana_idx'),
+        ]
+
+    # name / furigana から自動で求める列
+    DERIVED_FIELDS = ('initial_group', 'romaji', 'name_key')
+
+    def compute_initial_group(self):
         """ふりがなまたは名前から頭文字グループを返す"""
         return get_initial_group(self.furigana or self.name)
 
+    def compute_romaji(self):
+        """ふりがなまたは名前からローマ字表記を返す"""
+        return get_romaji(self.furigana or self.name)
+
+    def save(self, *args, **kwargs):
+        # image_url・popularity だけの更新などでは読みの変換（pykakasi）を省く
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'name', 'furigana'} & set(update_fields):
+            self.initial_group = self.compute_initial_group()
+            self.romaji = self.compute_romaji()
+            self.name_key = get_name_key(self.name)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *self.DERIVED_FIELDS}
+        super().save(*args, **kwargs)
+
+class FullTextMatch(models.Lookup):
+    """SQLite FTS5 の MATCH（document__match='"語1" OR "語2"' のように使う）"""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+class FullTextField(models.TextField):
+    """FTS5 テーブル名と同名の隠し列（MATCH の左辺）"""
+
+
+FullTextField.register_lookup(FullTextMatch)
+
+
+class ArtistSearchIndex(models.Model):
+    """
+    アーティスト検索用の FTS5 インデックス（読み取り専用）。
+    実体は 0016 マイグレーションで作成する SQLite の仮想テーブルで、festival_artist からトリガーで同期する。
+    Artist から search_index で JOIN して MATCH・rank を使う（SQLite 以外にはテーブルがない）。
+    """
+    artist = models.OneToOneField(
+        Artist, primary_key=True, db_column='rowid', db_constraint=False,
+        on_delete=models.DO_NOTHING, related_name='search_index',
+    )
+    document = FullTextField(db_column='festival_artist_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'festival_artist_fts'
+
+
+class TopTrackCache(models.Model):
+    """Spotifyトップトラックのキャッシュ（spotify_id × market 単位）"""
+    spotify_id = models.CharField(max_length=100)
+    market = models.CharField(max_length=2, default='JP')
+    tracks = models.JSONField(default=list, blank=True)
+    fetched_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.spotify_id} ({self.market})"
+
+    class Meta:
+        unique_together = ('spotify_id', 'market')
+
+class BackgroundJob(models.Model):
+    """バックグラウンドで実行する長時間処理（Spotify一括取得など）の進捗管理クラス"""
+    STATUS_CHOICES = [
+        ('QUEUED', '待機中'),
+        ('RUNNING', '実行中'),
+        ('DONE', '完了'),
+        ('FAILED', '失敗'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    params = models.JSONField(default=dict, blank=True)
+    total = models.PositiveIntegerField(default=0)
+    done = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('DONE', 'FAILED')
+
+    @property
+    def eta_seconds(self):
+        """これまでの処理速度から残り時間（秒）を推定。推定できなければ None"""
+        if self.status != 'RUNNING' or not self.started_at or not self.done or not self.total:
+            return None
+        elapsed = (timezone.now() - self.started_at).total_seconds()
+        return round(elapsed / self.done * (self.total - self.done), 1)
+
 
 
 
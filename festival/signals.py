@@ -0,0 +1,59 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Artist, EventDay, Performance, Stage
+from .utils.db_utils import apply_sqlite_pragmas
+from .utils.timetable_utils import invalidate_timetable_cache
+
+
+@receiver(post_init, sender=Performance)
+def remember_performance_day(sender, instance, **kwargs):
+    """別の日に移されたときに移動元の日も破棄できるよう、読み込み時の日程を覚えておく"""
+    # only()/defer() で外された場合に追加のクエリを発行しないよう __dict__ から読む
+    instance._original_event_day_id = instance.__dict__.get('event_day_id')
+
+@receiver([post_save, post_delete], sender=Performance)
+def performance_changed(sender, instance, **kwargs):
+    """出演の追加・変更・削除でその日（移動した場合は移動元も）のタイムテーブルキャッシュを破棄"""
+    event_day_ids = {instance.event_day_id, instance._original_event_day_id} - {None}
+    invalidate_timetable_cache(event_day_ids)
+    instance._original_event_day_id = instance.event_day_id
+
+@receiver(post_save, sender=Artist)
+def artist_changed(sender, instance, created, **kwargs):
+    """アーティスト名はタイムテーブルに表示されるので、出演している日のキャッシュを破棄"""
+    if created:
+        return
+    invalidate_timetable_cache(
+        Performance.objects.filter(artist=instance).values_list('event_day_id', flat=True)
+    )
+
+@receiver(pre_delete, sender=Artist)
+def remember_artist_days(sender, instance, **kwargs):
+    """削除では出演も CASCADE で消えるので、post_delete で破棄する日程を先に集めておく"""
+    instance._timetable_event_day_ids = list(
+        Performance.objects.filter(artist=instance).values_list('event_day_id', flat=True)
+    )
+
+@receiver(post_delete, sender=Artist)
+def artist_deleted(sender, instance, **kwargs):
+    """pre_delete で集めた日程のキャッシュを破棄"""
+    invalidate_timetable_cache(getattr(instance, '_timetable_event_day_ids', []))
+
+@receiver([post_save, post_delete], sender=EventDay)
+def event_day_changed(sender, instance, **kwargs):
+    """日付・会場は JSON API のペイロードに含まれるので、その日のキャッシュを破棄"""
+    invalidate_timetable_cache([instance.pk])
+
+@receiver([post_save, post_delete], sender=Stage)
+def stage_changed(sender, instance, **kwargs):
+    """ステージの変更はイベントの全日程に影響する"""
+    invalidate_timetable_cache(
+        EventDay.objects.filter(event_id=instance.event_id).values_list('id', flat=True)
+    )
+
+@receiver(connection_created)
+def configure_database_connection(sender, connection, **kwargs):
+    """新しいDB接続ごとに SQLite の PRAGMA を設定（本番プロファイルのみ）"""
+    apply_sqlite_pragmas(connection)
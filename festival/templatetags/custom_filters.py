@@ -4,10 +4,25 @@ register = template.Library()
 
 @register.filter
 def get_by_id(queryset, id):
+    # 呼び出しごとにクエリが走るのでループ内では使わず、id_map + lookup を使う
     return queryset.filter(id=id).first()
 
 @register.filter
 def get_item(dictionary, key):
     if isinstance(dictionary, dict):
         return dictionary.get(key)
-    return None
\ No newline at end of file
+    return None
+
+@register.filter
+def lookup(mapping, key):
+    """
+    id_map で作った辞書から ID でオブジェクトを引く（クエリなし）。
+    POST 値など文字列の ID でも数値キーに当たるようにする。
+    """
+    if not isinstance(mapping, dict):
+        return None
+    if key in mapping:
+        return mapping[key]
+    if isinstance(key, str) and key.isdigit():
+        return mapping.get(int(key))
+    return None
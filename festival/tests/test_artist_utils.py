@@ -0,0 +1,112 @@
+from unittest.mock import patch
+from django.test import TestCase
+from festival.models import Artist
+from festival.utils.artist_utils import (
+    update_missing_artist_images, parse_artist_names, register_artists_from_names
+)
+from festival.utils.spotify_utils import SpotifyAPIError
+
+
+class ArtistUtilsTest(TestCase):
+    def setUp(self):
+        self.missing = Artist.objects.create(name="YOASOBI", spotify_id="abc123")
+        self.has_image = Artist.objects.create(name="Aimer", spotify_id="def456", image_url="http://img/aimer")
+
+    @patch("festival.utils.artist_utils.fetch_artists_metadata")
+    def test_update_missing_artist_images(self, mock_fetch):
+        mock_fetch.return_value = {
+            "abc123": {"image_url": "http://img/yoasobi", "popularity": 80, "genres": ["j-pop"]}
+        }
+        updated = update_missing_artist_images()
+        self.assertEqual(updated, 1)
+        mock_fetch.assert_called_once_with(["abc123"])
+
+        self.missing.refresh_from_db()
+        self.assertEqual(self.missing.image_url, "http://img/yoasobi")
+        self.assertEqual(self.missing.popularity, 80)
+        self.assertEqual(self.missing.genres, ["j-pop"])
+
+    @patch("festival.utils.artist_utils.fetch_artists_metadata", return_value={})
+    def test_update_missing_artist_images_not_found(self, _):
+        self.assertEqual(update_missing_artist_images(), 0)
+        self.missing.refresh_from_db()
+        self.assertIsNone(self.missing.image_url)
+
+
+class RegisterArtistsTest(TestCase):
+    def setUp(self):
+        Artist.objects.create(name="YOASOBI", spotify_id="abc123")
+
+    def test_parse_artist_names(self):
+        names = parse_artist_names("Aimer, YOASOBI\nyoasobi,,King Gnu\n")
+        self.assertEqual(names, ["Aimer", "YOASOBI", "King Gnu"])
+
+    def test_name_key_saved_and_used_for_known_names(self):
+        artist = Artist.objects.create(name="ＫＩＮＧ  Gnu", spotify_id="kinggnu")
+        self.assertEqual(artist.name_key, "king gnu")
+        with self.assertNumQueries(1):
+            report = register_artists_from_names(["king gnu"])
+        self.assertEqual(report[0]["status"], "skipped")
+
+    def test_parse_artist_names_normalizes_width_and_case(self):
+        names = parse_artist_names("ＹＯＡＳＯＢＩ, yoasobi\nKing  Gnu, king gnu\nSTRASSE, straße")
+        self.assertEqual(names, ["ＹＯＡＳＯＢＩ", "King  Gnu", "STRASSE"])
+
+    @patch("festival.utils.artist_utils.get_furigana_many", side_effect=lambda names: [n.lower() for n in names])
+    @patch("festival.utils.artist_utils.find_artist")
+    def test_register_artists_from_names_matches_full_width_names(self, mock_find, _):
+        Artist.objects.create(name="ＹＯＡＳＯＢＩ", spotify_id="yoasobi1")
+        report = register_artists_from_names(["yoasobi"])
+        self.assertEqual(report[0]["status"], "skipped")
+        mock_find.assert_not_called()
+
+    @patch("festival.utils.artist_utils.get_furigana_many")
+    @patch("festival.utils.artist_utils.find_artist")
+    def test_register_artists_from_names_reports_concurrent_insert(self, mock_find, mock_furigana):
+        mock_find.side_effect = lambda name: {
+            "name": name, "spotify_id": f"id_{name}", "popularity": 50, "genres": []
+        }
+
+        def racing_furigana(names):
+            # 既存 spotify_id の確認のあと、一括登録の前に別のジョブが同じ spotify_id を登録した場合を再現する
+            Artist.objects.create(name="Aimer", spotify_id="id_Aimer")
+            return [n.lower() for n in names]
+        mock_furigana.side_effect = racing_furigana
+
+        report = register_artists_from_names(["Aimer", "King Gnu"])
+        statuses = {row["name"]: row["status"] for row in report}
+        self.assertEqual(statuses, {"Aimer": "skipped", "King Gnu": "created"})
+        self.assertEqual(Artist.objects.filter(spotify_id="id_Aimer").count(), 1)
+        self.assertEqual(Artist.objects.get(spotify_id="id_King Gnu").name_key, "king gnu")
+
+    @patch("festival.utils.artist_utils.get_furigana_many", side_effect=lambda names: [n.lower() for n in names])
+    @patch("festival.utils.artist_utils.find_artist")
+    def test_register_artists_from_names_report(self, mock_find, _):
+        def fake_find(name):
+            if name == "Nobody":
+                return None
+            if name == "Broken":
+                raise SpotifyAPIError("検索失敗: 500")
+            if name.startswith("Aimer"):
+                return {"name": "Aimer", "spotify_id": "aimer1", "popularity": 70, "genres": []}
+            return {"name": name, "spotify_id": f"id_{name}", "popularity": 50, "genres": ["j-pop"]}
+        mock_find.side_effect = fake_find
+
+        names = ["yoasobi", "Aimer", "Nobody", "Broken", "Aimer (JP)", "King Gnu"]
+        # 登録済み名前・既存 spotify_id・SAVEPOINT・一括登録・RELEASE
+        with self.assertNumQueries(5):
+            report = register_artists_from_names(names)
+
+        statuses = {row["name"]: row["status"] for row in report}
+        self.assertEqual([row["name"] for row in report], names)
+        self.assertEqual(statuses, {
+            "yoasobi": "skipped",
+            "Aimer": "created",
+            "Nobody": "not_found",
+            "Broken": "error",
+            "Aimer (JP)": "skipped",  # 同じ spotify_id は1件だけ登録
+            "King Gnu": "created",
+        })
+        self.assertNotIn("yoasobi", [c.args[0] for c in mock_find.call_args_list])
+        self.assertEqual(Artist.objects.count(), 3)
+        self.assertEqual(Artist.objects.get(spotify_id="aimer1").furigana, "aimer")
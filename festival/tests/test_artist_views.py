@@ -1,8 +1,10 @@
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from unittest.mock import patch
-from festival.models import Artist, Event, EventDay, Performance
-from datetime import date
+from festival.models import Artist, Event, EventDay, Performance, BackgroundJob
+from festival.utils.pagination_utils import encode_cursor
+from datetime import date, time
 
 
 class ArtistViewsTest(TestCase):
@@ -28,6 +30,73 @@ class ArtistViewsTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "YOASOBI")
 
+    def test_artist_list_search_by_furigana(self):
+        response = self.client.get(reverse("festival:artist_list") + "?q=ヨアソビ")
+        self.assertContains(response, "YOASOBI")
+
+    def test_artist_list_initial_filter(self):
+        Artist.objects.create(name="Aimer", furigana="えめ", spotify_id="def456")
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("festival:artist_list") + "?initial=や")
+        self.assertContains(response, "YOASOBI")
+        self.assertNotContains(response, "Aimer")
+        self.assertEqual(response.context["initials_kana"], ["あ", "や"])
+
+    def test_artist_list_keyset_pagination(self):
+        Artist.objects.bulk_create([
+            Artist(name=f"Band {n}", furigana=f"ばんど{n}", spotify_id=f"band{n}") for n in range(5)
+        ])
+        url = reverse("festival:artist_list")
+        response = self.client.get(url + "?initial=は&size=2")
+        self.assertEqual([a.name for a in response.context["artists"]], ["Band 0", "Band 1"])
+
+        seen = []
+        next_query = "initial=は&size=2"
+        while next_query:
+            with self.assertNumQueries(2):
+                response = self.client.get(f"{url}?{next_query}")
+            seen += [a.name for a in response.context["artists"]]
+            next_query = response.context["next_query"]
+        self.assertEqual(seen, [f"Band {n}" for n in range(5)])
+
+    def test_artist_list_invalid_cursor_redirects_to_first_page(self):
+        response = self.client.get(reverse("festival:artist_list") + "?q=YOA&cursor=broken")
+        self.assertRedirects(response, reverse("festival:artist_list") + "?q=YOA")
+
+    def test_artist_list_json_pages(self):
+        Artist.objects.bulk_create([
+            Artist(name=f"Band {n}", furigana=f"ばんど{n}", spotify_id=f"band{n}") for n in range(3)
+        ])
+        url = reverse("festival:artist_list_json") + "?size=2"
+        names = []
+        while url:
+            data = self.client.get(url).json()
+            names += [row["name"] for row in data["results"]]
+            url = data["next"]
+        self.assertEqual(names, ["Band 0", "Band 1", "Band 2", "YOASOBI"])
+
+    def test_artist_list_json_search_pages(self):
+        Artist.objects.bulk_create([
+            Artist(name=f"Yoasobi Cover {n}", furigana=f"よあそびかばー{n}", spotify_id=f"cover{n}") for n in range(3)
+        ])
+        url = reverse("festival:artist_list_json") + "?q=yoasobi&size=1"
+        names = []
+        while url:
+            data = self.client.get(url).json()
+            names += [row["name"] for row in data["results"]]
+            url = data["next"]
+        self.assertEqual(len(names), 4)
+        self.assertCountEqual(names, ["YOASOBI", "Yoasobi Cover 0", "Yoasobi Cover 1", "Yoasobi Cover 2"])
+
+    def test_artist_list_json_invalid_cursor(self):
+        response = self.client.get(reverse("festival:artist_list_json") + "?cursor=broken")
+        self.assertEqual(response.status_code, 400)
+
+    def test_artist_list_json_cursor_with_wrong_types(self):
+        cursor = encode_cursor(["よあそび", ["1"]])
+        response = self.client.get(reverse("festival:artist_list_json") + f"?cursor={cursor}")
+        self.assertEqual(response.status_code, 400)
+
     def test_artist_detail_view(self):
         response = self.client.get(reverse("festival:artist_detail", args=[self.artist.id]))
         self.assertEqual(response.status_code, 200)
@@ -48,14 +117,40 @@ class ArtistViewsTest(TestCase):
         response = self.client.post(reverse("festival:edit_artist_bulk"), data)
         self.assertEqual(response.status_code, 302)
 
-    @patch("festival.views.artist_views.save_artist_from_spotify")
-    def test_bulk_artist_register_post(self, mock_save):
+    def test_edit_artist_bulk_post_refreshes_timetable_cache(self):
+        cache.clear()
+        self.performance.start_time = time(12, 0)
+        self.performance.end_time = time(13, 0)
+        self.performance.save()
+        url = reverse("festival:timetable_json", args=[self.event_day.id])
+        self.assertEqual(self.client.get(url).json()["artists"]["name"], ["YOASOBI"])
+
         self.client.force_login(self._create_staff_user())
-        mock_save.return_value = True
+        data = {f"name_{self.artist.id}": "ヨアソビ", f"furigana_{self.artist.id}": "よあそび"}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("festival:edit_artist_bulk"), data)
+        self.assertEqual(self.client.get(url).json()["artists"]["name"], ["ヨアソビ"])
+
+    @override_settings(BACKGROUND_JOBS_EAGER=True)
+    @patch("festival.utils.artist_utils.find_artist")
+    def test_bulk_artist_register_post(self, mock_find):
+        self.client.force_login(self._create_staff_user())
+        mock_find.return_value = {"name": "Aimer", "spotify_id": "aimer1", "popularity": 70, "genres": []}
         data = {"names": "Aimer, YOASOBI"}
-        response = self.client.post(reverse("festival:bulk_artist_register"), data)
+        response = self.client.post(reverse("festival:bulk_artist_register"), data, follow=True)
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, "件登録")
+        self.assertEqual(response.redirect_chain[0][1], 302)
+        self.assertContains(response, "1 件登録、1 件スキップ")
+        self.assertTrue(Artist.objects.filter(spotify_id="aimer1").exists())
+
+    @override_settings(BACKGROUND_JOBS_EAGER=True)
+    @patch("festival.utils.artist_utils.fetch_artists_metadata", return_value={})
+    def test_update_artist_images_view_queues_job(self, _):
+        self.client.force_login(self._create_staff_user())
+        response = self.client.get(reverse("festival:update_artist_images_view"))
+        job = BackgroundJob.objects.get(kind="update_artist_images")
+        self.assertRedirects(response, reverse("festival:job_detail", args=[job.id]))
+        self.assertEqual(job.status, "DONE")
 
     def test_edit_artist_get(self):
         self.client.force_login(self._create_staff_user())
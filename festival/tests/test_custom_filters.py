@@ -28,4 +28,14 @@ class TestCustomFilters(unittest.TestCase):
 
     def test_get_item_with_non_dict(self):
         not_a_dict = ["not", "a", "dict"]
-        self.assertIsNone(custom_filters.get_item(not_a_dict, "key"))
\ No newline at end of file
+        self.assertIsNone(custom_filters.get_item(not_a_dict, "key"))
+
+    def test_lookup_with_int_and_str_keys(self):
+        mapping = {1: "YOASOBI", 2: "Ado"}
+        self.assertEqual(custom_filters.lookup(mapping, 1), "YOASOBI")
+        self.assertEqual(custom_filters.lookup(mapping, "2"), "Ado")
+
+    def test_lookup_with_missing_key_or_non_dict(self):
+        self.assertIsNone(custom_filters.lookup({1: "YOASOBI"}, "3"))
+        self.assertIsNone(custom_filters.lookup({1: "YOASOBI"}, "abc"))
+        self.assertIsNone(custom_filters.lookup(["not", "a", "dict"], 1))
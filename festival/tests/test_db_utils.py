@@ -0,0 +1,52 @@
+import tempfile
+from pathlib import Path
+
+from django.db.utils import ConnectionHandler
+from django.test import TestCase, override_settings
+
+from festival.models import Artist
+from festival.utils.db_utils import configured_sqlite_pragmas, rolled_back_atomic, sqlite_pragma_statements
+
+
+class SqlitePragmaTest(TestCase):
+    def connect(self):
+        # テスト用DBとは別のファイルに新しく接続する（connection_created シグナルが飛ぶ）
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        database = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(Path(tmpdir.name) / 'test.sqlite3')}
+        connection = ConnectionHandler({'default': database})['default']
+        self.addCleanup(connection.close)
+        connection.ensure_connection()
+        return connection
+
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    @override_settings(DATABASE_PROFILE="production", SQLITE_PRAGMAS={"cache_size": -2000})
+    def test_production_profile_applies_pragmas_on_connect(self):
+        connection = self.connect()
+        self.assertEqual(self.pragma(connection, "journal_mode"), "wal")
+        self.assertEqual(self.pragma(connection, "synchronous"), 1)  # NORMAL
+        self.assertEqual(self.pragma(connection, "busy_timeout"), 5000)
+        self.assertEqual(self.pragma(connection, "mmap_size"), 268435456)
+        self.assertEqual(self.pragma(connection, "cache_size"), -2000)
+
+    @override_settings(DATABASE_PROFILE="development")
+    def test_development_profile_keeps_defaults(self):
+        self.assertEqual(configured_sqlite_pragmas(), {})
+        self.assertEqual(self.pragma(self.connect(), "journal_mode"), "delete")
+
+    def test_rejects_invalid_pragma_name(self):
+        self.assertEqual(sqlite_pragma_statements({"synchronous": "NORMAL"}), ["PRAGMA synchronous = NORMAL"])
+        with self.assertRaises(ValueError):
+            sqlite_pragma_statements({"synchronous = OFF; --": 1})
+
+
+class RolledBackAtomicTest(TestCase):
+    def test_writes_are_rolled_back(self):
+        with rolled_back_atomic():
+            Artist.objects.create(name="Bench", spotify_id="bench-1")
+            self.assertTrue(Artist.objects.filter(spotify_id="bench-1").exists())
+        self.assertFalse(Artist.objects.filter(spotify_id="bench-1").exists())
@@ -65,6 +65,31 @@ class EventViewsTest(TestCase):
         self.assertContains(response, "YOASOBI")
         self.assertContains(response, "Tokyo")
 
+    def test_event_detail_query_count_is_constant(self):
+        artists = Artist.objects.bulk_create([
+            Artist(name=f"Artist {n}", spotify_id=f"id{n}") for n in range(3)
+        ])
+        url = reverse("festival:event_detail", args=[self.event_upcoming.id])
+        for day_count in (1, 5):
+            for n in range(EventDay.objects.filter(event=self.event_upcoming).count(), day_count):
+                event_day = EventDay.objects.create(
+                    event=self.event_upcoming, date=f"2025-12-{n + 1:02d}", venue=f"Venue {n}"
+                )
+                for i, artist in enumerate(artists):
+                    Performance.objects.create(
+                        event_day=event_day, artist=artist,
+                        start_time="12:00" if i == 0 and n % 2 else None,
+                        end_time="12:30" if i == 0 and n % 2 else None,
+                    )
+            # セッション・ユーザー（2回）+ イベント・日程・出演者（3回）
+            with self.assertNumQueries(5):
+                response = self.client.get(url)
+            self.assertEqual(len(response.context["day_performances"]), day_count)
+
+        flags = [has_timetable for _, _, has_timetable in response.context["day_performances"]]
+        self.assertEqual(flags, [False, True, False, True, False])
+        self.assertContains(response, "Artist 2")
+
     def test_create_event_post(self):
         data = {
             "name": "New Event",
@@ -0,0 +1,58 @@
+from django.test import SimpleTestCase, override_settings
+from festival.utils import spotify_utils
+from festival.utils.fake_spotify import FakeSpotifyServer
+
+
+class FakeSpotifyIntegrationTest(SimpleTestCase):
+    """フェイクサーバーに対して実際のHTTP通信で spotify_utils を動かす"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeSpotifyServer().start()
+        cls.settings_override = override_settings(
+            SPOTIFY_API_BASE_URL=f"{cls.server.base_url}/v1",
+            SPOTIFY_ACCOUNTS_BASE_URL=cls.server.base_url,
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        spotify_utils.app_token_cache.clear()
+        self.server.requests.clear()
+        self.server.rate_limit_rate = 0.0
+
+    def test_search_and_top_tracks(self):
+        artist = spotify_utils.search_artist("YOASOBI")
+        self.assertEqual(artist["name"], "YOASOBI")
+        tracks = spotify_utils.get_top_tracks(artist["spotify_id"])
+        self.assertEqual(len(tracks), 10)
+        # トークン取得は1回だけ
+        self.assertEqual(self.server.requests["POST /api/token"], 1)
+
+    def test_concurrent_top_tracks_and_batch_metadata(self):
+        ids = [f"artist{n:03d}" for n in range(60)]
+        results = spotify_utils.get_top_tracks_many(ids, max_workers=8)
+        self.assertEqual([r["spotify_id"] for r in results], ids)
+        self.assertTrue(all(r["error"] is None for r in results))
+
+        metadata = spotify_utils.fetch_artists_metadata(ids)
+        self.assertEqual(len(metadata), 60)
+        self.assertEqual(self.server.requests["GET /v1/artists"], 2)
+
+    def test_save_large_playlist(self):
+        uris = [f"spotify:track:{n}" for n in range(250)]
+        url = spotify_utils.save_playlist_to_spotify("user-token", uris, "Big Fes")
+        self.assertTrue(url.startswith("https://open.spotify.com/playlist/"))
+        self.assertEqual(self.server.requests["POST /v1/playlists/{id}/tracks"], 3)
+
+    def test_rate_limited_requests_retried_then_given_up(self):
+        self.server.rate_limit_rate = 1.0
+        self.server.retry_after = 0
+        self.assertIsNone(spotify_utils.search_artist("YOASOBI"))
+        self.assertGreater(self.server.requests["429"], 1)
@@ -0,0 +1,93 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from festival.models import BackgroundJob
+from festival.utils import job_utils
+
+
+@override_settings(BACKGROUND_JOBS_EAGER=True)
+class JobViewsTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        User.objects.create_user(username="admin", password="pass", is_staff=True)
+        self.client.login(username="admin", password="pass")
+
+    def test_job_progress_and_result_recorded(self):
+        def handler(job, progress):
+            progress(0, 3)
+            progress(2, 3, ["B: 検索失敗"])
+            progress(3, 3)
+            return {"updated": 2}
+
+        with patch.dict(job_utils.JOB_HANDLERS, {"test_job": handler}):
+            job = job_utils.enqueue_job("test_job", foo=1)
+
+        self.assertEqual(job.status, "DONE")
+        self.assertEqual((job.done, job.total), (3, 3))
+        self.assertEqual(job.errors, ["B: 検索失敗"])
+        self.assertEqual(job.result, {"updated": 2})
+        self.assertEqual(job.params, {"foo": 1})
+
+    def test_job_failure_recorded(self):
+        def handler(job, progress):
+            raise RuntimeError("boom")
+
+        with patch.dict(job_utils.JOB_HANDLERS, {"test_job": handler}):
+            job = job_utils.enqueue_job("test_job")
+        self.assertEqual(job.status, "FAILED")
+        self.assertIn("RuntimeError: boom", job.errors)
+
+    @override_settings(BACKGROUND_JOBS_EAGER=False)
+    def test_job_submitted_after_commit(self):
+        with patch.dict(job_utils.JOB_HANDLERS, {"test_job": lambda job, progress: None}), \
+                patch.object(job_utils, "_get_executor") as mock_executor:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                job = job_utils.enqueue_job("test_job")
+            # コミットまではワーカーに渡さない
+            mock_executor.return_value.submit.assert_not_called()
+            for callback in callbacks:
+                callback()
+        mock_executor.return_value.submit.assert_called_once_with(job_utils._run_in_worker, job.pk)
+
+    def test_fail_interrupted_jobs(self):
+        queued = BackgroundJob.objects.create(kind="update_artist_images")
+        running = BackgroundJob.objects.create(kind="update_artist_images", status="RUNNING")
+        done = BackgroundJob.objects.create(kind="update_artist_images", status="DONE")
+        out = StringIO()
+        call_command("fail_interrupted_jobs", stdout=out)
+        self.assertIn("2 件", out.getvalue())
+        for job in (queued, running, done):
+            job.refresh_from_db()
+        self.assertEqual((queued.status, running.status, done.status), ("FAILED", "FAILED", "DONE"))
+        self.assertIsNotNone(running.finished_at)
+        self.assertIn("再起動", running.errors[0])
+
+    def test_unknown_job_kind(self):
+        with self.assertRaises(ValueError):
+            job_utils.enqueue_job("unknown")
+
+    def test_job_status_json(self):
+        job = BackgroundJob.objects.create(
+            kind="update_artist_images", status="RUNNING", total=100, done=25,
+            started_at=timezone.now() - timedelta(seconds=10)
+        )
+        response = self.client.get(reverse("festival:job_status", args=[job.id]))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data["done"], data["total"]), (25, 100))
+        self.assertAlmostEqual(data["eta_seconds"], 30, delta=2)
+        self.assertIsNone(data["result"])
+
+    def test_job_detail_page(self):
+        job = BackgroundJob.objects.create(
+            kind="bulk_artist_register", status="DONE", total=1, done=1,
+            result={"report": [{"name": "Aimer", "status": "created", "artist_name": "Aimer", "message": ""}]}
+        )
+        response = self.client.get(reverse("festival:job_detail", args=[job.id]))
+        self.assertContains(response, "1 件登録、0 件スキップ")
+        self.assertContains(response, "Aimer")
@@ -0,0 +1,102 @@
+from datetime import date, time
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from festival.models import Artist, Event, EventDay, Performance, Stage
+from festival.utils.lineup_utils import save_performance_times, sync_lineup
+
+
+class SyncLineupTest(TestCase):
+    def setUp(self):
+        event = Event.objects.create(
+            name="Test Fes", start_date=date(2025, 11, 1), end_date=date(2025, 11, 2), event_type="FES"
+        )
+        self.event_day = EventDay.objects.create(event=event, date="2025-11-01", venue="Tokyo")
+        self.stage = Stage.objects.create(event=event, name="Main", order=1)
+        self.a, self.b, self.c = Artist.objects.bulk_create([
+            Artist(name=name, spotify_id=name) for name in ("A", "B", "C")
+        ])
+        Performance.objects.create(
+            event_day=self.event_day, artist=self.a, stage=self.stage,
+            start_time=time(12, 0), end_time=time(12, 30),
+        )
+        Performance.objects.create(event_day=self.event_day, artist=self.b)
+
+    def test_sync_applies_only_the_difference(self):
+        # SAVEPOINT・現在の出演者の取得・削除（対象の取得＋DELETE）・一括追加・RELEASE
+        with self.assertNumQueries(6), \
+                patch("festival.utils.lineup_utils.invalidate_timetable_cache") as mock_invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                result = sync_lineup(self.event_day, [self.a, self.c])
+
+        self.assertEqual(result, {"added": 1, "removed": 1, "kept": 1})
+        self.assertCountEqual(
+            self.event_day.performance_set.values_list("artist__name", flat=True), ["A", "C"]
+        )
+        kept = Performance.objects.get(event_day=self.event_day, artist=self.a)
+        self.assertEqual((kept.stage, kept.start_time), (self.stage, time(12, 0)))
+        mock_invalidate.assert_called_once_with([self.event_day.pk])
+
+    def test_sync_without_changes_writes_nothing(self):
+        # SAVEPOINT・現在の出演者の取得・RELEASE
+        with self.assertNumQueries(3):
+            result = sync_lineup(self.event_day, [self.a.pk, self.b.pk])
+        self.assertEqual(result, {"added": 0, "removed": 0, "kept": 2})
+
+
+class SavePerformanceTimesTest(TestCase):
+    def setUp(self):
+        event = Event.objects.create(
+            name="Test Fes", start_date=date(2025, 11, 1), end_date=date(2025, 11, 2), event_type="FES"
+        )
+        self.event_day = EventDay.objects.create(event=event, date="2025-11-01", venue="Tokyo")
+        self.stage = Stage.objects.create(event=event, name="Main", order=1)
+        self.artists = Artist.objects.bulk_create([
+            Artist(name=f"Artist {i}", spotify_id=f"id{i}") for i in range(30)
+        ])
+        Performance.objects.bulk_create([
+            Performance(event_day=self.event_day, artist=artist) for artist in self.artists[:20]
+        ])
+
+    def test_saves_in_constant_queries(self):
+        # 10:00 から 10分おきに 5分ずつ
+        times = [
+            (str(artist.pk), f"{10 + i // 6:02d}:{i % 6 * 10:02d}", f"{10 + i // 6:02d}:{i % 6 * 10 + 5:02d}")
+            for i, artist in enumerate(self.artists)
+        ]
+        # 出演の取得・未登録アーティストの取得・SAVEPOINT・一括更新・一括作成・RELEASE
+        with self.assertNumQueries(6), \
+                patch("festival.utils.lineup_utils.invalidate_timetable_cache") as mock_invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                errors = save_performance_times(self.event_day, self.stage, times)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            Performance.objects.filter(event_day=self.event_day, stage=self.stage, start_time__isnull=False).count(), 30
+        )
+        last = Performance.objects.get(event_day=self.event_day, artist=self.artists[-1])
+        self.assertEqual((last.start_time, last.end_time), (time(14, 50), time(14, 55)))
+        mock_invalidate.assert_called_once_with([self.event_day.pk])
+
+    def test_errors_save_nothing(self):
+        a, b, c = self.artists[:3]
+        Performance.objects.filter(artist=c).update(stage=self.stage, start_time=time(13, 0), end_time=time(14, 0))
+        errors = save_performance_times(self.event_day, self.stage, [
+            (a.pk, "12:00", "12:40"),
+            (b.pk, "12:30", "13:10"),  # a・c と重なる
+        ])
+        self.assertEqual(errors, [
+            "Artist 0 と Artist 1 の出演時間が「Main」で重なっています。",
+            "Artist 1 と Artist 2 の出演時間が「Main」で重なっています。",
+        ])
+        self.assertFalse(Performance.objects.filter(artist__in=[a, b], start_time__isnull=False).exists())
+
+        errors = save_performance_times(self.event_day, None, [
+            (a.pk, "14:00", "13:00"), (b.pk, "25:00", ""), (999999, "", ""),
+        ])
+        self.assertEqual(errors, [
+            "Artist 0 の開始時間は終了時間より前である必要があります。",
+            "Artist 1 の出演時間の形式が正しくありません。",
+            "ID 999999 のアーティストが見つかりません。",
+        ])
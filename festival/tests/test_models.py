@@ -1,4 +1,9 @@
-from django.test import TestCase
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
 from datetime import date, time
 from festival.models import Event, Artist, EventDay, Stage, Performance
 from django.db.utils import IntegrityError
@@ -52,4 +57,62 @@ class ModelTests(TestCase):
 
     def test_performance_unique_together(self):
         with self.assertRaises(IntegrityError):
-            Performance.objects.create(event_day=self.event_day, artist=self.artist)
\ No newline at end of file
+            Performance.objects.create(event_day=self.event_day, artist=self.artist)
+
+    def test_artist_initial_group_saved(self):
+        artist = Artist.objects.create(name="Aimer", spotify_id="xyz789", furigana="えめ")
+        self.assertEqual(Artist.objects.get(pk=artist.pk).initial_group, "あ")
+        artist.furigana = "かたかな"
+        artist.save(update_fields=["furigana"])
+        self.assertEqual(Artist.objects.get(pk=artist.pk).initial_group, "か")
+
+    def test_artist_save_skips_reading_conversion_for_other_fields(self):
+        with patch("festival.models.get_initial_group") as mock_group, \
+                patch("festival.models.get_romaji") as mock_romaji:
+            self.artist.popularity = 80
+            self.artist.save(update_fields=["popularity"])
+        mock_group.assert_not_called()
+        mock_romaji.assert_not_called()
+        self.assertEqual(Artist.objects.get(pk=self.artist.pk).popularity, 80)
+
+    def test_artist_initial_group_bulk_create_and_update(self):
+        Artist.objects.bulk_create([Artist(name="King Gnu", spotify_id="def456", furigana="きんぐぬー")])
+        artist = Artist.objects.get(spotify_id="def456")
+        self.assertEqual(artist.initial_group, "か")
+        artist.furigana = "さざん"
+        Artist.objects.bulk_update([artist], ["furigana"])
+        self.assertEqual(Artist.objects.get(pk=artist.pk).initial_group, "さ")
+
+    def test_backfill_initial_group_command(self):
+        Artist.objects.filter(pk=self.artist.pk).update(initial_group="")
+        out = StringIO()
+        call_command("backfill_initial_group", stdout=out)
+        self.assertEqual(Artist.objects.get(pk=self.artist.pk).initial_group, "Y")
+        self.assertIn("1 件の頭文字グループ・ローマ字を更新", out.getvalue())
+
+
+class InitialGroupMigrationTest(TransactionTestCase):
+    before = [('festival', '0014_backgroundjob')]
+    after = [('festival', '0015_artist_initial_group')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        # 最新のスキーマに戻す
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_existing_artists_backfilled(self):
+        apps = self.migrate(self.before)
+        Artist = apps.get_model('festival', 'Artist')
+        Artist.objects.create(name="YOASOBI", furigana="よあそび", spotify_id="a")
+        Artist.objects.create(name="Aimer", furigana="", spotify_id="b")
+
+        apps = self.migrate(self.after)
+        Artist = apps.get_model('festival', 'Artist')
+        groups = dict(Artist.objects.values_list('spotify_id', 'initial_group'))
+        self.assertEqual(groups, {"a": "や", "b": "A"})
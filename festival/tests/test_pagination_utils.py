@@ -0,0 +1,49 @@
+from django.test import TestCase
+
+from festival.models import Artist
+from festival.utils.pagination_utils import (
+    decode_cursor, encode_cursor, keyset_paginate, parse_page_size,
+)
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        # 同じふりがなを含めて id で一意に並ぶことを確認する
+        Artist.objects.bulk_create([
+            Artist(name=f"Artist {n}", furigana="おなじ" if n < 3 else f"べつ{n}", spotify_id=f"id{n}")
+            for n in range(6)
+        ])
+
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor(["よあそび", 12])
+        self.assertEqual(decode_cursor(cursor, 2), ["よあそび", 12])
+        with self.assertRaises(ValueError):
+            decode_cursor(cursor, 3)
+        with self.assertRaises(ValueError):
+            decode_cursor("!!!", 2)
+
+    def test_cursor_with_wrong_types_rejected(self):
+        for values in (["おなじ", "abc"], ["おなじ", [1]], ["おなじ", None], [{"a": 1}, 1]):
+            with self.subTest(values=values), self.assertRaises(ValueError):
+                keyset_paginate(Artist.objects.all(), ["furigana", "id"], cursor=encode_cursor(values))
+        # 数字の文字列は id に変換できるので受け付ける
+        page = keyset_paginate(Artist.objects.all(), ["furigana", "id"], cursor=encode_cursor(["おなじ", "1"]))
+        self.assertTrue(page.items)
+
+    def test_parse_page_size(self):
+        self.assertEqual(parse_page_size(None), 50)
+        self.assertEqual(parse_page_size("0"), 1)
+        self.assertEqual(parse_page_size("100000"), 200)
+
+    def test_walks_all_pages_without_gaps(self):
+        expected = list(Artist.objects.order_by("furigana", "id").values_list("pk", flat=True))
+        seen = []
+        cursor = None
+        while True:
+            with self.assertNumQueries(1):
+                page = keyset_paginate(Artist.objects.all(), ["furigana", "id"], cursor=cursor, page_size=2)
+            seen += [a.pk for a in page.items]
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, expected)
@@ -1,12 +1,14 @@
 from unittest import skip
+from unittest.mock import patch
 
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.contrib.auth.models import User
 from django.urls import reverse
 from datetime import date, time, datetime, timedelta
 
 from festival.models import Event, EventDay, Artist, Performance, Stage
-from festival.views.performance_views import generate_time_slots
+from festival.utils.timetable_utils import build_timetable_grid
 
 class PerformanceViewsTest(TestCase):
     @classmethod
@@ -24,6 +26,7 @@ class PerformanceViewsTest(TestCase):
         cls.stage = Stage.objects.create(event=cls.event, name="Main", order=1)
 
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.client.login(username='admin', password='pass')
 
@@ -63,6 +66,23 @@ class PerformanceViewsTest(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertEqual(self.event_day.performance_set.count(), 1)
 
+    def test_edit_event_day_post_keeps_timetable(self):
+        Performance.objects.filter(pk=self.performance.pk).update(
+            stage=self.stage, start_time=time(12, 0), end_time=time(13, 0)
+        )
+        other = Artist.objects.create(name="Aimer", spotify_id="aimer1")
+        url = reverse("festival:edit_event_day_performances", args=[self.event_day.id])
+        data = {
+            "event": self.event.id,
+            "date": "2025-11-18",
+            "venue": "Test Venue",
+            "artists": [self.artist.id, other.id]
+        }
+        self.client.post(url, data)
+        kept = Performance.objects.get(pk=self.performance.pk)
+        self.assertEqual((kept.stage, kept.start_time), (self.stage, time(12, 0)))
+        self.assertEqual(self.event_day.performance_set.count(), 2)
+
     def test_paste_schedule_register_post(self):
         url = reverse("festival:paste_schedule_register")
         raw_text = "2025-11-18 Zepp Tokyo\n2025-11-19 Zepp Osaka"
@@ -75,6 +95,19 @@ class PerformanceViewsTest(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertEqual(EventDay.objects.filter(event__name="Tour 2025").count(), 2)
 
+    def test_paste_schedule_register_shows_diagnostics(self):
+        url = reverse("festival:paste_schedule_register")
+        data = {
+            "artist": self.artist.id,
+            "event_name": "Tour 2025",
+            "raw_text": "2025-11-18 Zepp Tokyo\nTBA",
+        }
+        response = self.client.post(url, data)
+        # 読み取れない行があれば登録結果と一緒に同じ画面を再表示する
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "日付を読み取れません")
+        self.assertEqual(EventDay.objects.filter(event__name="Tour 2025").count(), 1)
+
     def test_register_timetable_get(self):
         url = reverse("festival:register_timetable") + f"?event_day={self.event_day.id}"
         response = self.client.get(url)
@@ -96,6 +129,59 @@ class PerformanceViewsTest(TestCase):
         self.assertEqual(perf.start_time, time(12, 0))
         self.assertEqual(perf.end_time, time(13, 0))
 
+    def test_register_timetable_post_query_count(self):
+        artists = Artist.objects.bulk_create([
+            Artist(name=f"Band {i}", spotify_id=f"band{i}") for i in range(40)
+        ])
+        Performance.objects.bulk_create([Performance(event_day=self.event_day, artist=a) for a in artists])
+        url = reverse("festival:register_timetable") + f"?event_day={self.event_day.id}"
+        data = {"selected_artists": [a.id for a in artists], "selected_stage": self.stage.id, "save_times": "1"}
+        for i, artist in enumerate(artists):
+            data[f"start_{artist.id}"] = f"{10 + i // 6:02d}:{i % 6 * 10:02d}"
+            data[f"end_{artist.id}"] = f"{10 + i // 6:02d}:{i % 6 * 10 + 5:02d}"
+        # 出演者数によらず一定（セッション・ユーザー・EventDay・ステージ・出演の取得、
+        # SAVEPOINT×2・一括更新・RELEASE×2）
+        with self.assertNumQueries(10):
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            Performance.objects.filter(event_day=self.event_day, stage=self.stage, start_time__isnull=False).count(), 40
+        )
+
+    def test_register_timetable_prepare_times_query_count(self):
+        artists = Artist.objects.bulk_create([
+            Artist(name=f"Band {i}", spotify_id=f"band{i}") for i in range(40)
+        ])
+        Performance.objects.bulk_create([Performance(event_day=self.event_day, artist=a) for a in artists])
+        url = reverse("festival:register_timetable") + f"?event_day={self.event_day.id}"
+        data = {"selected_artists": [a.id for a in artists], "prepare_times": "1"}
+        # 時間入力欄のアーティストは id_map から引くので選択数によらず一定
+        # （セッション・ユーザー・EventDay・アーティスト・EventDay一覧・ステージ）
+        with self.assertNumQueries(6):
+            response = self.client.post(url, data)
+        self.assertContains(response, 'name="start_', count=40)
+        self.assertContains(response, "<h5>Band 39</h5>", html=True)
+
+    def test_register_timetable_post_overlap(self):
+        other = Artist.objects.create(name="Ado", spotify_id="ado")
+        Performance.objects.create(
+            event_day=self.event_day, artist=other, stage=self.stage, start_time=time(12, 30), end_time=time(13, 30)
+        )
+        url = reverse("festival:register_timetable") + f"?event_day={self.event_day.id}"
+        data = {
+            "selected_artists": [self.artist.id],
+            "new_stage_name": "",
+            "selected_stage": self.stage.id,
+            "save_times": "1",
+            f"start_{self.artist.id}": "12:00",
+            f"end_{self.artist.id}": "13:00"
+        }
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "出演時間が「Main」で重なっています")
+        self.performance.refresh_from_db()
+        self.assertIsNone(self.performance.start_time)
+
     def test_register_timetable_post_invalid_time(self):
         url = reverse("festival:register_timetable") + f"?event_day={self.event_day.id}"
         data = {
@@ -149,14 +235,9 @@ class PerformanceViewsTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "開始時間は終了時間より前である必要があります")
 
-    def test_generate_time_slots(self):
-        slots = generate_time_slots(time(12, 0), time(13, 0), interval_minutes=15)
-        self.assertEqual(len(slots), 4)
-        self.assertEqual(slots[0], time(12, 0))
-        self.assertEqual(slots[-1], time(12, 45))
-
 class PerformanceViewTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.user = User.objects.create_user(username="testuser", password="pass")
         self.staff = User.objects.create_user(username="staffuser", password="pass", is_staff=True)
@@ -194,3 +275,162 @@ class PerformanceViewTests(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "タイムテーブル")
+        self.assertContains(response, 'rowspan="12"')
+
+    def test_timetable_view_without_stage_or_day(self):
+        event_day = EventDay.objects.create(event=self.event, date="2025-11-19", venue="Test Venue")
+        Performance.objects.create(
+            artist=self.artist, event_day=event_day, start_time=time(23, 30), end_time=time(0, 30)
+        )
+        response = self.client.get(reverse("festival:timetable_view") + f"?event_day={event_day.id}")
+        self.assertContains(response, "ステージ未定")
+        self.assertContains(response, "YOASOBI")
+
+        response = self.client.get(reverse("festival:timetable_view"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_timetable_view_is_cached_until_changed(self):
+        event_day = EventDay.objects.create(event=self.event, date="2025-11-18", venue="Test Venue")
+        performance = Performance.objects.create(
+            artist=self.artist, stage=self.stage, event_day=event_day,
+            start_time=time(12, 0), end_time=time(13, 0),
+        )
+        url = reverse("festival:timetable_view") + f"?event_day={event_day.id}"
+        with patch("festival.utils.timetable_utils.build_timetable_grid",
+                   wraps=build_timetable_grid) as mock_build:
+            self.client.get(url)
+            response = self.client.get(url)
+            self.assertEqual(mock_build.call_count, 1)
+            self.assertContains(response, "12:00 - 13:00")
+
+            performance.end_time = time(13, 30)
+            performance.save()
+            response = self.client.get(url)
+            self.assertEqual(mock_build.call_count, 2)
+            self.assertContains(response, "12:00 - 13:30")
+
+            self.stage.name = "Renamed"
+            self.stage.save()
+            response = self.client.get(url)
+            self.assertEqual(mock_build.call_count, 3)
+            self.assertContains(response, "Renamed")
+
+            performance.delete()
+            response = self.client.get(url)
+            self.assertEqual(mock_build.call_count, 4)
+            self.assertNotContains(response, "YOASOBI")
+
+    def test_timetable_cache_refreshed_when_artist_renamed(self):
+        event_day = EventDay.objects.create(event=self.event, date="2025-11-18", venue="Test Venue")
+        Performance.objects.create(
+            artist=self.artist, stage=self.stage, event_day=event_day,
+            start_time=time(12, 0), end_time=time(13, 0),
+        )
+        url = reverse("festival:timetable_view") + f"?event_day={event_day.id}"
+        self.assertContains(self.client.get(url), "YOASOBI")
+
+        self.artist.name = "ヨアソビ"
+        self.artist.save()
+        self.assertContains(self.client.get(url), "ヨアソビ")
+
+        self.artist.delete()
+        self.assertNotContains(self.client.get(url), "ヨアソビ")
+
+    def test_timetable_cache_invalidated_for_previous_day_when_moved(self):
+        day1 = EventDay.objects.create(event=self.event, date="2025-11-18", venue="Test Venue")
+        day2 = EventDay.objects.create(event=self.event, date="2025-11-19", venue="Test Venue")
+        Performance.objects.create(
+            artist=self.artist, stage=self.stage, event_day=day1,
+            start_time=time(12, 0), end_time=time(13, 0),
+        )
+        url1 = reverse("festival:timetable_view") + f"?event_day={day1.id}"
+        self.assertContains(self.client.get(url1), "YOASOBI")
+
+        # 別のインスタンスとして読み込み直して日程を移す
+        performance = Performance.objects.get(artist=self.artist)
+        performance.event_day = day2
+        performance.save()
+        self.assertNotContains(self.client.get(url1), "YOASOBI")
+
+    def test_timetable_json_refreshed_when_event_day_changed(self):
+        event_day = EventDay.objects.create(event=self.event, date="2025-11-18", venue="Test Venue")
+        url = reverse("festival:timetable_json", args=[event_day.id])
+        self.assertEqual(self.client.get(url).json()["event_day"]["venue"], "Test Venue")
+
+        event_day.venue = "New Venue"
+        event_day.save()
+        self.assertEqual(self.client.get(url).json()["event_day"]["venue"], "New Venue")
+
+    def test_timetable_cache_is_separate_for_staff(self):
+        event_day = EventDay.objects.create(event=self.event, date="2025-11-18", venue="Test Venue")
+        Performance.objects.create(
+            artist=self.artist, stage=self.stage, event_day=event_day,
+            start_time=time(12, 0), end_time=time(13, 0),
+        )
+        url = reverse("festival:timetable_view") + f"?event_day={event_day.id}"
+        self.assertNotContains(self.client.get(url), "編集")
+        self.client.login(username="staffuser", password="pass")
+        self.assertContains(self.client.get(url), "編集")
+
+    def test_timetable_json_payload(self):
+        event_day = EventDay.objects.create(event=self.event, date="2025-11-18", venue="Test Venue")
+        other = Artist.objects.create(name="Aimer", spotify_id="aimer1")
+        Performance.objects.create(
+            artist=self.artist, stage=self.stage, event_day=event_day,
+            start_time=time(12, 0), end_time=time(13, 0),
+        )
+        Performance.objects.create(
+            artist=other, event_day=event_day, start_time=time(23, 30), end_time=time(0, 15),
+        )
+        response = self.client.get(reverse("festival:timetable_json", args=[event_day.id]))
+        self.assertEqual(response["Content-Type"], "application/json")
+        data = response.json()
+        self.assertEqual(data["origin"], "12:00")
+        self.assertEqual(data["stages"]["name"], ["Main"])
+        self.assertEqual(data["artists"]["name"], ["YOASOBI", "Aimer"])
+        self.assertEqual(data["performances"]["artist"], [0, 1])
+        self.assertEqual(data["performances"]["stage"], [0, -1])
+        self.assertEqual(data["performances"]["start"], [0, 690])
+        self.assertEqual(data["performances"]["end"], [60, 735])
+
+    def test_timetable_json_etag_and_gzip(self):
+        import gzip
+        import json
+
+        event_day = EventDay.objects.create(event=self.event, date="2025-11-18", venue="Test Venue")
+        performance = Performance.objects.create(
+            artist=self.artist, stage=self.stage, event_day=event_day,
+            start_time=time(12, 0), end_time=time(13, 0),
+        )
+        url = reverse("festival:timetable_json", args=[event_day.id])
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(response.content))["artists"]["name"], ["YOASOBI"])
+        etag = response["ETag"]
+
+        # キャッシュ済みなら304はDBアクセスなし
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        performance.start_time = time(12, 30)
+        performance.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_timetable_json_respects_gzip_quality(self):
+        event_day = EventDay.objects.create(event=self.event, date="2025-11-18", venue="Test Venue")
+        url = reverse("festival:timetable_json", args=[event_day.id])
+        for header, gzipped in [
+            ("gzip;q=0", False), ("gzip; q=0.0, deflate", False), ("deflate, *;q=0", False),
+            ("GZIP;q=0.5", True), ("*", True), ("identity", False), ("", False),
+        ]:
+            with self.subTest(header=header):
+                response = self.client.get(url, HTTP_ACCEPT_ENCODING=header)
+                self.assertEqual(response.has_header("Content-Encoding"), gzipped)
+                self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_timetable_json_not_found(self):
+        response = self.client.get(reverse("festival:timetable_json", args=[9999]))
+        self.assertEqual(response.status_code, 404)
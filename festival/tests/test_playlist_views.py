@@ -4,6 +4,7 @@ from django.test import TestCase, Client
 from django.urls import reverse
 from festival.models import EventDay, Event, Artist, Performance, Stage
 from unittest.mock import patch
+from festival.utils.spotify_utils import PlaylistPartiallySavedError
 
 class TestPlaylistViews(TestCase):
     def setUp(self):
@@ -39,8 +40,10 @@ class TestPlaylistViews(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "予習リスト")
 
-    @patch("festival.views.playlist_views.get_top_tracks", return_value=[
-        {"name": "Track A", "artist": "YOASOBI", "spotify_url": "http://spotify.com/trackA", "uri": "spotify:track:abc"}
+    @patch("festival.views.playlist_views.get_cached_top_tracks_many", return_value=[
+        {"spotify_id": "123", "error": None, "tracks": [
+            {"name": "Track A", "artist": "YOASOBI", "spotify_url": "http://spotify.com/trackA", "uri": "spotify:track:abc"}
+        ]}
     ])
     def test_create_playlist_view_post(self, mock_tracks):
         url = reverse("festival:create_playlist")
@@ -53,6 +56,29 @@ class TestPlaylistViews(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("Track A", response.content.decode())
 
+    @patch("festival.views.playlist_views.get_cached_top_tracks_many")
+    def test_create_playlist_view_post_partial_failure(self, mock_tracks):
+        other = Artist.objects.create(name="Aimer", spotify_id="456")
+        Performance.objects.create(event_day=self.event_day, artist=other)
+        mock_tracks.side_effect = lambda ids: [
+            {"spotify_id": i, "error": "Spotify API接続エラー" if i == "456" else None,
+             "tracks": [] if i == "456" else [
+                 {"name": "Track A", "artist": "YOASOBI", "spotify_url": "http://spotify.com/trackA", "uri": "spotify:track:abc"}
+             ]}
+            for i in ids
+        ]
+        url = reverse("festival:create_playlist")
+        data = {
+            "event_day": self.event_day.id,
+            "artists": [self.artist.id, other.id],
+            "track_count": 1
+        }
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn("Track A", content)
+        self.assertIn("曲を取得できませんでした: Aimer", content)
+
     @patch("festival.views.playlist_views.save_playlist_to_spotify", return_value="http://spotify.com/playlist123")
     def test_save_playlist_success(self, mock_save):
         session = self.client.session
@@ -70,4 +96,23 @@ class TestPlaylistViews(TestCase):
             "event_day": self.event_day.id
         }
         response = self.client.post(url, data)
-        self.assertRedirects(response, reverse("festival:create_playlist") + f"?event_day={self.event_day.id}")
\ No newline at end of file
+        self.assertRedirects(response, reverse("festival:create_playlist") + f"?event_day={self.event_day.id}")
+    @patch("festival.views.playlist_views.SpotifyOAuth")
+    @patch("festival.views.playlist_views.save_playlist_to_spotify")
+    def test_save_playlist_partially_saved(self, mock_save, mock_oauth):
+        mock_oauth.return_value.is_token_expired.return_value = False
+        mock_save.side_effect = PlaylistPartiallySavedError(
+            "楽曲追加失敗", added_count=100, playlist_url="http://spotify.com/playlist123"
+        )
+        session = self.client.session
+        session["spotify_token_info"] = {"access_token": "dummy_token", "refresh_token": "dummy_refresh"}
+        session.save()
+
+        url = reverse("festival:save_playlist_to_spotify")
+        data = {"track_uris": "spotify:track:abc", "playlist_name": "Test Playlist", "event_day": self.event_day.id}
+        response = self.client.post(url, data, follow=True)
+        # 途中までの曲が入ったプレイリストが残っていることを伝える
+        content = response.content.decode()
+        self.assertIn("楽曲の追加が途中で失敗しました", content)
+        self.assertIn("100曲まで追加済み", content)
+        self.assertIn("http://spotify.com/playlist123", content)
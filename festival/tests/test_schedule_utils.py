@@ -0,0 +1,71 @@
+from datetime import date
+
+from django.test import SimpleTestCase, TestCase
+
+from festival.models import Artist, Event, EventDay, Performance
+from festival.utils.schedule_utils import import_tour_schedule, parse_schedule, summarize_schedule_import
+
+
+class ParseScheduleTest(SimpleTestCase):
+    def parse(self, text, today=date(2025, 10, 1)):
+        return list(parse_schedule(text, today=today))
+
+    def test_date_formats(self):
+        rows = self.parse(
+            "2025-11-10 Zepp Tokyo\n"
+            "2025/11/12 名古屋ダイアモンドホール\n"
+            "2025年11月14日 なんばHatch\n"
+            "11/15(土) Zepp Fukuoka\n"
+            "１１／１６（日）　札幌ペニーレーン２４\n"
+            "\n"
+            "11月21日(木・祝) 仙台PIT\n"
+        )
+        self.assertEqual([r["status"] for r in rows], ["ok"] * 6)
+        self.assertEqual([r["date"].day for r in rows], [10, 12, 14, 15, 16, 21])
+        self.assertEqual(rows[4]["venue"], "札幌ペニーレーン24")
+        self.assertEqual(rows[5]["line"], 7)
+        self.assertTrue(rows[5]["message"])  # 11/21 は木曜ではない
+
+    def test_year_inference(self):
+        rows = self.parse("12/20 A\n1/10 B\n2026/3/1 C\n3/5 D")
+        self.assertEqual(
+            [r["date"] for r in rows],
+            [date(2025, 12, 20), date(2026, 1, 10), date(2026, 3, 1), date(2026, 3, 5)],
+        )
+        # 基準日より半年以上前の月日は翌年とみなす
+        self.assertEqual(self.parse("2/1 A")[0]["date"], date(2026, 2, 1))
+
+    def test_diagnostics(self):
+        rows = self.parse("Zepp Tokyo\n2/30 Somewhere\n11/10\n11/11(東京) Zepp")
+        self.assertEqual([r["status"] for r in rows], ["error", "error", "error", "ok"])
+        self.assertEqual(
+            [r["message"] for r in rows[:3]], ["日付を読み取れません", "存在しない日付です", "会場がありません"]
+        )
+        self.assertEqual(rows[3]["venue"], "(東京) Zepp")
+
+
+class ImportTourScheduleTest(TestCase):
+    def setUp(self):
+        self.artist = Artist.objects.create(name="YOASOBI", spotify_id="abc123")
+
+    def test_import_is_batched_and_idempotent(self):
+        text = "\n".join(f"2025/11/{day} Venue {day}" for day in range(1, 31))
+        # 行数によらず一定（atomic と get_or_create のセーブポイントを含む）
+        with self.assertNumQueries(10):
+            result = import_tour_schedule(self.artist, "Tour 2025", text)
+        self.assertEqual(EventDay.objects.filter(event__name="Tour 2025").count(), 30)
+        self.assertEqual(Performance.objects.filter(artist=self.artist).count(), 30)
+        event = Event.objects.get(name="Tour 2025")
+        self.assertEqual((event.start_date, event.end_date), (date(2025, 11, 1), date(2025, 11, 30)))
+        self.assertIn("30 件の出演日程を登録", summarize_schedule_import(result))
+
+        result = import_tour_schedule(self.artist, "Tour 2025", text + "\n2025/12/01 Extra\n2025/12/01 Extra")
+        statuses = [row["status"] for row in result["rows"]]
+        self.assertEqual(statuses.count("exists"), 30)
+        self.assertEqual(statuses[-2:], ["created", "duplicate"])
+        self.assertEqual(Event.objects.get(name="Tour 2025").end_date, date(2025, 12, 1))
+
+    def test_nothing_valid_creates_nothing(self):
+        result = import_tour_schedule(self.artist, "Tour 2025", "no dates here")
+        self.assertIsNone(result["event"])
+        self.assertFalse(Event.objects.filter(name="Tour 2025").exists())
@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from festival.models import Artist
+from festival.utils.search_utils import (
+    FTS_TABLE, missing_search_index_objects, normalize_query, search_artists, search_terms,
+)
+
+
+class SearchArtistsTest(TestCase):
+    def setUp(self):
+        Artist.objects.bulk_create([
+            Artist(name="YOASOBI", furigana="よあそび", spotify_id="a1"),
+            Artist(name="米津玄師", furigana="よねづけんし", spotify_id="a2"),
+            Artist(name="ヨルシカ", furigana="よるしか", spotify_id="a3"),
+            Artist(name="Yorushika Tribute", furigana="よるしかとりびゅーと", spotify_id="a4"),
+        ])
+
+    def names(self, query, queryset=None):
+        return [a.name for a in search_artists(query, queryset)]
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  ＹＯＡ　ｿﾋﾞ "), "YOA ソビ")
+        self.assertEqual(search_terms("ヨネヅ"), ["ヨネヅ", "よねづ"])
+        self.assertEqual(search_terms(""), [])
+
+    def test_search_by_name_furigana_and_romaji(self):
+        self.assertEqual(self.names("yoasobi"), ["YOASOBI"])
+        self.assertEqual(self.names("米津玄"), ["米津玄師"])
+        self.assertEqual(self.names("よねづ"), ["米津玄師"])
+        self.assertEqual(self.names("yonezu"), ["米津玄師"])
+        self.assertEqual(self.names("ヨネヅ"), ["米津玄師"])
+
+    def test_search_ranks_closer_matches_first(self):
+        self.assertEqual(self.names("yorushika")[0], "ヨルシカ")
+        self.assertCountEqual(self.names("yorushika"), ["ヨルシカ", "Yorushika Tribute"])
+
+    def test_short_query_falls_back_to_partial_match(self):
+        self.assertEqual(self.names("よあ"), ["YOASOBI"])
+        self.assertEqual(self.names("よ")[:1], ["YOASOBI"])
+
+    def test_index_follows_updates_and_deletes(self):
+        artist = Artist.objects.get(spotify_id="a1")
+        artist.furigana = "ぐるーぷ"
+        artist.save()
+        self.assertEqual(self.names("よあそび"), [])
+        self.assertEqual(self.names("ぐるーぷ"), ["YOASOBI"])
+        Artist.objects.filter(spotify_id="a1").delete()
+        self.assertEqual(self.names("YOASOBI"), [])
+
+    def test_search_respects_base_queryset(self):
+        base = Artist.objects.exclude(spotify_id="a3")
+        self.assertEqual(self.names("yorushika", base), ["Yorushika Tribute"])
+
+    def test_search_does_not_interpret_fts_syntax(self):
+        self.assertEqual(self.names('"OR NOT*'), [])
+
+
+class SearchIndexTriggerTest(TestCase):
+    def test_triggers_exist_after_migrations(self):
+        # festival_artist を作り直すマイグレーションを追加するとトリガーが消えてここで失敗する
+        # （そのマイグレーションの後で rebuild_search_index 相当の処理を実行すること）
+        self.assertEqual(missing_search_index_objects(), [])
+
+    def test_rebuild_recreates_dropped_trigger(self):
+        artist = Artist.objects.create(name="YOASOBI", furigana="よあそび", spotify_id="a1")
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TRIGGER {FTS_TABLE}_au")
+        with self.assertRaises(CommandError):
+            call_command("rebuild_search_index", "--check", stdout=StringIO())
+
+        artist.furigana = "ぐるーぷ"
+        artist.save()  # トリガーがないのでインデックスは古いまま
+        self.assertEqual(list(search_artists("ぐるーぷ")), [])
+
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn(f"{FTS_TABLE}_au", out.getvalue())
+        self.assertEqual(missing_search_index_objects(), [])
+        self.assertEqual([a.name for a in search_artists("ぐるーぷ")], ["YOASOBI"])
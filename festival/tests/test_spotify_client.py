@@ -0,0 +1,149 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import requests
+from festival.utils.spotify_client import RetryAfterTooLong, SpotifyClient, TokenBucket
+
+
+class TestSpotifyClient(unittest.TestCase):
+    def setUp(self):
+        self.client = SpotifyClient(pool_size=4, timeout=3, max_retries=0)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_pool_size_applied(self):
+        adapter = self.client.session.get_adapter("https://api.spotify.com/v1/search")
+        self.assertEqual(adapter._pool_maxsize, 4)
+
+    def test_default_timeout_applied(self):
+        with patch.object(self.client.session, "request", return_value=MagicMock()) as mock_request:
+            self.client.get("https://api.spotify.com/v1/search")
+            self.assertEqual(mock_request.call_args.kwargs["timeout"], 3)
+
+    def test_explicit_timeout_kept(self):
+        with patch.object(self.client.session, "request", return_value=MagicMock()) as mock_request:
+            self.client.get("https://api.spotify.com/v1/search", timeout=1)
+            self.assertEqual(mock_request.call_args.kwargs["timeout"], 1)
+
+    def test_stats_per_endpoint(self):
+        with patch.object(self.client.session, "request", return_value=MagicMock()):
+            self.client.get("https://api.spotify.com/v1/search", endpoint="search")
+            self.client.get("https://api.spotify.com/v1/search", endpoint="search")
+            self.client.get("https://api.spotify.com/v1/me")
+        stats = self.client.stats()
+        self.assertEqual(stats["search"]["count"], 2)
+        self.assertEqual(stats["GET /v1/me"]["count"], 1)
+        self.assertGreaterEqual(stats["search"]["max_time"], stats["search"]["avg_time"])
+
+    def test_stats_count_errors(self):
+        with patch.object(self.client.session, "request", side_effect=requests.exceptions.Timeout()):
+            with self.assertRaises(requests.exceptions.Timeout):
+                self.client.get("https://api.spotify.com/v1/search", endpoint="search")
+        self.assertEqual(self.client.stats()["search"]["errors"], 1)
+
+
+def make_response(status_code, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+class TestSpotifyClientRetry(unittest.TestCase):
+    def setUp(self):
+        self.sleeps = []
+        self.client = SpotifyClient(max_retries=3, sleep=self.sleeps.append)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_429_honours_retry_after(self):
+        responses = [make_response(429, {"Retry-After": "2"}), make_response(200)]
+        with patch.object(self.client.session, "request", side_effect=responses) as mock_request:
+            response = self.client.get("https://api.spotify.com/v1/search")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(self.sleeps, [2.0])
+        stats = self.client.throttle_stats()
+        self.assertEqual(stats["rate_limited"], 1)
+        self.assertEqual(stats["throttled_time"], 2.0)
+
+    def test_429_retry_after_over_cap_raises_without_sleeping(self):
+        client = SpotifyClient(max_retries=3, backoff_max=30, rate_limit=10, sleep=self.sleeps.append)
+        self.addCleanup(client.close)
+        responses = [make_response(429, {"Retry-After": "3600"}), make_response(200)]
+        with patch.object(client.session, "request", side_effect=responses) as mock_request:
+            with self.assertRaises(RetryAfterTooLong) as ctx:
+                client.get("https://api.spotify.com/v1/search")
+        self.assertIsInstance(ctx.exception, requests.exceptions.RequestException)
+        self.assertEqual(ctx.exception.retry_after, 3600.0)
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertEqual(self.sleeps, [])
+        # レートリミッタも止めていない（他のリクエストはすぐ通る）
+        self.assertEqual(client.limiter.acquire(), 0.0)
+
+    def test_429_retried_for_post(self):
+        responses = [make_response(429, {"Retry-After": "1"}), make_response(201)]
+        with patch.object(self.client.session, "request", side_effect=responses):
+            response = self.client.post("https://api.spotify.com/v1/playlists/p/tracks", json={})
+        self.assertEqual(response.status_code, 201)
+
+    def test_get_retries_5xx_with_backoff(self):
+        responses = [make_response(503), make_response(502), make_response(200)]
+        with patch.object(self.client.session, "request", side_effect=responses):
+            response = self.client.get("https://api.spotify.com/v1/artists")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.sleeps), 2)
+        # ジッター付きでも上限（base * 2^attempt）は超えない
+        self.assertLessEqual(self.sleeps[0], 0.5)
+        self.assertLessEqual(self.sleeps[1], 1.0)
+
+    def test_get_retries_connection_error(self):
+        side_effect = [requests.exceptions.ConnectionError("reset"), make_response(200)]
+        with patch.object(self.client.session, "request", side_effect=side_effect):
+            self.assertEqual(self.client.get("https://api.spotify.com/v1/me").status_code, 200)
+
+    def test_post_not_retried_on_5xx(self):
+        with patch.object(self.client.session, "request", return_value=make_response(503)) as mock_request:
+            response = self.client.post("https://api.spotify.com/v1/users/u/playlists", json={})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(mock_request.call_count, 1)
+
+    def test_post_retries_5xx_when_allowed(self):
+        responses = [make_response(503), make_response(201)]
+        with patch.object(self.client.session, "request", side_effect=responses) as mock_request:
+            response = self.client.post(
+                "https://api.spotify.com/v1/playlists/p/tracks", json={}, retry_server_errors=True
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(len(self.sleeps), 1)
+
+    def test_post_with_retry_server_errors_not_resent_after_connection_error(self):
+        side_effect = [requests.exceptions.ConnectionError("reset"), make_response(201)]
+        with patch.object(self.client.session, "request", side_effect=side_effect) as mock_request:
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                self.client.post("https://api.spotify.com/v1/playlists/p/tracks", json={}, retry_server_errors=True)
+        self.assertEqual(mock_request.call_count, 1)
+
+    def test_gives_up_after_max_retries(self):
+        with patch.object(self.client.session, "request", return_value=make_response(429)) as mock_request:
+            response = self.client.get("https://api.spotify.com/v1/search")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(mock_request.call_count, 4)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_wait(self):
+        sleeps = []
+        bucket = TokenBucket(rate=10, capacity=2, sleep=sleeps.append)
+        self.assertEqual(bucket.acquire(), 0.0)
+        self.assertEqual(bucket.acquire(), 0.0)
+        waited = bucket.acquire()
+        self.assertGreater(waited, 0)
+        self.assertLessEqual(sleeps[0], 0.1 + 1e-6)
+
+    def test_pause_blocks_acquire(self):
+        bucket = TokenBucket(rate=10, capacity=5)
+        bucket.pause(0.05)
+        self.assertGreaterEqual(bucket.acquire(), 0.04)
@@ -1,3 +1,5 @@
+import threading
+import time
 import unittest
 from unittest.mock import patch, MagicMock
 import requests
@@ -8,44 +10,92 @@ from festival.utils import spotify_utils
 class TestSpotifyUtils(unittest.TestCase):
     def setUp(self):
         self.factory = RequestFactory()
+        spotify_utils.app_token_cache.clear()
 
     # get_app_token
-    @patch("festival.utils.spotify_utils.requests.post")
+    @patch("festival.utils.spotify_utils.spotify_client.post")
     def test_get_app_token_success(self, mock_post):
         mock_post.return_value.status_code = 200
         mock_post.return_value.json.return_value = {"access_token": "token"}
         self.assertEqual(spotify_utils.get_app_token(), "token")
 
-    @patch("festival.utils.spotify_utils.requests.post")
+    @patch("festival.utils.spotify_utils.spotify_client.post")
     def test_get_app_token_http_error(self, mock_post):
         mock_post.return_value.status_code = 400
         mock_post.return_value.text = "Bad Request"
         self.assertIsNone(spotify_utils.get_app_token())
 
-    @patch("festival.utils.spotify_utils.requests.post")
+    @patch("festival.utils.spotify_utils.spotify_client.post")
     def test_get_app_token_json_error(self, mock_post):
         mock_post.return_value.status_code = 200
         mock_post.return_value.json.side_effect = ValueError()
         self.assertIsNone(spotify_utils.get_app_token())
 
-    @patch("festival.utils.spotify_utils.requests.post")
+    @patch("festival.utils.spotify_utils.spotify_client.post")
     def test_get_app_token_exception(self, mock_post):
         mock_post.side_effect = requests.exceptions.RequestException("Error")
         self.assertIsNone(spotify_utils.get_app_token())
 
+    @patch("festival.utils.spotify_utils.spotify_client.post")
+    def test_get_app_token_cached(self, mock_post):
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.json.return_value = {"access_token": "token", "expires_in": 3600}
+        self.assertEqual(spotify_utils.get_app_token(), "token")
+        self.assertEqual(spotify_utils.get_app_token(), "token")
+        self.assertEqual(mock_post.call_count, 1)
+        stats = spotify_utils.app_token_cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    @patch("festival.utils.spotify_utils.spotify_client.post")
+    def test_get_app_token_refresh_before_expiry(self, mock_post):
+        mock_post.return_value.status_code = 200
+        # 有効期限がマージン以下なら毎回取り直す
+        mock_post.return_value.json.return_value = {"access_token": "token", "expires_in": 30}
+        spotify_utils.get_app_token()
+        spotify_utils.get_app_token()
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch("festival.utils.spotify_utils.spotify_client.post")
+    def test_get_app_token_failure_not_cached(self, mock_post):
+        mock_post.return_value.status_code = 500
+        mock_post.return_value.text = "Server Error"
+        self.assertIsNone(spotify_utils.get_app_token())
+        self.assertIsNone(spotify_utils.get_app_token())
+        self.assertEqual(mock_post.call_count, 2)
+
+    def test_app_token_cache_single_refresh_across_threads(self):
+        calls = []
+
+        def slow_fetcher():
+            calls.append(1)
+            time.sleep(0.05)
+            return "token", 3600
+
+        cache = spotify_utils.AppTokenCache(slow_fetcher)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, ["token"] * 8)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["hits"], 7)
+
     # search_artist
     @patch("festival.utils.spotify_utils.get_app_token", return_value=None)
     def test_search_artist_token_none(self, _):
         self.assertIsNone(spotify_utils.search_artist("YOASOBI"))
 
     @patch("festival.utils.spotify_utils.get_app_token", return_value="token")
-    @patch("festival.utils.spotify_utils.requests.get")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
     def test_search_artist_request_exception(self, mock_get, _):
         mock_get.side_effect = requests.exceptions.RequestException("Timeout")
         self.assertIsNone(spotify_utils.search_artist("YOASOBI"))
 
     @patch("festival.utils.spotify_utils.get_app_token", return_value="token")
-    @patch("festival.utils.spotify_utils.requests.get")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
     def test_search_artist_http_error(self, mock_get, _):
         mock_response = MagicMock()
         mock_response.status_code = 500
@@ -55,21 +105,21 @@ class TestSpotifyUtils(unittest.TestCase):
         self.assertIsNone(spotify_utils.search_artist("YOASOBI"))
 
     @patch("festival.utils.spotify_utils.get_app_token", return_value="token")
-    @patch("festival.utils.spotify_utils.requests.get")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
     def test_search_artist_json_error(self, mock_get, _):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.side_effect = ValueError()
         self.assertIsNone(spotify_utils.search_artist("YOASOBI"))
 
     @patch("festival.utils.spotify_utils.get_app_token", return_value="token")
-    @patch("festival.utils.spotify_utils.requests.get")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
     def test_search_artist_not_found(self, mock_get, _):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {"artists": {"items": []}}
         self.assertIsNone(spotify_utils.search_artist("Unknown"))
 
     @patch("festival.utils.spotify_utils.get_app_token", return_value="token")
-    @patch("festival.utils.spotify_utils.requests.get")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
     @patch("festival.utils.spotify_utils.get_furigana", return_value="よあそび")
     def test_search_artist_success(self, mock_furigana, mock_get, _):
         mock_get.return_value.status_code = 200
@@ -111,20 +161,20 @@ class TestSpotifyUtils(unittest.TestCase):
         self.assertEqual(spotify_utils.get_top_tracks("abc123"), [])
 
     @patch("festival.utils.spotify_utils.get_app_token", return_value="token")
-    @patch("festival.utils.spotify_utils.requests.get")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
     def test_get_top_tracks_exception(self, mock_get, _):
         mock_get.side_effect = requests.exceptions.RequestException("Error")
         self.assertEqual(spotify_utils.get_top_tracks("abc123"), [])
 
     @patch("festival.utils.spotify_utils.get_app_token", return_value="token")
-    @patch("festival.utils.spotify_utils.requests.get")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
     def test_get_top_tracks_json_error(self, mock_get, _):
         mock_get.return_value.raise_for_status = lambda: None
         mock_get.return_value.json.side_effect = ValueError()
         self.assertEqual(spotify_utils.get_top_tracks("abc123"), [])
 
     @patch("festival.utils.spotify_utils.get_app_token", return_value="token")
-    @patch("festival.utils.spotify_utils.requests.get")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
     def test_get_top_tracks_success(self, mock_get, _):
         mock_get.return_value.raise_for_status = lambda: None
         mock_get.return_value.json.return_value = {
@@ -140,20 +190,20 @@ class TestSpotifyUtils(unittest.TestCase):
         self.assertEqual(result[0]["name"], "Track A")
 
     # save_playlist_to_spotify
-    @patch("festival.utils.spotify_utils.requests.get")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
     def test_save_playlist_user_error(self, mock_get):
         mock_get.return_value.status_code = 401
         mock_get.return_value.text = "Unauthorized"
         self.assertIsNone(spotify_utils.save_playlist_to_spotify("token", ["uri"]))
 
-    @patch("festival.utils.spotify_utils.requests.get")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
     def test_save_playlist_user_id_missing(self, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {}
         self.assertIsNone(spotify_utils.save_playlist_to_spotify("token", ["uri"]))
 
-    @patch("festival.utils.spotify_utils.requests.get")
-    @patch("festival.utils.spotify_utils.requests.post")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
+    @patch("festival.utils.spotify_utils.spotify_client.post")
     def test_save_playlist_create_error(self, mock_post, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {"id": "user123"}
@@ -161,8 +211,8 @@ class TestSpotifyUtils(unittest.TestCase):
         mock_post.return_value.text = "Bad Request"
         self.assertIsNone(spotify_utils.save_playlist_to_spotify("token", ["uri"]))
 
-    @patch("festival.utils.spotify_utils.requests.get")
-    @patch("festival.utils.spotify_utils.requests.post")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
+    @patch("festival.utils.spotify_utils.spotify_client.post")
     def test_save_playlist_id_missing(self, mock_post, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {"id": "user123"}
@@ -170,8 +220,8 @@ class TestSpotifyUtils(unittest.TestCase):
         mock_post.return_value.json.return_value = {}
         self.assertIsNone(spotify_utils.save_playlist_to_spotify("token", ["uri"]))
 
-    @patch("festival.utils.spotify_utils.requests.get")
-    @patch("festival.utils.spotify_utils.requests.post")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
+    @patch("festival.utils.spotify_utils.spotify_client.post")
     def test_save_playlist_add_error(self, mock_post, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {"id": "user123"}
@@ -189,11 +239,13 @@ class TestSpotifyUtils(unittest.TestCase):
 
         mock_post.side_effect = [create_mock, add_mock]
 
-        result = spotify_utils.save_playlist_to_spotify("token", ["spotify:track:abc"])
-        self.assertIsNone(result)
+        # プレイリストは作成済みなので None ではなく、URL付きの例外で知らせる
+        with self.assertRaises(spotify_utils.PlaylistPartiallySavedError) as ctx:
+            spotify_utils.save_playlist_to_spotify("token", ["spotify:track:abc"])
+        self.assertEqual(ctx.exception.playlist_url, "http://spotify.com/playlist123")
 
-    @patch("festival.utils.spotify_utils.requests.get")
-    @patch("festival.utils.spotify_utils.requests.post")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
+    @patch("festival.utils.spotify_utils.spotify_client.post")
     def test_save_playlist_success(self, mock_post, mock_get):
         # ユーザー情報取得
         mock_get.return_value.status_code = 200
@@ -214,4 +266,164 @@ class TestSpotifyUtils(unittest.TestCase):
         mock_post.side_effect = [create_mock, add_mock]
 
         result = spotify_utils.save_playlist_to_spotify("token", ["spotify:track:abc"])
-        self.assertEqual(result, "http://spotify.com/playlist123")
\ No newline at end of file
+        self.assertEqual(result, "http://spotify.com/playlist123")
+
+    # fetch_artists_metadata
+    @patch("festival.utils.spotify_utils.get_app_token", return_value="token")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
+    def test_fetch_artists_metadata_chunks_by_50(self, mock_get, _):
+        def fake_get(url, headers=None, params=None, endpoint=None):
+            ids = params["ids"].split(",")
+            response = MagicMock()
+            response.raise_for_status = lambda: None
+            response.json.return_value = {"artists": [
+                {"id": i, "popularity": 10, "genres": ["j-rock"],
+                 "images": [{"url": f"big_{i}"}, {"url": f"small_{i}"}]}
+                for i in ids
+            ]}
+            return response
+        mock_get.side_effect = fake_get
+
+        ids = [f"id{n}" for n in range(120)] + ["id0"]
+        result = spotify_utils.fetch_artists_metadata(ids)
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(len(result), 120)
+        self.assertEqual(result["id5"]["image_url"], "small_id5")
+        self.assertEqual(result["id5"]["genres"], ["j-rock"])
+
+    @patch("festival.utils.spotify_utils.get_app_token", return_value="token")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
+    def test_fetch_artists_metadata_skips_null_and_failed_chunk(self, mock_get, _):
+        # 1回目（先頭50件）は 500、2回目は null を含む正常応答
+        failed = MagicMock()
+        failed.raise_for_status.side_effect = requests.exceptions.HTTPError("500 Server Error")
+        ok = MagicMock()
+        ok.raise_for_status = lambda: None
+        ok.json.return_value = {"artists": [None, {"id": "b", "images": []}]}
+        mock_get.side_effect = [failed, ok]
+
+        ids = [f"id{n}" for n in range(50)] + ["a", "b"]
+        result = spotify_utils.fetch_artists_metadata(ids)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(mock_get.call_args_list[1].kwargs["params"], {"ids": "a,b"})
+        self.assertEqual(list(result), ["b"])
+        self.assertIsNone(result["b"]["image_url"])
+
+    def test_fetch_artists_metadata_empty(self):
+        self.assertEqual(spotify_utils.fetch_artists_metadata([]), {})
+
+    # get_top_tracks_many
+    @patch("festival.utils.spotify_utils.fetch_top_tracks")
+    def test_get_top_tracks_many_keeps_order_and_reports_errors(self, mock_fetch):
+        def fake_fetch(spotify_id, market):
+            time.sleep(0.01 if spotify_id == "a" else 0)
+            if spotify_id == "b":
+                raise spotify_utils.SpotifyAPIError("Spotify API接続エラー")
+            return [{"name": f"track_{spotify_id}"}]
+        mock_fetch.side_effect = fake_fetch
+
+        results = spotify_utils.get_top_tracks_many(["a", "b", "c"], max_workers=3)
+        self.assertEqual([r["spotify_id"] for r in results], ["a", "b", "c"])
+        self.assertEqual(results[0]["tracks"], [{"name": "track_a"}])
+        self.assertEqual(results[1]["tracks"], [])
+        self.assertIn("接続エラー", results[1]["error"])
+        self.assertIsNone(results[2]["error"])
+
+    @patch("festival.utils.spotify_utils.get_app_token", return_value="token")
+    @patch("festival.utils.spotify_utils.spotify_client.get")
+    def test_get_top_tracks_many_isolates_malformed_response(self, mock_get, _):
+        def fake_get(url, headers=None, params=None, endpoint=None):
+            response = MagicMock()
+            response.raise_for_status = lambda: None
+            if "/artists/bad/" in url:
+                response.json.return_value = {"error": "unexpected"}  # tracks がない
+            elif "/artists/broken/" in url:
+                response.json.return_value = {"tracks": [{"name": "No artists"}]}
+            else:
+                response.json.return_value = {"tracks": [{
+                    "name": "Track A", "artists": [{"name": "YOASOBI"}],
+                    "external_urls": {"spotify": "http://spotify.com/trackA"}, "uri": "spotify:track:abc",
+                }]}
+            return response
+        mock_get.side_effect = fake_get
+
+        results = spotify_utils.get_top_tracks_many(["bad", "good", "broken"], max_workers=2)
+        self.assertIn("形式が不正", results[0]["error"])
+        self.assertEqual(results[1]["tracks"][0]["name"], "Track A")
+        self.assertIn("形式が不正", results[2]["error"])
+        self.assertEqual(spotify_utils.get_top_tracks("bad"), [])
+
+    def test_get_top_tracks_many_empty(self):
+        self.assertEqual(spotify_utils.get_top_tracks_many([]), [])
+
+    # 100件超の分割追加
+    def _playlist_mocks(self, mock_get, add_responses):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {"id": "user123"}
+        create_mock = MagicMock()
+        create_mock.status_code = 201
+        create_mock.json.return_value = {
+            "id": "playlist123",
+            "external_urls": {"spotify": "http://spotify.com/playlist123"}
+        }
+        return [create_mock] + add_responses
+
+    @patch("festival.utils.spotify_utils.spotify_client.get")
+    @patch("festival.utils.spotify_utils.spotify_client.post")
+    def test_save_playlist_splits_into_batches_and_dedupes(self, mock_post, mock_get):
+        ok = MagicMock(status_code=201)
+        mock_post.side_effect = self._playlist_mocks(mock_get, [ok, ok, ok])
+        uris = [f"spotify:track:{n}" for n in range(250)] + ["spotify:track:0", ""]
+
+        result = spotify_utils.save_playlist_to_spotify("token", uris)
+        self.assertEqual(result, "http://spotify.com/playlist123")
+        add_calls = mock_post.call_args_list[1:]
+        self.assertEqual([len(c.kwargs["json"]["uris"]) for c in add_calls], [100, 100, 50])
+        self.assertEqual(add_calls[0].kwargs["json"]["uris"][0], "spotify:track:0")
+
+    @patch("festival.utils.spotify_utils.spotify_client.get")
+    @patch("festival.utils.spotify_utils.spotify_client.post")
+    def test_save_playlist_does_not_resend_after_connection_error(self, mock_post, mock_get):
+        ok = MagicMock(status_code=201)
+        mock_post.side_effect = self._playlist_mocks(
+            mock_get, [ok, requests.exceptions.ConnectionError("reset"), ok]
+        )
+        uris = [f"spotify:track:{n}" for n in range(250)]
+
+        with self.assertRaises(spotify_utils.PlaylistPartiallySavedError) as ctx:
+            spotify_utils.save_playlist_to_spotify("token", uris)
+        # 追加済みかもしれない2バッチ目は再送せず、そこで止める
+        self.assertEqual(len(mock_post.call_args_list[1:]), 2)
+        self.assertEqual(ctx.exception.added_count, 100)
+        self.assertEqual(ctx.exception.playlist_url, "http://spotify.com/playlist123")
+        self.assertIn("101〜200曲目", str(ctx.exception))
+
+    @patch("festival.utils.spotify_utils.spotify_client._sleep")
+    @patch("festival.utils.spotify_utils.spotify_client.session.request")
+    def test_save_playlist_retries_batch_after_5xx(self, mock_request, _):
+        me = MagicMock(status_code=200)
+        me.json.return_value = {"id": "user123"}
+        created = MagicMock(status_code=201)
+        created.json.return_value = {"id": "playlist123", "external_urls": {"spotify": "http://spotify.com/playlist123"}}
+        busy = MagicMock(status_code=503, text="Service Unavailable", headers={})
+        ok = MagicMock(status_code=201)
+        mock_request.side_effect = [me, created, busy, ok]
+
+        url = spotify_utils.save_playlist_to_spotify("token", ["spotify:track:abc"])
+        self.assertEqual(url, "http://spotify.com/playlist123")
+        # サーバーが失敗を返したバッチだけ再送される
+        self.assertEqual(mock_request.call_count, 4)
+        self.assertEqual(mock_request.call_args_list[2].kwargs["json"], mock_request.call_args_list[3].kwargs["json"])
+
+    @patch("festival.utils.spotify_utils.spotify_client.get")
+    @patch("festival.utils.spotify_utils.spotify_client.post")
+    def test_save_playlist_leaves_retries_to_client(self, mock_post, mock_get):
+        # 5xx の再試行は retry_server_errors=True を渡した spotify_client.post が済ませているので、
+        # それでも失敗したらここで重ねて再送せずに諦める
+        busy = MagicMock(status_code=503, text="Service Unavailable")
+        mock_post.side_effect = self._playlist_mocks(mock_get, [busy])
+        with self.assertRaises(spotify_utils.PlaylistPartiallySavedError) as ctx:
+            spotify_utils.save_playlist_to_spotify("token", ["spotify:track:abc"])
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertTrue(mock_post.call_args_list[1].kwargs["retry_server_errors"])
+        self.assertEqual(ctx.exception.added_count, 0)
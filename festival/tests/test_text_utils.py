@@ -1,4 +1,9 @@
+import os
+import subprocess
+import sys
+import threading
 import unittest
+import unittest.mock
 from festival.utils import text_utils
 
 class TestTextUtils(unittest.TestCase):
@@ -41,6 +46,12 @@ class TestTextUtils(unittest.TestCase):
     def test_get_initial_group_dakuon(self):
         self.assertEqual(text_utils.get_initial_group("ぎんこう"), "か")
 
+    def test_get_initial_group_wa_dakuon(self):
+        for text in ("ヷンダー", "ヸ", "ヹ", "ヺ"):
+            with self.subTest(text=text):
+                self.assertEqual(text_utils.get_initial_group(text), "わ")
+                self.assertEqual(text_utils.get_initial_groups([text]), ["わ"])
+
     def test_get_initial_group_handakuon(self):
         self.assertEqual(text_utils.get_initial_group("ぴあ"), "は")
 
@@ -54,4 +65,86 @@ class TestTextUtils(unittest.TestCase):
         self.assertEqual(text_utils.get_initial_group("★スター"), "★")
 
     def test_get_initial_group_number(self):
-        self.assertEqual(text_utils.get_initial_group("123"), "1")
\ No newline at end of file
+        self.assertEqual(text_utils.get_initial_group("123"), "1")
+
+    def test_get_initial_group_small_kana(self):
+        self.assertEqual(text_utils.get_initial_group("ぁ"), "あ")
+        self.assertEqual(text_utils.get_initial_group("ゃ"), "や")
+        self.assertEqual(text_utils.get_initial_group("っぽ"), "た")
+
+    def test_get_initial_group_leading_long_vowel_mark(self):
+        self.assertEqual(text_utils.get_initial_group("ーabc"), "A")
+
+    def test_get_initial_group_width_variants(self):
+        self.assertEqual(text_utils.get_initial_group("ｻｶﾅｸｼｮﾝ"), "さ")
+        self.assertEqual(text_utils.get_initial_group("Ａｐｐｌｅ"), "A")
+
+    def test_initial_group_table_covers_katakana(self):
+        self.assertEqual(text_utils._group_of_reading("ヴ"), "あ")
+        self.assertEqual(text_utils._group_of_reading("ヶ"), "か")
+
+    def test_get_initial_groups(self):
+        self.assertEqual(
+            text_utils.get_initial_groups(["佐藤", "", "banana", "★スター"]),
+            ["さ", "", "B", "★"],
+        )
+
+class TestFuriganaCache(unittest.TestCase):
+
+    def setUp(self):
+        text_utils.clear_furigana_cache()
+
+    def test_ascii_and_hiragana_skip_pykakasi(self):
+        with unittest.mock.patch.object(text_utils, "_convert") as mock_convert:
+            self.assertEqual(text_utils.get_furigana("King Gnu"), "King Gnu")
+            self.assertEqual(text_utils.get_furigana("あいみょん"), "あいみょん")
+        mock_convert.assert_not_called()
+
+    def test_skipped_count_is_thread_safe(self):
+        def worker():
+            for _ in range(2000):
+                text_utils.get_furigana("King Gnu")
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(text_utils.furigana_cache_stats()["skipped"], 16000)
+
+    def test_long_vowel_mark_is_converted(self):
+        # 「ー」はカタカナ扱いなので pykakasi を通す
+        text_utils.get_furigana("らーめん")
+        stats = text_utils.furigana_cache_stats()
+        self.assertEqual((stats["misses"], stats["skipped"]), (1, 0))
+
+    def test_repeated_conversion_hits_cache(self):
+        text_utils.get_furigana("東京")
+        text_utils.get_furigana("東京")
+        stats = text_utils.furigana_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_get_furigana_many_keeps_order_and_dedupes(self):
+        names = ["東京", "Aimer", "東京", "アイウエオ"]
+        self.assertEqual(
+            text_utils.get_furigana_many(names),
+            ["とうきょう", "Aimer", "とうきょう", "あいうえお"],
+        )
+        stats = text_utils.furigana_cache_stats()
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["skipped"], 1)
+
+
+class TestLazyConverter(unittest.TestCase):
+
+    def test_django_setup_does_not_load_pykakasi(self):
+        code = "import sys, django; django.setup(); print('pykakasi' in sys.modules)"
+        proc = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "conf.settings"},
+        )
+        self.assertEqual(proc.stdout.strip(), "False")
+
+    def test_warm_up_loads_converter(self):
+        text_utils.warm_up_furigana()
+        self.assertIsNotNone(text_utils._converter)
@@ -0,0 +1,88 @@
+from datetime import time
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from festival.utils.timetable_utils import build_timetable_grid, timetable_origin
+
+
+def stage(pk, name):
+    return SimpleNamespace(pk=pk, name=name, color_code="#000000")
+
+def perf(name, start, end, stage_obj=None):
+    return SimpleNamespace(
+        artist=SimpleNamespace(name=name),
+        stage_id=stage_obj.pk if stage_obj else None,
+        start_time=start, end_time=end,
+    )
+
+
+class TimetableGridTest(SimpleTestCase):
+    def setUp(self):
+        self.main = stage(1, "Main")
+        self.sub = stage(2, "Sub")
+
+    def test_slots_and_rowspans(self):
+        grid = build_timetable_grid([self.main, self.sub], [
+            perf("A", time(12, 0), time(12, 30), self.main),
+            perf("B", time(12, 15), time(13, 0), self.sub),
+            perf("C", time(12, 30), time(12, 45), self.main),
+        ])
+        self.assertEqual(grid.origin, time(12, 0))
+        self.assertEqual(grid.slot_count, 12)
+        spans = {e.performance.artist.name: (e.column, e.start_slot, e.rowspan) for e in grid.entries}
+        self.assertEqual(spans, {"A": (0, 0, 6), "B": (1, 3, 9), "C": (0, 6, 3)})
+
+        rows = grid.rows
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(rows[1].time, time(12, 5))
+        # 1行目は A のセルと Sub の空セル、A に覆われている行は Sub の分だけ
+        self.assertEqual([c["rowspan"] for c in rows[0].cells], [6, 1])
+        self.assertEqual(len(rows[4].cells), 0)
+        self.assertEqual(grid.matrix[0][:7], [0, 0, 0, 0, 0, 0, 1])
+
+    def test_stage_none_goes_to_unassigned_column(self):
+        grid = build_timetable_grid([self.main], [perf("A", time(12, 0), time(12, 30))])
+        self.assertEqual([c.name for c in grid.columns], ["Main", "ステージ未定"])
+        self.assertEqual(grid.entries[0].column, 1)
+
+    def test_set_past_midnight(self):
+        grid = build_timetable_grid([self.main], [
+            perf("Late", time(23, 30), time(0, 30), self.main),
+            perf("Later", time(0, 30), time(1, 0), self.main),
+            perf("Early", time(22, 0), time(23, 0), self.main),
+        ])
+        self.assertEqual(grid.origin, time(22, 0))
+        order = [e.performance.artist.name for e in sorted(grid.entries, key=lambda e: e.start_slot)]
+        self.assertEqual(order, ["Early", "Late", "Later"])
+        late = next(e for e in grid.entries if e.performance.artist.name == "Late")
+        self.assertEqual((late.start_minute, late.end_minute), (90, 150))
+        self.assertEqual(grid.rows[-1].time, time(0, 55))
+
+    def test_zero_length_performance_takes_one_slot(self):
+        grid = build_timetable_grid([self.main], [
+            perf("Zero", time(12, 0), time(12, 0), self.main),
+            perf("Next", time(12, 30), time(13, 0), self.main),
+        ])
+        zero = next(e for e in grid.entries if e.performance.artist.name == "Zero")
+        self.assertEqual((zero.start_minute, zero.end_minute, zero.rowspan), (0, 0, 1))
+        # 24時間分の行に広がらない
+        self.assertEqual(grid.slot_count, 12)
+
+    def test_overlaps_on_same_stage_use_extra_lane(self):
+        grid = build_timetable_grid([self.main], [
+            perf("A", time(12, 0), time(12, 32), self.main),
+            perf("B", time(12, 33), time(13, 0), self.main),
+        ])
+        # 分単位では重ならないがスロット（12:30〜12:35）が重なるので別レーン
+        self.assertEqual([e.column for e in grid.entries], [0, 1])
+        self.assertEqual([(h.name, h.colspan) for h in grid.headers], [("Main", 2)])
+
+    def test_untimed_performances_are_skipped(self):
+        grid = build_timetable_grid([self.main], [perf("A", None, None, self.main)])
+        self.assertIsNone(grid.origin)
+        self.assertEqual((grid.slot_count, grid.rows), (0, []))
+
+    def test_timetable_origin_uses_largest_gap(self):
+        self.assertEqual(timetable_origin([10 * 60, 12 * 60]), 10 * 60)
+        self.assertEqual(timetable_origin([23 * 60, 1 * 60, 3 * 60]), 23 * 60)
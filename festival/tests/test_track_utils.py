@@ -0,0 +1,58 @@
+from datetime import timedelta
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from festival.models import TopTrackCache
+from festival.utils.track_utils import get_cached_top_tracks_many
+
+TRACK = {"name": "Track A", "artist": "YOASOBI", "spotify_url": "http://spotify.com/trackA", "uri": "spotify:track:abc"}
+
+
+def fake_results(ids, market="JP"):
+    return [{"spotify_id": i, "tracks": [TRACK], "error": None} for i in ids]
+
+
+@override_settings(SPOTIFY_TOP_TRACKS_TTL=3600, SPOTIFY_TOP_TRACKS_STALE_TTL=3600)
+class TrackUtilsTest(TestCase):
+    def _cache(self, spotify_id, age):
+        TopTrackCache.objects.create(
+            spotify_id=spotify_id, market="JP", tracks=[TRACK],
+            fetched_at=timezone.now() - timedelta(seconds=age)
+        )
+
+    @patch("festival.utils.track_utils.get_top_tracks_many", side_effect=fake_results)
+    def test_missing_entries_fetched_and_stored(self, mock_fetch):
+        results = get_cached_top_tracks_many(["a", "b"])
+        mock_fetch.assert_called_once_with(["a", "b"], "JP")
+        self.assertEqual([r["spotify_id"] for r in results], ["a", "b"])
+        self.assertEqual(TopTrackCache.objects.count(), 2)
+
+    @patch("festival.utils.track_utils.get_top_tracks_many", side_effect=fake_results)
+    def test_fresh_entries_served_without_api(self, mock_fetch):
+        self._cache("a", age=10)
+        with self.assertNumQueries(1):
+            results = get_cached_top_tracks_many(["a"])
+        mock_fetch.assert_not_called()
+        self.assertEqual(results[0]["tracks"], [TRACK])
+
+    @patch("festival.utils.track_utils._revalidate_in_background")
+    @patch("festival.utils.track_utils.get_top_tracks_many", side_effect=fake_results)
+    def test_stale_entries_served_and_revalidated(self, mock_fetch, mock_revalidate):
+        self._cache("a", age=5000)
+        results = get_cached_top_tracks_many(["a"])
+        self.assertEqual(results[0]["tracks"], [TRACK])
+        mock_fetch.assert_not_called()
+        mock_revalidate.assert_called_once_with(["a"], "JP")
+
+    @patch("festival.utils.track_utils.get_top_tracks_many")
+    def test_expired_entries_refetched_and_errors_not_cached(self, mock_fetch):
+        self._cache("a", age=10000)
+        mock_fetch.return_value = [
+            {"spotify_id": "a", "tracks": [], "error": None},
+            {"spotify_id": "b", "tracks": [], "error": "Spotify API接続エラー"},
+        ]
+        results = get_cached_top_tracks_many(["a", "b"])
+        self.assertEqual(results[0]["tracks"], [])
+        self.assertEqual(results[1]["error"], "Spotify API接続エラー")
+        self.assertEqual(TopTrackCache.objects.get(spotify_id="a").tracks, [])
+        self.assertFalse(TopTrackCache.objects.filter(spotify_id="b").exists())
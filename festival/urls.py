@@ -1,7 +1,7 @@
 from django.urls import path
 from .views.base_views import index, error_page
 from .views.artist_views import (
-    artist_list, artist_detail,
+    artist_list, artist_list_json, artist_detail,
     bulk_artist_register, edit_artist,
     edit_artist_bulk, update_artist_images_view
 )
@@ -12,11 +12,12 @@ from .views.event_views import (
 from .views.performance_views import (
     register_event_day_and_performances,
     edit_event_day_performances, edit_performance,
-    paste_schedule_register, register_timetable, timetable_view
+    paste_schedule_register, register_timetable, timetable_view, timetable_json_view
 )
 from .views.playlist_views import create_playlist_view, save_playlist_to_spotify_view
 from .views.spotify_auth_views import spotify_login_view, spotify_callback_view
 from .views.admin_views import admin_menu
+from .views.job_views import job_detail, job_status_view
 
 app_name = 'festival'
 
@@ -28,6 +29,7 @@ urlpatterns = [
 
     # アーティスト関連
     path('artists/', artist_list, name='artist_list'),
+    path('artists/json/', artist_list_json, name='artist_list_json'),
     path('artist/<int:pk>/', artist_detail, name='artist_detail'),
     path('artists/bulk/', bulk_artist_register, name='bulk_artist_register'),
     path('artist/edit/<int:artist_id>/', edit_artist, name='edit_artist'),
@@ -55,6 +57,7 @@ urlpatterns = [
     # タイムテーブル関連
     path('timetable/register/', register_timetable, name='register_timetable'),
     path('timetable/view/', timetable_view, name='timetable_view'),
+    path('timetable/<int:event_day_id>/json/', timetable_json_view, name='timetable_json'),
     path('timetable/edit/<int:performance_id>/', edit_performance, name='edit_performance'),
 
     # Spotify認証関連
@@ -63,4 +66,8 @@ urlpatterns = [
 
     # 管理者メニュー
     path('admin_menu/', admin_menu, name='admin_menu'),
+
+    # バックグラウンドジョブ
+    path('jobs/<int:job_id>/', job_detail, name='job_detail'),
+    path('jobs/<int:job_id>/status/', job_status_view, name='job_status'),
 ]
\ No newline at end of file
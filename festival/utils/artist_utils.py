@@ -1,16 +1,171 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
 from festival.models import Artist
-from festival.utils.spotify_utils import fetch_artist_image
+from festival.utils.spotify_utils import fetch_artists_metadata, find_artist, SpotifyAPIError, ARTISTS_BATCH_SIZE
+from festival.utils.text_utils import get_furigana_many, get_name_key
+
+# 一括登録レポートのステータス
+CREATED = 'created'
+SKIPPED = 'skipped'
+NOT_FOUND = 'not_found'
+ERROR = 'error'
+
+def refresh_artists_from_spotify(artists, progress=None):
+    """
+    アーティストの画像・人気度・ジャンルをSpotifyから一括取得して更新する。
+    50件単位でまとめて取得し、バッチごとに bulk_update で保存する。更新したアーティストのリストを返す。
+    progress(done, total, new_errors) を渡すとバッチごとに進捗を通知する。
+    """
+    targets = [artist for artist in artists if artist.spotify_id]
+    if progress:
+        progress(0, len(targets))
+
+    updated = []
+    for i in range(0, len(targets), ARTISTS_BATCH_SIZE):
+        batch = targets[i:i + ARTISTS_BATCH_SIZE]
+        metadata = fetch_artists_metadata([artist.spotify_id for artist in batch])
+
+        batch_updated = []
+        errors = []
+        for artist in batch:
+            data = metadata.get(artist.spotify_id)
+            if not data:
+                print(f"⚠️ {artist.name} の情報が取得できませんでした")
+                errors.append(f"{artist.name} の情報が取得できませんでした")
+                continue
+            if data['image_url']:
+                artist.image_url = data['image_url']
+            artist.popularity = data['popularity']
+            artist.genres = data['genres']
+            batch_updated.append(artist)
 
-def update_missing_artist_images():
+        if batch_updated:
+            Artist.objects.bulk_update(batch_updated, ['image_url', 'popularity', 'genres'])
+        updated.extend(batch_updated)
+        if progress:
+            progress(i + len(batch), len(targets), errors)
+
+    return updated
+
+def update_missing_artist_images(progress=None):
     """image_urlが空のアーティストにSpotify画像を登録"""
     artists = Artist.objects.filter(image_url__isnull=True) | Artist.objects.filter(image_url__exact='')
-    for artist in artists:
-        if not artist.spotify_id:
-            continue
-        image_url = fetch_artist_image(artist.spotify_id)
-        if image_url:
-            artist.image_url = image_url
-            artist.save()
-            print(f"✅ {artist.name} の画像を更新しました: {image_url}")
+    updated = refresh_artists_from_spotify(artists, progress=progress)
+    for artist in updated:
+        if artist.image_url:
+            print(f"✅ {artist.name} の画像を更新しました: {artist.image_url}")
         else:
             print(f"⚠️ {artist.name} の画像が見つかりませんでした")
+    return len([artist for artist in updated if artist.image_url])
+
+def parse_artist_names(raw_names):
+    """改行・カンマ区切りのアーティスト名を分割（get_name_key で重複除外、順序維持）"""
+    names = {}
+    for line in raw_names.splitlines():
+        for name in line.split(','):
+            name = name.strip()
+            if name and get_name_key(name) not in names:
+                names[get_name_key(name)] = name
+    return list(names.values())
+
+def register_artists_from_names(names, max_workers=None, progress=None):
+    """
+    アーティスト名のリストをSpotifyで検索してまとめて登録する。
+    1. 登録済みの名前をクエリ1回で判定してスキップ
+    2. 残りの名前をスレッドプールで並行検索
+    3. 新規アーティストを bulk_create で一括登録（同時に登録された spotify_id は1件ずつ登録し直して判定）
+    名前ごとに {'name', 'status', 'artist_name', 'message'} のレポートを入力順で返す。
+    progress(done, total, new_errors) を渡すと検索1件ごとに進捗を通知する。
+    """
+    report = {name: {'name': name, 'status': None, 'artist_name': '', 'message': ''} for name in names}
+
+    # 1. 登録済み名前の判定（保存時に求めてある name_key 列をインデックスで引く）
+    keys = {name: get_name_key(name) for name in names}
+    known = set(
+        Artist.objects.filter(name_key__in=set(keys.values())).values_list('name_key', flat=True)
+    )
+    pending = []
+    for name in names:
+        if keys[name] in known:
+            report[name].update(status=SKIPPED, message='登録済み')
+        else:
+            pending.append(name)
+    if progress:
+        progress(len(names) - len(pending), len(names))
+
+    # 2. Spotify検索を並行実行（DBアクセスはワーカーで行わない）
+    def search(name):
+        try:
+            return name, find_artist(name), None
+        except SpotifyAPIError as e:
+            return name, None, str(e)
+
+    found = []
+    if pending:
+        workers = min(max_workers or getattr(settings, 'SPOTIFY_MAX_WORKERS', 8), len(pending))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for done, (name, data, error) in enumerate(executor.map(search, pending), start=1):
+                if error:
+                    report[name].update(status=ERROR, message=error)
+                elif not data:
+                    report[name].update(status=NOT_FOUND, message='Spotifyで見つかりませんでした')
+                else:
+                    found.append((name, data))
+                if progress:
+                    progress(len(names) - len(pending) + done, len(names), [f"{name}: {error}"] if error else None)
+
+    # 3. spotify_id 単位で既存・重複を除いて一括登録
+    existing_ids = set(
+        Artist.objects.filter(spotify_id__in=[data['spotify_id'] for _, data in found])
+        .values_list('spotify_id', flat=True)
+    )
+    new_artists = []
+    new_names = []
+    for name, data in found:
+        report[name]['artist_name'] = data['name']
+        if data['spotify_id'] in existing_ids:
+            report[name].update(status=SKIPPED, message='同じSpotify IDのアーティストが登録済み')
+            continue
+        existing_ids.add(data['spotify_id'])
+        new_artists.append(Artist(
+            name=data['name'],
+            spotify_id=data['spotify_id'],
+            popularity=data['popularity'],
+            genres=data['genres'],
+        ))
+        new_names.append(name)
+
+    for artist, furigana in zip(new_artists, get_furigana_many(new_names)):
+        artist.furigana = furigana
+
+    if new_artists:
+        try:
+            with transaction.atomic():
+                Artist.objects.bulk_create(new_artists)
+            for name in new_names:
+                report[name]['status'] = CREATED
+        except IntegrityError:
+            # 上の確認のあとに別のジョブが同じ spotify_id を登録した。
+            # どれが弾かれたか分かるように1件ずつ登録し直す
+            for name, artist in zip(new_names, new_artists):
+                artist.pk = None  # 巻き戻された一括登録で振られた id は使わない
+                try:
+                    with transaction.atomic():
+                        artist.save(force_insert=True)
+                    report[name]['status'] = CREATED
+                except IntegrityError:
+                    report[name].update(status=SKIPPED, message='同じSpotify IDのアーティストが登録済み')
+
+    return list(report.values())
+
+def summarize_register_report(report):
+    """一括登録レポートの件数サマリー文字列を作る"""
+    counts = Counter(row['status'] for row in report)
+    return (
+        f"{counts[CREATED]} 件登録、{counts[SKIPPED]} 件スキップしました。"
+        f"（見つからない: {counts[NOT_FOUND]} 件、エラー: {counts[ERROR]} 件）"
+    )
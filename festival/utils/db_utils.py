@@ -0,0 +1,51 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+# 本番プロファイル（DATABASE_PROFILE=production）で接続ごとに設定する SQLite の PRAGMA
+# 順番どおりに実行する（busy_timeout を先にして、WAL への切り替えもロック待ちさせる）
+PRODUCTION_SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,     # ロック中は最大5秒待つ（ミリ秒）
+    'journal_mode': 'WAL',    # 書き込み中も読み取りをブロックしない
+    'synchronous': 'NORMAL',  # WAL なら NORMAL でもDBは壊れない（電源断で直前のコミットは失われうる）
+    'cache_size': -64000,     # ページキャッシュ（負数は KiB 単位、約64MB）
+    'mmap_size': 268435456,   # 256MB までメモリマップで読む
+}
+
+
+def configured_sqlite_pragmas():
+    """設定に応じた PRAGMA（本番プロファイル以外は空。SQLITE_PRAGMAS で個別に上書きできる）"""
+    if getattr(settings, 'DATABASE_PROFILE', 'development') != 'production':
+        return {}
+    return {**PRODUCTION_SQLITE_PRAGMAS, **getattr(settings, 'SQLITE_PRAGMAS', {})}
+
+def sqlite_pragma_statements(pragmas):
+    """PRAGMA 文のリストを作る（名前が識別子でなければ ValueError）"""
+    statements = []
+    for name, value in pragmas.items():
+        if not name.isidentifier():
+            raise ValueError(f"不正な PRAGMA 名です: {name}")
+        statements.append(f"PRAGMA {name} = {value}")
+    return statements
+
+def apply_sqlite_pragmas(connection, pragmas=None):
+    """
+    SQLite の接続に PRAGMA を設定する（connection_created シグナルから呼ぶ）。
+    pragmas を省略すると設定（configured_sqlite_pragmas）に従う。SQLite 以外では何もしない。
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = configured_sqlite_pragmas() if pragmas is None else pragmas
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for statement in sqlite_pragma_statements(pragmas):
+            cursor.execute(statement)
+
+@contextmanager
+def rolled_back_atomic(using=None):
+    """ブロック内の書き込みを最後に必ずロールバックする atomic（ベンチマーク用の一時データ投入など）"""
+    with transaction.atomic(using=using):
+        yield
+        transaction.set_rollback(True, using=using)
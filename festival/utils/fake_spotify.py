@@ -0,0 +1,173 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+
+def fake_spotify_id(seed):
+    """名前などから決定的な22文字のIDを生成"""
+    return hashlib.sha1(seed.encode('utf-8')).hexdigest()[:22]
+
+def fake_artist(spotify_id, name=None):
+    name = name or f"Artist {spotify_id[:6]}"
+    return {
+        'id': spotify_id,
+        'name': name,
+        'popularity': int(fake_spotify_id(spotify_id)[:4], 16) % 101,
+        'genres': ['j-pop'],
+        'images': [
+            {'url': f"https://i.scdn.co/image/{spotify_id}-640", 'width': 640, 'height': 640},
+            {'url': f"https://i.scdn.co/image/{spotify_id}-160", 'width': 160, 'height': 160},
+        ],
+    }
+
+def fake_tracks(spotify_id, count=10):
+    return [
+        {
+            'name': f"Track {n + 1}",
+            'uri': f"spotify:track:{spotify_id[:12]}{n:02d}",
+            'artists': [{'id': spotify_id, 'name': f"Artist {spotify_id[:6]}"}],
+            'external_urls': {'spotify': f"https://open.spotify.com/track/{spotify_id[:12]}{n:02d}"},
+        }
+        for n in range(count)
+    ]
+
+
+def endpoint_key(method, parts):
+    """リクエスト集計用のキー（IDを {id} に置き換える）"""
+    if len(parts) >= 3 and parts[0] == 'v1':
+        parts = [*parts[:2], '{id}', *parts[3:]]
+    return f"{method} /{'/'.join(parts)}"
+
+
+class FakeSpotifyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive を有効にしてコネクションプールの効果を測れるようにする
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _inject_faults(self):
+        """遅延・429・500 を設定に従って発生させる。応答済みなら True"""
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        if server.rate_limit_rate and random.random() < server.rate_limit_rate:
+            server.count('429')
+            self._send_json(429, {'error': {'status': 429, 'message': 'API rate limit exceeded'}},
+                            headers={'Retry-After': str(server.retry_after)})
+            return True
+        if server.error_rate and random.random() < server.error_rate:
+            server.count('500')
+            self._send_json(500, {'error': {'status': 500, 'message': 'Server error'}})
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        parts = [p for p in url.path.split('/') if p]
+        self.server.count(endpoint_key('GET', parts))
+        if self._inject_faults():
+            return
+
+        if parts == ['v1', 'search']:
+            name = query.get('q', [''])[0]
+            items = [fake_artist(fake_spotify_id(name.lower()), name)] if name else []
+            return self._send_json(200, {'artists': {'items': items}})
+        if parts == ['v1', 'artists']:
+            ids = [i for i in query.get('ids', [''])[0].split(',') if i]
+            if len(ids) > 50:
+                return self._send_json(400, {'error': {'status': 400, 'message': 'Too many ids requested'}})
+            return self._send_json(200, {'artists': [fake_artist(i) for i in ids]})
+        if len(parts) == 3 and parts[:2] == ['v1', 'artists']:
+            return self._send_json(200, fake_artist(parts[2]))
+        if len(parts) == 4 and parts[:2] == ['v1', 'artists'] and parts[3] == 'top-tracks':
+            return self._send_json(200, {'tracks': fake_tracks(parts[2])})
+        if parts == ['v1', 'me']:
+            return self._send_json(200, {'id': 'fake-user', 'display_name': 'Fake User'})
+        self._send_json(404, {'error': {'status': 404, 'message': 'Not found'}})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        body = self._read_body()
+        self.server.count(endpoint_key('POST', parts))
+        if self._inject_faults():
+            return
+
+        if parts == ['api', 'token']:
+            return self._send_json(200, {'access_token': 'fake-token', 'token_type': 'Bearer', 'expires_in': 3600})
+        if len(parts) == 4 and parts[:2] == ['v1', 'users'] and parts[3] == 'playlists':
+            data = json.loads(body or b'{}')
+            playlist_id = fake_spotify_id(f"{data.get('name', '')}{time.time()}")
+            return self._send_json(201, {
+                'id': playlist_id,
+                'name': data.get('name', ''),
+                'external_urls': {'spotify': f"https://open.spotify.com/playlist/{playlist_id}"},
+            })
+        if len(parts) == 4 and parts[:2] == ['v1', 'playlists'] and parts[3] == 'tracks':
+            uris = json.loads(body or b'{}').get('uris', [])
+            if len(uris) > 100:
+                return self._send_json(400, {'error': {'status': 400, 'message': 'Too many tracks requested'}})
+            return self._send_json(201, {'snapshot_id': fake_spotify_id(','.join(uris))})
+        self._send_json(404, {'error': {'status': 404, 'message': 'Not found'}})
+
+
+class FakeSpotifyServer(ThreadingHTTPServer):
+    """
+    オフラインでの結合テスト・負荷試験用のローカル Spotify API スタンドイン。
+    トークン発行・検索・アーティスト（単体/複数ID）・トップトラック・/me・
+    プレイリスト作成/楽曲追加を決定的なダミーデータで返す。
+    遅延・エラー率・429 率を指定可能（port=0 で空きポートを自動割り当て）。
+    """
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0, error_rate=0.0,
+                 rate_limit_rate=0.0, retry_after=1, verbose=False):
+        super().__init__((host, port), FakeSpotifyHandler)
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.verbose = verbose
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def count(self, key):
+        with self._lock:
+            self.requests[key] += 1
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """別スレッドで起動する（テスト用）"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,128 @@
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from festival.models import BackgroundJob
+from festival.utils.artist_utils import update_missing_artist_images, register_artists_from_names
+
+# kind → 実行関数 handler(job, progress) の登録表
+JOB_HANDLERS = {}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def job_handler(kind):
+    """バックグラウンドジョブの実行関数を登録するデコレータ"""
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+def _get_executor():
+    """ジョブ実行用のワーカースレッドプール（初回利用時に生成）"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BACKGROUND_JOB_WORKERS', 2),
+                thread_name_prefix='festival-job',
+            )
+        return _executor
+
+def enqueue_job(kind, **params):
+    """
+    ジョブを登録してワーカースレッドに投入し、すぐに BackgroundJob を返す。
+    ワーカーへの投入はコミット後に行う（呼び出し元のトランザクション内でも、ワーカーが未コミットの行を探さないように）。
+    BACKGROUND_JOBS_EAGER=True の場合はその場で同期実行する（テスト用）。
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"未登録のジョブ種別です: {kind}")
+    job = BackgroundJob.objects.create(kind=kind, params=params)
+    if getattr(settings, 'BACKGROUND_JOBS_EAGER', False):
+        run_job(job.pk)
+        job.refresh_from_db()
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, job.pk))
+    return job
+
+def _run_in_worker(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        close_old_connections()
+
+def run_job(job_id):
+    """ジョブを1件実行し、進捗・結果・エラーを BackgroundJob に記録する"""
+    job = BackgroundJob.objects.get(pk=job_id)
+    job.status = 'RUNNING'
+    job.started_at = timezone.now()
+    job.save(update_fields=['status', 'started_at'])
+
+    errors = []
+
+    def progress(done, total=None, new_errors=None):
+        """処理関数から呼ばれる進捗コールバック"""
+        if new_errors:
+            errors.extend(new_errors)
+        fields = {'done': done, 'errors': errors}
+        if total is not None:
+            fields['total'] = total
+        BackgroundJob.objects.filter(pk=job_id).update(**fields)
+
+    try:
+        result = JOB_HANDLERS[job.kind](job, progress)
+    except Exception as e:
+        traceback.print_exc()
+        errors.append(f"{type(e).__name__}: {e}")
+        BackgroundJob.objects.filter(pk=job_id).update(
+            status='FAILED', errors=errors, finished_at=timezone.now()
+        )
+        return
+
+    BackgroundJob.objects.filter(pk=job_id).update(
+        status='DONE', errors=errors, result=result, finished_at=timezone.now()
+    )
+
+def fail_interrupted_jobs():
+    """
+    待機中・実行中のまま残ったジョブを失敗扱いにする（件数を返す）。
+    ジョブはプロセス内のスレッドプールでしか動かないので、再起動で中断されたものは二度と進まない。
+    ワーカープロセスを起動する前（デプロイ時など）に実行すること（fail_interrupted_jobs コマンド）。
+    """
+    return BackgroundJob.objects.filter(status__in=['QUEUED', 'RUNNING']).update(
+        status='FAILED',
+        errors=['サーバーの再起動により中断されました。もう一度実行してください。'],
+        finished_at=timezone.now(),
+    )
+
+def job_status(job):
+    """ステータスAPI用の辞書（done/total、エラー、ETA）"""
+    return {
+        'id': job.pk,
+        'kind': job.kind,
+        'status': job.status,
+        'done': job.done,
+        'total': job.total,
+        'errors': job.errors,
+        'eta_seconds': job.eta_seconds,
+        'result': job.result if job.is_finished else None,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+    }
+
+
+# ジョブ定義 ==================================================
+
+@job_handler('update_artist_images')
+def _update_artist_images_job(job, progress):
+    return {'updated': update_missing_artist_images(progress=progress)}
+
+@job_handler('bulk_artist_register')
+def _bulk_artist_register_job(job, progress):
+    report = register_artists_from_names(job.params.get('names', []), progress=progress)
+    return {'report': report}
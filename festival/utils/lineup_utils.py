@@ -0,0 +1,122 @@
+from django.db import transaction
+from django.utils.dateparse import parse_time
+
+from festival.models import Artist, Performance
+from festival.utils.timetable_utils import invalidate_timetable_cache
+
+
+def sync_lineup(event_day, artists):
+    """
+    EventDay の出演者を artists（Artist または ID の集合）にそろえる。
+    現在の出演者との差分だけを反映し、残る出演者のステージ・出演時間は保持する。
+    1トランザクション内で、追加分は bulk_create・削除分は1回の DELETE で処理する。
+    戻り値は {'added': 追加数, 'removed': 削除数, 'kept': 変更なしの数}。
+    """
+    artist_ids = {getattr(artist, 'pk', artist) for artist in artists}
+
+    with transaction.atomic():
+        current_ids = set(
+            Performance.objects.filter(event_day=event_day).values_list('artist_id', flat=True)
+        )
+        added = artist_ids - current_ids
+        removed = current_ids - artist_ids
+
+        if removed:
+            Performance.objects.filter(event_day=event_day, artist_id__in=removed).delete()
+        if added:
+            Performance.objects.bulk_create(
+                [Performance(event_day=event_day, artist_id=artist_id) for artist_id in sorted(added)],
+                ignore_conflicts=True,  # 同時に同じ出演者が追加された場合も一意制約で弾かれるだけにする
+            )
+        if added or removed:
+            # bulk_create はシグナルが飛ばないのでタイムテーブルのキャッシュはここで破棄する
+            transaction.on_commit(lambda: invalidate_timetable_cache([event_day.pk]))
+
+    return {'added': len(added), 'removed': len(removed), 'kept': len(artist_ids & current_ids)}
+
+def _parse_time_field(value):
+    # 空欄は未定（None）。形式が不正なら ValueError
+    if not value:
+        return None
+    parsed = parse_time(value)
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+def _overlaps(a, b):
+    return a.start_time < b.end_time and b.start_time < a.end_time
+
+def save_performance_times(event_day, stage, times):
+    """
+    出演者ごとのステージ・出演時間をまとめて保存する（タイムテーブル登録画面用）。
+    times は (artist_id, 開始時刻文字列, 終了時刻文字列) の列。
+    出演をまとめて1クエリで読み込んでメモリ上で検証し、
+    エラーがなければ1トランザクション内で bulk_update / bulk_create する。
+    検証エラーが1件でもあれば何も保存せず、エラーメッセージのリストを返す（成功時は空リスト）。
+    """
+    times = [(int(artist_id), start, end) for artist_id, start, end in times]
+    performances = {
+        perf.artist_id: perf
+        for perf in Performance.objects.filter(event_day=event_day).select_related('artist')
+    }
+    # 出演者として未登録のアーティストはここで作成する（名前はエラー表示にも使う）
+    missing = [artist_id for artist_id, _, _ in times if artist_id not in performances]
+    artists = Artist.objects.in_bulk(missing) if missing else {}
+
+    errors = []
+    to_update = []
+    to_create = []
+    for artist_id, start, end in times:
+        perf = performances.get(artist_id)
+        if perf is None:
+            if artist_id not in artists:
+                errors.append(f"ID {artist_id} のアーティストが見つかりません。")
+                continue
+            perf = Performance(event_day=event_day, artist=artists[artist_id])
+            to_create.append(perf)
+        else:
+            to_update.append(perf)
+
+        try:
+            start_time, end_time = _parse_time_field(start), _parse_time_field(end)
+        except ValueError:
+            errors.append(f"{perf.artist.name} の出演時間の形式が正しくありません。")
+            continue
+        if start_time and end_time and start_time >= end_time:
+            errors.append(f"{perf.artist.name} の開始時間は終了時間より前である必要があります。")
+            continue
+        perf.stage = stage
+        perf.start_time = start_time
+        perf.end_time = end_time
+
+    if stage is not None and not errors:
+        # 同じステージで出演時間が重なっていないか（今回保存する出演が関わるものだけ）
+        changed = {perf.artist_id for perf in to_update + to_create}
+        timed = sorted(
+            (
+                perf for perf in list(performances.values()) + to_create
+                if perf.stage_id == stage.pk and perf.start_time and perf.end_time
+            ),
+            key=lambda perf: perf.start_time,
+        )
+        for i, perf in enumerate(timed):
+            for other in timed[i + 1:]:
+                if other.start_time >= perf.end_time:
+                    break
+                if _overlaps(perf, other) and (perf.artist_id in changed or other.artist_id in changed):
+                    errors.append(
+                        f"{perf.artist.name} と {other.artist.name} の出演時間が「{stage.name}」で重なっています。"
+                    )
+
+    if errors:
+        return errors
+
+    with transaction.atomic():
+        if to_update:
+            Performance.objects.bulk_update(to_update, ['stage', 'start_time', 'end_time'])
+        if to_create:
+            Performance.objects.bulk_create(to_create, ignore_conflicts=True)
+        if to_update or to_create:
+            # bulk_update / bulk_create はシグナルが飛ばないのでタイムテーブルのキャッシュはここで破棄する
+            transaction.on_commit(lambda: invalidate_timetable_cache([event_day.pk]))
+    return []
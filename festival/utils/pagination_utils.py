@@ -0,0 +1,93 @@
+import base64
+import json
+from dataclasses import dataclass
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+@dataclass
+class KeysetPage:
+    """キーセットページネーションの1ページ分"""
+    items: list
+    next_cursor: str | None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(values):
+    """並び順キーの値をURLに載せられる文字列にする"""
+    raw = json.dumps(values, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, length):
+    """encode_cursor の逆変換。不正な値なら ValueError"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"不正なカーソルです: {cursor}") from e
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError(f"不正なカーソルです: {cursor}")
+    return values
+
+def _ordering_field(queryset, name):
+    # annotate した値（search_rank など）は output_field、それ以外はモデルのフィールド
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    return queryset.model._meta.get_field(name)
+
+def _clean_cursor_values(queryset, ordering, values):
+    """カーソルの値を並び順キーの型に変換する（JSON としては正しくても型が合わなければ ValueError）"""
+    cleaned = []
+    for name, value in zip(ordering, values):
+        if value is None or isinstance(value, (list, dict)):
+            raise ValueError(f"不正なカーソルです: {name}={value!r}")
+        try:
+            cleaned.append(_ordering_field(queryset, name).to_python(value))
+        except (FieldDoesNotExist, ValidationError, TypeError) as e:
+            raise ValueError(f"不正なカーソルです: {name}={value!r}") from e
+    return cleaned
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE):
+    """クエリパラメータのページサイズを 1〜MAX_PAGE_SIZE に収める"""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+def _after(ordering, values):
+    # (a, b, c) > (x, y, z) を a > x OR (a = x AND b > y) OR ... に展開する
+    condition = Q()
+    for i, field in enumerate(ordering):
+        step = Q(**{f'{field}__gt': values[i]})
+        for prev_field, prev_value in zip(ordering[:i], values[:i]):
+            step &= Q(**{prev_field: prev_value})
+        condition |= step
+    return condition
+
+def keyset_paginate(queryset, ordering, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    queryset を ordering（昇順・末尾は一意な列）のキーセットで1ページ分取得する。
+    OFFSET を使わないので、何ページ目でも1クエリ・同じコストで引ける。
+    cursor が不正な場合は ValueError。
+    """
+    ordering = list(ordering)
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = _clean_cursor_values(queryset, ordering, decode_cursor(cursor, len(ordering)))
+        queryset = queryset.filter(_after(ordering, values))
+
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, field) for field in ordering])
+    return KeysetPage(items=items, next_cursor=next_cursor)
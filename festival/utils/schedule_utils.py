@@ -0,0 +1,173 @@
+import io
+import re
+import unicodedata
+from collections import Counter
+from datetime import date, timedelta
+
+from django.db import transaction
+
+from festival.models import Event, EventDay, Performance
+from festival.utils.timetable_utils import invalidate_timetable_cache
+
+# 行ごとの判定結果
+OK = 'ok'              # 解析できた（登録前）
+CREATED = 'created'    # 出演日程を新規登録
+EXISTS = 'exists'      # 同じ日程・会場の出演が登録済み
+DUPLICATE = 'duplicate'  # 貼り付けた中で同じ日程・会場が重複
+ERROR = 'error'        # 解析できない行
+
+# 2025-11-10 / 2025/11/10 / 2025.11.10 / 2025年11月10日 / 11/10 / 11月10日
+# の後ろに任意で (日) (Sun) (土・祝) などの曜日、続けて会場名
+SCHEDULE_LINE_RE = re.compile(
+    r'^(?:(?P<year>\d{4})\s*[-/.年]\s*)?'
+    r'(?P<month>\d{1,2})\s*[-/.月]\s*(?P<day>\d{1,2})\s*日?'
+    r'\s*(?:\((?P<weekday>[^)]*)\))?'
+    r'\s*(?P<venue>.*)$'
+)
+
+WEEKDAYS = {
+    '月': 0, '火': 1, '水': 2, '木': 3, '金': 4, '土': 5, '日': 6,
+    'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6,
+}
+
+# 年なしの日付は、基準日よりこれ以上前なら翌年とみなす
+YEAR_ROLLOVER = timedelta(days=180)
+
+
+def _weekday_of(label):
+    """曜日表記（"日" "土・祝" "Sun" など）から先頭の曜日番号を返す。読めなければ None"""
+    label = label.strip().lower()
+    if not label:
+        return None
+    return WEEKDAYS.get(label[:3], WEEKDAYS.get(label[0]))
+
+def parse_schedule(raw_text, today=None):
+    """
+    貼り付けられたツアー日程を1行ずつ解析する（ジェネレータ）。
+    各行について {'line', 'text', 'status', 'date', 'venue', 'message'} を返す（空行は返さない）。
+    年のない日付は、直前の日付より前に戻ったら翌年、最初の日付は基準日（today）から推定する。
+    """
+    today = today or date.today()
+    previous = None
+    for number, text in enumerate(io.StringIO(raw_text or ''), start=1):
+        text = text.rstrip('\r\n')
+        line = ' '.join(unicodedata.normalize('NFKC', text).split())
+        if not line:
+            continue
+        row = {'line': number, 'text': text, 'status': OK, 'date': None, 'venue': '', 'message': ''}
+
+        match = SCHEDULE_LINE_RE.match(line)
+        if not match:
+            row.update(status=ERROR, message='日付を読み取れません')
+            yield row
+            continue
+
+        month, day = int(match['month']), int(match['day'])
+        try:
+            if match['year']:
+                parsed = date(int(match['year']), month, day)
+            else:
+                year = previous.year if previous else today.year
+                parsed = date(year, month, day)
+                if previous and parsed < previous:
+                    parsed = date(year + 1, month, day)
+                elif not previous and parsed < today - YEAR_ROLLOVER:
+                    parsed = date(year + 1, month, day)
+        except ValueError:
+            row.update(status=ERROR, message='存在しない日付です')
+            yield row
+            continue
+
+        venue = match['venue']
+        weekday_label = match['weekday'] or ''
+        weekday = _weekday_of(weekday_label)
+        if weekday_label and weekday is None and '祝' not in weekday_label:
+            # 曜日ではない括弧書き（"(東京)" など）は会場名の一部として残す
+            venue = f"({weekday_label}) {venue}"
+        venue = venue.strip(' -–—:：|')
+        if not venue:
+            row.update(status=ERROR, date=parsed, message='会場がありません')
+            yield row
+            continue
+
+        if weekday is not None and weekday != parsed.weekday():
+            row['message'] = f"曜日が日付（{parsed:%Y-%m-%d}）と一致しません"
+
+        previous = parsed
+        row.update(date=parsed, venue=venue)
+        yield row
+
+def import_tour_schedule(artist, event_name, raw_text, today=None):
+    """
+    ツアー日程を解析して EventDay と Performance を1トランザクションでまとめて登録する。
+    既存の日程・出演は保持し（一意制約は ignore_conflicts で吸収）、行ごとの結果を返す。
+    戻り値: {'event': Event または None, 'rows': 行ごとの結果}
+    """
+    rows = list(parse_schedule(raw_text, today=today))
+
+    # 貼り付けた中の重複（同じ日付・会場）は最初の行だけを使う
+    seen = set()
+    valid = []
+    for row in rows:
+        if row['status'] != OK:
+            continue
+        key = (row['date'], row['venue'])
+        if key in seen:
+            row.update(status=DUPLICATE, message='同じ日程・会場が既にあります')
+            continue
+        seen.add(key)
+        valid.append(row)
+
+    if not valid:
+        return {'event': None, 'rows': rows}
+
+    dates = [row['date'] for row in valid]
+    with transaction.atomic():
+        event, created = Event.objects.get_or_create(
+            name=event_name,
+            defaults={'start_date': min(dates), 'end_date': max(dates), 'event_type': 'FES'},
+        )
+        if not created and (min(dates) < event.start_date or max(dates) > event.end_date):
+            # 開催期間の外の日程が含まれていれば期間を広げる
+            event.start_date = min(event.start_date, min(dates))
+            event.end_date = max(event.end_date, max(dates))
+            event.save(update_fields=['start_date', 'end_date'])
+
+        EventDay.objects.bulk_create(
+            [EventDay(event=event, date=row['date'], venue=row['venue']) for row in valid],
+            ignore_conflicts=True,
+        )
+        day_ids = {
+            (day_date, venue): pk
+            for pk, day_date, venue in EventDay.objects.filter(event=event, date__in=set(dates))
+            .values_list('pk', 'date', 'venue')
+        }
+        existing = set(
+            Performance.objects.filter(artist=artist, event_day_id__in=day_ids.values())
+            .values_list('event_day_id', flat=True)
+        )
+
+        new_performances = []
+        for row in valid:
+            day_id = day_ids[(row['date'], row['venue'])]
+            if day_id in existing:
+                row['status'] = EXISTS
+            else:
+                row['status'] = CREATED
+                new_performances.append(Performance(event_day_id=day_id, artist=artist))
+        Performance.objects.bulk_create(new_performances, ignore_conflicts=True)
+
+        if new_performances:
+            # bulk_create はシグナルが飛ばないのでタイムテーブルのキャッシュはここで破棄する
+            changed = [p.event_day_id for p in new_performances]
+            transaction.on_commit(lambda: invalidate_timetable_cache(changed))
+
+    return {'event': event, 'rows': rows}
+
+def summarize_schedule_import(result):
+    """ツアー日程取り込み結果の件数サマリー文字列を作る"""
+    counts = Counter(row['status'] for row in result['rows'])
+    return (
+        f"{counts[CREATED]} 件の出演日程を登録しました。"
+        f"（登録済み: {counts[EXISTS]} 件、重複: {counts[DUPLICATE]} 件、読み取れない行: {counts[ERROR]} 件）"
+    )
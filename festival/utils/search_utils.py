@@ -0,0 +1,123 @@
+import unicodedata
+
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+from festival.models import Artist, ArtistSearchIndex
+from festival.utils.text_utils import get_furigana
+
+FTS_TABLE = ArtistSearchIndex._meta.db_table  # 0016 マイグレーションで作成（SQLite のみ）
+TRIGRAM_MIN_LENGTH = 3  # trigram インデックスで引ける最短の文字数
+# search_artists の並び順（末尾の id で一意になるのでキーセットページネーションにも使える）
+SEARCH_ORDERING = ('search_rank', 'furigana', 'id')
+
+
+def normalize_query(query):
+    """検索語を正規化する（全角英数・半角カナの統一、前後・連続空白の除去）"""
+    return ' '.join(unicodedata.normalize('NFKC', query or '').split())
+
+def search_terms(query):
+    """検索語とそのひらがな読み（カタカナ・漢字で入力されても furigana に当たるように）"""
+    query = normalize_query(query)
+    if not query:
+        return []
+    return list(dict.fromkeys([query, get_furigana(query)]))
+
+def _fts_match_expression(terms):
+    # 各語をフレーズとして扱い、FTS5 の演算子として解釈されないようにする
+    return ' OR '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+def _use_fts(terms):
+    return connection.vendor == 'sqlite' and all(len(term) >= TRIGRAM_MIN_LENGTH for term in terms)
+
+def search_artists(query, queryset=None):
+    """
+    アーティストを名前・ふりがな・ローマ字で検索し、関連度順の QuerySet を返す。
+    SQLite では FTS5 trigram インデックスを bm25 で順位付けして引く。
+    それ以外のDB（または trigram で引けない2文字以下の検索語）は部分一致で検索し、
+    完全一致 → 前方一致 → 部分一致の順に並べる。
+    """
+    queryset = Artist.objects.all() if queryset is None else queryset
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    if _use_fts(terms):
+        # FTS5 テーブルを JOIN して MATCH で絞り込み、その rank（bm25）で並べる
+        return queryset.filter(
+            search_index__document__match=_fts_match_expression(terms),
+        ).annotate(
+            # annotate にしておくと search_rank で絞り込める（キーセットページネーション用）
+            search_rank=F('search_index__rank'),
+        ).order_by(*SEARCH_ORDERING)
+
+    matches = Q()
+    exact = Q()
+    prefix = Q()
+    for term in terms:
+        matches |= Q(name__icontains=term) | Q(furigana__icontains=term) | Q(romaji__icontains=term)
+        exact |= Q(name__iexact=term) | Q(furigana__iexact=term) | Q(romaji__iexact=term)
+        prefix |= Q(name__istartswith=term) | Q(furigana__istartswith=term) | Q(romaji__istartswith=term)
+    return queryset.filter(matches).annotate(
+        search_rank=Case(
+            When(exact, then=Value(0)),
+            When(prefix, then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField(),
+        )
+    ).order_by(*SEARCH_ORDERING)
+
+
+# FTS5 インデックスの同期トリガー =============================================
+# 0016 マイグレーションで作成するが、SQLite でテーブルを作り直すマイグレーション
+# （AlterField など）を festival_artist に適用するとトリガーが消える。
+# missing_search_index_objects で確認し、rebuild_search_index コマンドで作り直す。
+
+FTS_TRIGGERS = {
+    f'{FTS_TABLE}_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON festival_artist BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, name, furigana, romaji)
+            VALUES (new.id, new.name, new.furigana, new.romaji);
+        END
+    """,
+    f'{FTS_TABLE}_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON festival_artist BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, furigana, romaji)
+            VALUES ('delete', old.id, old.name, old.furigana, old.romaji);
+        END
+    """,
+    f'{FTS_TABLE}_au': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, furigana, romaji ON festival_artist BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, furigana, romaji)
+            VALUES ('delete', old.id, old.name, old.furigana, old.romaji);
+            INSERT INTO {FTS_TABLE}(rowid, name, furigana, romaji)
+            VALUES (new.id, new.name, new.furigana, new.romaji);
+        END
+    """,
+}
+
+def missing_search_index_objects():
+    """SQLite で FTS5 テーブル・同期トリガーのうち存在しないものの名前を返す（SQLite 以外は常に空）"""
+    if connection.vendor != 'sqlite':
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE (type = 'table' AND name = %s) OR (type = 'trigger' AND tbl_name = %s)",
+            [FTS_TABLE, Artist._meta.db_table],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+    return [name for name in [FTS_TABLE, *FTS_TRIGGERS] if name not in existing]
+
+def rebuild_search_index():
+    """
+    消えたトリガーを作り直し、FTS5 インデックスを festival_artist から再構築する（SQLite のみ）。
+    作り直したトリガーの名前を返す。FTS5 テーブル自体がない場合は RuntimeError（マイグレーションが必要）。
+    """
+    missing = missing_search_index_objects()
+    if FTS_TABLE in missing:
+        raise RuntimeError(f"{FTS_TABLE} がありません。migrate を実行してください")
+    with connection.cursor() as cursor:
+        for name in missing:
+            cursor.execute(FTS_TRIGGERS[name])
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return missing
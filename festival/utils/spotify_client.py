@@ -0,0 +1,225 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+
+RETRY_STATUS_CODES = {500, 502, 503, 504}  # GET（と retry_server_errors=True の POST）だけリトライ対象にするステータス
+
+
+class RetryAfterTooLong(requests.exceptions.HTTPError):
+    """
+    429 の Retry-After が待ち時間の上限（backoff_max）を超えたことを表す例外。
+    RequestException のサブクラスなので、呼び出し側の通信エラー処理でそのまま扱える。
+    """
+
+    def __init__(self, retry_after, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    クライアント側のトークンバケット型レートリミッタ（スレッドセーフ）。
+    rate 件/秒で補充し、最大 capacity 件までのバーストを許可する。
+    429 の Retry-After を受けた場合は pause() で全呼び出し元をまとめて待たせる。
+    """
+
+    def __init__(self, rate, capacity=None, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._sleep = sleep
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def acquire(self):
+        """トークンを1つ取得する（足りなければ待つ）。待った秒数を返す"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+    def pause(self, seconds):
+        """指定秒数、新しいリクエストを止める（Retry-After 用）"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class SpotifyClient:
+    """
+    Spotify Web API 用の共有HTTPクライアント。
+    requests.Session のコネクションプールで TCP/TLS 接続を再利用し、
+    既定タイムアウトとエンドポイント別のレイテンシ統計を持つ。
+    レートリミッタを共有し、429 は Retry-After に従って待ってから再送、
+    GET は 5xx・接続エラー時にジッター付き指数バックオフで再送する。
+    """
+
+    def __init__(self, pool_size=10, timeout=10, rate_limit=None, burst=None,
+                 max_retries=3, backoff_base=0.5, backoff_max=30, sleep=time.sleep):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.limiter = TokenBucket(rate_limit, burst, sleep=sleep) if rate_limit else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+        self._throttle = {'throttled_time': 0.0, 'rate_limited': 0, 'retries': 0}
+
+    def request(self, method, url, endpoint=None, retry_server_errors=None, **kwargs):
+        """
+        共通リクエスト処理（timeout 未指定なら既定値を使う）。
+        5xx は既定では GET だけ再試行する。サーバーが失敗を返した POST を再送しても安全な
+        呼び出し側は retry_server_errors=True を渡す（接続エラーは処理済みか不明なので再送しない）。
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        endpoint = endpoint or f"{method} {urlsplit(url).path}"
+        idempotent = method.upper() == 'GET'
+        if retry_server_errors is None:
+            retry_server_errors = idempotent
+
+        for attempt in range(self.max_retries + 1):
+            if self.limiter:
+                self._add_throttle(self.limiter.acquire())
+            last_attempt = attempt == self.max_retries
+            try:
+                response = self._send(method, url, endpoint, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if not idempotent or last_attempt:
+                    raise
+                self._backoff(attempt)
+                continue
+
+            if response.status_code == 429 and not last_attempt:
+                # 429 はサーバー側で処理されていないので POST も含めて再送する
+                self._wait_retry_after(response, attempt)
+                continue
+            if retry_server_errors and response.status_code in RETRY_STATUS_CODES and not last_attempt:
+                self._backoff(attempt)
+                continue
+            return response
+
+    def _send(self, method, url, endpoint, **kwargs):
+        start = time.perf_counter()
+        failed = False
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            failed = True
+            raise
+        finally:
+            self._record(endpoint, time.perf_counter() - start, failed)
+
+    def _wait_retry_after(self, response, attempt):
+        try:
+            wait = float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            wait = self._backoff_delay(attempt)
+        if wait > self.backoff_max:
+            # 長い待ちはレートリミッタ経由で全スレッド（Webリクエストも）を止めてしまうので待たずに諦める
+            with self._stats_lock:
+                self._throttle['rate_limited'] += 1
+            raise RetryAfterTooLong(
+                wait, f"429 Too Many Requests: Retry-After {wait:g} 秒が上限 {self.backoff_max:g} 秒を超えています",
+                response=response,
+            )
+        wait = max(wait, 0)
+        with self._stats_lock:
+            self._throttle['rate_limited'] += 1
+            self._throttle['retries'] += 1
+        if self.limiter:
+            # 他スレッドも含めて止める（待ち時間は次の acquire() で計上される）
+            self.limiter.pause(wait)
+        else:
+            self._sleep(wait)
+            self._add_throttle(wait)
+
+    def _backoff_delay(self, attempt):
+        # フルジッター: 0〜min(上限, base * 2^attempt) の一様乱数
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _backoff(self, attempt):
+        wait = self._backoff_delay(attempt)
+        with self._stats_lock:
+            self._throttle['retries'] += 1
+        self._sleep(wait)
+        self._add_throttle(wait)
+
+    def _add_throttle(self, seconds):
+        if seconds:
+            with self._stats_lock:
+                self._throttle['throttled_time'] += seconds
+
+    def throttle_stats(self):
+        """レート制限・リトライで待った合計秒数と、429 回数・リトライ回数を返す"""
+        with self._stats_lock:
+            return dict(self._throttle)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, data=None, **kwargs):
+        return self.request('POST', url, data=data, **kwargs)
+
+    def _record(self, endpoint, elapsed, failed):
+        with self._stats_lock:
+            stat = self._stats.setdefault(endpoint, {
+                'count': 0, 'errors': 0, 'total_time': 0.0, 'max_time': 0.0,
+            })
+            stat['count'] += 1
+            stat['total_time'] += elapsed
+            stat['max_time'] = max(stat['max_time'], elapsed)
+            if failed:
+                stat['errors'] += 1
+
+    def stats(self):
+        """エンドポイント別の件数・エラー数・平均/最大レイテンシ（秒）を返す"""
+        with self._stats_lock:
+            return {
+                endpoint: {
+                    **stat,
+                    'avg_time': stat['total_time'] / stat['count'] if stat['count'] else 0.0,
+                }
+                for endpoint, stat in self._stats.items()
+            }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats.clear()
+            self._throttle = {'throttled_time': 0.0, 'rate_limited': 0, 'retries': 0}
+
+    def close(self):
+        self.session.close()
+
+
+# プロセス全体で共有するクライアント
+spotify_client = SpotifyClient(
+    pool_size=getattr(settings, 'SPOTIFY_HTTP_POOL_SIZE', 10),
+    timeout=getattr(settings, 'SPOTIFY_HTTP_TIMEOUT', 10),
+    rate_limit=getattr(settings, 'SPOTIFY_RATE_LIMIT_PER_SECOND', None),
+    burst=getattr(settings, 'SPOTIFY_RATE_LIMIT_BURST', None),
+    max_retries=getattr(settings, 'SPOTIFY_MAX_RETRIES', 3),
+)
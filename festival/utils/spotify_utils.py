@@ -1,19 +1,92 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from django.conf import settings
 from festival.models import Artist
+from festival.utils.spotify_client import spotify_client
 from festival.utils.text_utils import get_furigana
 
 from spotipy.oauth2 import SpotifyOAuth
 
-def get_app_token():
-    """Spotify API用のアクセストークンを取得(アプリ用：読み取り専用)"""
-    auth_url = "https://accounts.spotify.com/api/token"
+class AppTokenCache:
+    """
+    Client Credentials トークンをプロセス内で共有するキャッシュ。
+    expires_in の少し手前まで再利用し、期限切れ時は複数スレッドが同時に
+    来ても取得リクエストは1回だけにする。
+    """
+
+    def __init__(self, fetcher, refresh_margin=60):
+        self._fetcher = fetcher
+        self._refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def _is_fresh(self):
+        return self._token is not None and time.monotonic() < self._expires_at
+
+    def get(self):
+        """有効なトークンを返す（期限切れなら再取得）"""
+        with self._lock:
+            if self._is_fresh():
+                self.hits += 1
+                return self._token
+
+            # ロック保持中に取得するので、待っていた他スレッドは取得後のトークンを使う
+            self.misses += 1
+            result = self._fetcher()
+            if not result:
+                return None
+            token, expires_in = result
+            self._token = token
+            self._expires_at = time.monotonic() + max(expires_in - self._refresh_margin, 0)
+            return token
+
+    def invalidate(self):
+        """キャッシュ済みトークンを破棄（401を受けた時など）"""
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+
+    def clear(self):
+        """トークンと統計情報をリセット"""
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """ヒット数・ミス数・ヒット率を返す"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+def api_base_url():
+    """Web APIのベースURL（ローカルのフェイクサーバーに向ける場合は settings で変更）"""
+    return getattr(settings, 'SPOTIFY_API_BASE_URL', 'https://api.spotify.com/v1').rstrip('/')
+
+def accounts_base_url():
+    """認証サーバーのベースURL"""
+    return getattr(settings, 'SPOTIFY_ACCOUNTS_BASE_URL', 'https://accounts.spotify.com').rstrip('/')
+
+def fetch_app_token():
+    """Spotify API用のアクセストークンと有効秒数を取得(キャッシュなし)"""
+    auth_url = f"{accounts_base_url()}/api/token"
     try:
-        response = requests.post(auth_url, {
+        response = spotify_client.post(auth_url, {
             'grant_type': 'client_credentials',
             'client_id': settings.SPOTIFY_CLIENT_ID,
             'client_secret': settings.SPOTIFY_CLIENT_SECRET,
-        })
+        }, endpoint='token')
     except requests.exceptions.RequestException as e:
         print(f"Token取得リクエストエラー: {e}")
         return None
@@ -23,49 +96,71 @@ def get_app_token():
         return None
 
     try:
-        return response.json()['access_token']
+        data = response.json()
+        return data['access_token'], int(data.get('expires_in', 3600))
     except ValueError:
         print("TokenレスポンスがJSON形式ではありません")
         return None
 
-def search_artist(name):
-    """Spotify APIでアーティストを検索し、必要な情報を抽出"""
+app_token_cache = AppTokenCache(fetch_app_token)
+
+def get_app_token():
+    """Spotify API用のアクセストークンを取得(アプリ用：読み取り専用、プロセス内キャッシュ)"""
+    return app_token_cache.get()
+
+class SpotifyAPIError(Exception):
+    """Spotify API 呼び出しに失敗したことを表す例外"""
+
+def find_artist(name):
+    """
+    Spotify APIでアーティストを検索する（ふりがな変換なし）。
+    見つからなければ None、通信・レスポンスの失敗時は SpotifyAPIError を送出。
+    """
     token = get_app_token()
     if not token:
-        return None
+        raise SpotifyAPIError("アクセストークンの取得に失敗しました")
 
     headers = {'Authorization': f'Bearer {token}'}
     params = {'q': name, 'type': 'artist', 'limit': 1}
 
     try:
-        response = requests.get('https://api.spotify.com/v1/search', headers=headers, params=params)
-        if response.status_code != 200:
-            print(f"検索失敗: {response.status_code} - {response.text}")
-            return None
+        response = spotify_client.get(f'{api_base_url()}/search', headers=headers, params=params, endpoint='search')
     except requests.exceptions.RequestException as e:
-        print(f"Spotify検索リクエストエラー: {e}")
-        return None
+        raise SpotifyAPIError(f"Spotify検索リクエストエラー: {e}") from e
+    if response.status_code != 200:
+        raise SpotifyAPIError(f"検索失敗: {response.status_code} - {response.text}")
 
     try:
         data = response.json()
-    except ValueError:
-        print("検索結果がJSON形式ではありません")
-        return None
+    except ValueError as e:
+        raise SpotifyAPIError("検索結果がJSON形式ではありません") from e
 
     items = data.get('artists', {}).get('items', [])
     if not items:
-        print(f"アーティストが見つかりません: {name}")
         return None
 
     artist = items[0]
     return {
         'name': artist['name'],
-        'furigana': get_furigana(name),
         'spotify_id': artist['id'],
         'popularity': artist.get('popularity', 0),
         'genres': artist.get('genres', [])
     }
 
+def search_artist(name):
+    """Spotify APIでアーティストを検索し、必要な情報を抽出"""
+    try:
+        artist = find_artist(name)
+    except SpotifyAPIError as e:
+        print(e)
+        return None
+
+    if not artist:
+        print(f"アーティストが見つかりません: {name}")
+        return None
+
+    return {**artist, 'furigana': get_furigana(name)}
+
 def save_artist_from_spotify(name):
     """取得したアーティスト情報をDjangoモデルに保存"""
     artist_data = search_artist(name)
@@ -82,25 +177,29 @@ def save_artist_from_spotify(name):
         return artist
     return None
 
-def get_top_tracks(spotify_id, market='JP'):
+def fetch_top_tracks(spotify_id, market='JP'):
     """
-    指定されたSpotifyアーティストIDからトップトラック（代表曲）を取得する。
+    トップトラックを取得する（失敗時は SpotifyAPIError を送出）。
     各トラックに name, artist, spotify_url, uri を含めて返す。
     """
     token = get_app_token()
     if not token:
-        print("アクセストークンの取得に失敗しました")
-        return []
+        raise SpotifyAPIError("アクセストークンの取得に失敗しました")
 
     headers = {'Authorization': f'Bearer {token}'}
-    url = f'https://api.spotify.com/v1/artists/{spotify_id}/top-tracks'
+    url = f'{api_base_url()}/artists/{spotify_id}/top-tracks'
     params = {'market': market}
 
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        response = spotify_client.get(url, headers=headers, params=params, endpoint='top-tracks')
         response.raise_for_status()
         data = response.json()
-        tracks = data.get('tracks', [])
+    except requests.exceptions.RequestException as e:
+        raise SpotifyAPIError(f"Spotify API接続エラー: {e}") from e
+    except ValueError as e:
+        raise SpotifyAPIError("トップトラックのレスポンスがJSON形式ではありません") from e
+
+    try:
         return [
             {
                 'name': track['name'],
@@ -108,14 +207,45 @@ def get_top_tracks(spotify_id, market='JP'):
                 'spotify_url': track['external_urls']['spotify'],
                 'uri': track['uri']
             }
-            for track in tracks
+            for track in data['tracks']
         ]
-    except requests.exceptions.RequestException as e:
-        print(f"Spotify API接続エラー: {e}")
+    except (KeyError, IndexError, TypeError) as e:
+        # 想定外の形のレスポンスも他のアーティストを巻き込まないよう SpotifyAPIError にする
+        raise SpotifyAPIError(f"トップトラックのレスポンス形式が不正です: {e!r}") from e
+
+def get_top_tracks(spotify_id, market='JP'):
+    """
+    指定されたSpotifyアーティストIDからトップトラック（代表曲）を取得する。
+    各トラックに name, artist, spotify_url, uri を含めて返す。失敗時は空リスト。
+    """
+    try:
+        return fetch_top_tracks(spotify_id, market)
+    except SpotifyAPIError as e:
+        print(e)
         return []
-    except ValueError:
-        print("トップトラックのレスポンスがJSON形式ではありません")
+
+def get_top_tracks_many(spotify_ids, market='JP', max_workers=None):
+    """
+    複数アーティストのトップトラックをスレッドプールで並行取得する。
+    入力と同じ順序で {'spotify_id', 'tracks', 'error'} のリストを返し、
+    失敗したアーティストは tracks=[] と error にメッセージを入れる（全体は止めない）。
+    """
+    spotify_ids = list(spotify_ids)
+    if not spotify_ids:
         return []
+
+    def fetch(spotify_id):
+        try:
+            return {'spotify_id': spotify_id, 'tracks': fetch_top_tracks(spotify_id, market), 'error': None}
+        except SpotifyAPIError as e:
+            print(f"{spotify_id}: {e}")
+            return {'spotify_id': spotify_id, 'tracks': [], 'error': str(e)}
+
+    max_workers = max_workers or getattr(settings, 'SPOTIFY_MAX_WORKERS', 8)
+    workers = min(max_workers, len(spotify_ids))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # executor.map は入力順で結果を返す
+        return list(executor.map(fetch, spotify_ids))
     
 def get_user_token(request):
     """Spotifyユーザー認証トークンを取得（Authorization Code Flow）"""
@@ -146,63 +276,112 @@ def get_user_token(request):
     request.session["spotify_token"] = token_info["access_token"]
     return token_info["access_token"]
 
+PLAYLIST_ADD_BATCH_SIZE = 100  # 楽曲追加APIの1リクエストあたり上限
+PLAYLIST_MAX_TRACKS = 10000    # Spotifyプレイリストの最大曲数
+
+class PlaylistPartiallySavedError(SpotifyAPIError):
+    """
+    楽曲追加が途中のバッチで失敗したことを表す例外。
+    プレイリストは作成済みで、added_count 曲目までは追加されている（playlist_url で開ける）。
+    """
+    def __init__(self, message, added_count, playlist_url=None):
+        super().__init__(message)
+        self.added_count = added_count
+        self.playlist_url = playlist_url
+
+def dedupe_track_uris(track_uris):
+    """空要素と重複URIを除外（順序は維持）"""
+    return list(dict.fromkeys(uri.strip() for uri in track_uris if uri and uri.strip()))
+
+def add_tracks_to_playlist(playlist_id, track_uris, headers):
+    """
+    楽曲を100件ずつのバッチで順番に追加する。
+    429（Retry-After 対応）と 5xx はサーバーが追加していないと返しているので、
+    spotify_client がそのバッチをバックオフしながら再送する（retry_server_errors=True）。
+    接続エラーは Spotify 側で追加済みの可能性があり、再送すると曲が重複するので、そのバッチで止める。
+    再試行しても失敗したら PlaylistPartiallySavedError を送出する（それまでのバッチは追加済み）。
+    """
+    url = f"{api_base_url()}/playlists/{playlist_id}/tracks"
+    for i in range(0, len(track_uris), PLAYLIST_ADD_BATCH_SIZE):
+        batch = track_uris[i:i + PLAYLIST_ADD_BATCH_SIZE]
+        position = f"{i + 1}〜{i + len(batch)}曲目"
+        try:
+            add_res = spotify_client.post(
+                url, headers=headers, json={"uris": batch}, endpoint='add-tracks', retry_server_errors=True
+            )
+        except requests.exceptions.RequestException as e:
+            raise PlaylistPartiallySavedError(
+                f"楽曲追加リクエストエラー（{position}、追加されたかは不明）: {e}", added_count=i
+            ) from e
+        if add_res.status_code not in (200, 201):
+            raise PlaylistPartiallySavedError(
+                f"楽曲追加失敗（{position}）: {add_res.status_code} - {add_res.text}", added_count=i
+            )
+
 def save_playlist_to_spotify(user_token, track_uris, playlist_name="フェス予習プレイリスト"):
-    """Spotify上にプレイリストを作成し、楽曲を追加する"""
+    """
+    Spotify上にプレイリストを作成し、楽曲を追加する（100件を超える場合は分割して追加）。
+    作成までに失敗したら None、楽曲追加が途中で失敗したら PlaylistPartiallySavedError を送出する。
+    """
     # print("🎧 Saving playlist to Spotify...")
     # print("Track URIs:", track_uris)
 
     headers = {"Authorization": f"Bearer {user_token}"}
+    track_uris = dedupe_track_uris(track_uris)
 
-    # 1. ユーザー情報取得
-    user_res = requests.get("https://api.spotify.com/v1/me", headers=headers)
-    if user_res.status_code != 200:
-        print(f"ユーザー情報取得失敗: {user_res.status_code} - {user_res.text}")
-        return None
+    try:
+        # 1. ユーザー情報取得
+        user_res = spotify_client.get(f"{api_base_url()}/me", headers=headers, endpoint='me')
+        if user_res.status_code != 200:
+            print(f"ユーザー情報取得失敗: {user_res.status_code} - {user_res.text}")
+            return None
 
-    user_id = user_res.json().get("id")
-    if not user_id:
-        print("ユーザーIDが取得できませんでした")
-        return None
+        user_id = user_res.json().get("id")
+        if not user_id:
+            print("ユーザーIDが取得できませんでした")
+            return None
 
-    # ユーザー情報取得ログ
-    # print("User info status:", user_res.status_code, user_res.text)
-
-    # 2. プレイリスト作成
-    create_res = requests.post(
-        f"https://api.spotify.com/v1/users/{user_id}/playlists",
-        headers=headers,
-        json={
-            "name": playlist_name,
-            "description": "イベント出演アーティストの代表曲まとめ",
-            "public": False
-        }
-    )
-    if create_res.status_code != 201:
-        print(f"プレイリスト作成失敗: {create_res.status_code} - {create_res.text}")
-        return None
+        # ユーザー情報取得ログ
+        # print("User info status:", user_res.status_code, user_res.text)
 
-    playlist_id = create_res.json().get("id")
-    if not playlist_id:
-        print("プレイリストIDが取得できませんでした")
-        return None
+        # 2. プレイリスト作成
+        create_res = spotify_client.post(
+            f"{api_base_url()}/users/{user_id}/playlists",
+            headers=headers,
+            json={
+                "name": playlist_name,
+                "description": "イベント出演アーティストの代表曲まとめ",
+                "public": False
+            },
+            endpoint='create-playlist'
+        )
+        if create_res.status_code != 201:
+            print(f"プレイリスト作成失敗: {create_res.status_code} - {create_res.text}")
+            return None
 
-    # プレイリスト作成ログ
-    # print("Playlist create status:", create_res.status_code, create_res.text)
+        playlist_id = create_res.json().get("id")
+        if not playlist_id:
+            print("プレイリストIDが取得できませんでした")
+            return None
 
-    # 3. 楽曲追加（最大100件まで）
-    add_res = requests.post(
-        f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks",
-        headers=headers,
-        json={"uris": track_uris}
-    )
-    if add_res.status_code != 201:
-        print(f"楽曲追加失敗: {add_res.status_code} - {add_res.text}")
+        # プレイリスト作成ログ
+        # print("Playlist create status:", create_res.status_code, create_res.text)
+    except requests.exceptions.RequestException as e:
+        print(f"Spotify API接続エラー: {e}")
         return None
-    # 楽曲追加ログ
-    # print("Track add status:", add_res.status_code, add_res.text)
+
+    playlist_url = create_res.json().get("external_urls", {}).get("spotify")
+
+    # 3. 楽曲追加（100件ずつ）。途中で失敗したら作成済みのプレイリストURLを付けて送出する
+    try:
+        add_tracks_to_playlist(playlist_id, track_uris, headers)
+    except PlaylistPartiallySavedError as e:
+        print(e)
+        e.playlist_url = playlist_url
+        raise
 
     # 4. プレイリストURLを返す
-    return create_res.json().get("external_urls", {}).get("spotify")
+    return playlist_url
 
 def fetch_artist_image(spotify_id):
     """Spotify APIからアーティスト画像URLを取得（最小サイズを選択）"""
@@ -211,10 +390,10 @@ def fetch_artist_image(spotify_id):
         return None
 
     headers = {'Authorization': f'Bearer {token}'}
-    url = f'https://api.spotify.com/v1/artists/{spotify_id}'
+    url = f'{api_base_url()}/artists/{spotify_id}'
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = spotify_client.get(url, headers=headers, endpoint='artist')
         response.raise_for_status()
         data = response.json()
         images = data.get('images', [])
@@ -228,4 +407,50 @@ def fetch_artist_image(spotify_id):
         return None
     except ValueError:
         print("レスポンスがJSON形式ではありません")
-        return None
\ No newline at end of file
+        return None
+
+ARTISTS_BATCH_SIZE = 50  # /v1/artists?ids= の1リクエストあたり上限
+
+def fetch_artists_metadata(spotify_ids):
+    """
+    複数アーティストの画像・人気度・ジャンルを /v1/artists でまとめて取得する。
+    50件ずつに分割してリクエストし、{spotify_id: {...}} の辞書を返す。
+    取得できなかったIDは結果に含まれない。
+    """
+    ids = list(dict.fromkeys(i for i in spotify_ids if i))  # 重複・空を除外（順序維持）
+    if not ids:
+        return {}
+
+    token = get_app_token()
+    if not token:
+        return {}
+
+    headers = {'Authorization': f'Bearer {token}'}
+    url = f'{api_base_url()}/artists'
+    results = {}
+
+    for i in range(0, len(ids), ARTISTS_BATCH_SIZE):
+        chunk = ids[i:i + ARTISTS_BATCH_SIZE]
+        try:
+            response = spotify_client.get(url, headers=headers, params={'ids': ','.join(chunk)}, endpoint='artists')
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"Spotify API接続エラー: {e}")
+            continue
+        except ValueError:
+            print("レスポンスがJSON形式ではありません")
+            continue
+
+        for artist in data.get('artists', []):
+            if not artist:
+                continue  # 存在しないIDは null で返る
+            images = artist.get('images', [])
+            results[artist['id']] = {
+                # Spotifyは大きい順に並んでいるので最後の要素が最小サイズ
+                'image_url': images[-1].get('url') if images else None,
+                'popularity': artist.get('popularity', 0),
+                'genres': artist.get('genres', []),
+            }
+
+    return results
@@ -0,0 +1,6 @@
+def id_map(objects, key='pk'):
+    """
+    テンプレートで ID からオブジェクトを引くための辞書を作る（lookup フィルタと組み合わせて使う）。
+    QuerySet を渡した場合はここで1回だけ評価される。
+    """
+    return {getattr(obj, key): obj for obj in objects}
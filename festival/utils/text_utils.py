@@ -1,54 +1,181 @@
-import pykakasi
+import threading
 import unicodedata
-import re
+from functools import lru_cache
 
-# pykakasi 設定
-kks = pykakasi.kakasi()
-kks.setMode("H", "H")        # ひらがな → ひらがな
-kks.setMode("K", "H")        # カタカナ → ひらがな
-kks.setMode("J", "H")        # 漢字 → ひらがな
-kks.setMode("r", "Hepburn")  # ローマ字変換（必要なら）
+# pykakasi は import と辞書の読み込みに時間がかかるため、初回の変換時に生成する
+_converter = None
+_converter_lock = threading.Lock()
 
-converter = kks.getConverter()
+def _get_converter():
+    """pykakasi の変換器を返す（初回呼び出し時にスレッドセーフに生成）"""
+    global _converter
+    if _converter is None:
+        with _converter_lock:
+            if _converter is None:
+                import pykakasi
+
+                kks = pykakasi.kakasi()
+                kks.setMode("H", "H")        # ひらがな → ひらがな
+                kks.setMode("K", "H")        # カタカナ → ひらがな
+                kks.setMode("J", "H")        # 漢字 → ひらがな
+                kks.setMode("r", "Hepburn")  # ローマ字変換（必要なら）
+                _converter = kks.getConverter()
+    return _converter
+
+def warm_up_furigana():
+    """変換器を事前に読み込む（Webワーカー起動時に初回リクエストの遅延を避けるため）"""
+    _get_converter()
+
+FURIGANA_CACHE_SIZE = 4096  # 変換結果を保持する最大件数（LRU）
+
+# pykakasi を通さずにそのまま返した件数（複数スレッドから更新されるのでロックを取る）
+_skipped = 0
+_skipped_lock = threading.Lock()
+
+def _needs_conversion(text):
+    """ASCII のみ・ひらがなのみの文字列は変換結果が入力と同じなので pykakasi を通さない"""
+    if text.isascii():
+        return False
+    return not all('\u3041' <= ch <= '\u309f' for ch in text)
+
+@lru_cache(maxsize=FURIGANA_CACHE_SIZE)
+def _convert(text):
+    converter = _get_converter()
+    with _converter_lock:  # pykakasi の変換器はスレッドセーフではないため直列化する
+        return converter.do(text)
 
 def get_furigana(text):
     """日本語の文字列からひらがな読みを生成"""
+    global _skipped
     if not text:
         return ''
-    return converter.do(text)
+    if not _needs_conversion(text):
+        with _skipped_lock:
+            _skipped += 1
+        return text
+    return _convert(text)
+
+def get_furigana_many(names):
+    """複数の名前をまとめて変換する（重複は1回だけ変換、入力順のリストを返す）"""
+    names = list(names)
+    readings = {name: get_furigana(name) for name in dict.fromkeys(names)}
+    return [readings[name] for name in names]
+
+def furigana_cache_stats():
+    """変換キャッシュのヒット数・ミス数・スキップ数とヒット率を返す"""
+    info = _convert.cache_info()
+    lookups = info.hits + info.misses + _skipped
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'skipped': _skipped,
+        'size': info.currsize,
+        'maxsize': info.maxsize,
+        'hit_rate': (info.hits + _skipped) / lookups if lookups else 0.0,
+    }
+
+def clear_furigana_cache():
+    global _skipped
+    _convert.cache_clear()
+    with _skipped_lock:
+        _skipped = 0
+
+# 五十音グループ（濁音・半濁音・小書き文字を含む）
+KANA_GROUPS = {
+    'あ': 'ぁあぃいぅうぇえぉおゔ',
+    'か': 'かがきぎくぐけげこごゕゖ',
+    'さ': 'さざしじすずせぜそぞ',
+    'た': 'ただちぢっつづてでとど',
+    'な': 'なにぬねの',
+    'は': 'はばぱひびぴふぶぷへべぺほぼぽ',
+    'ま': 'まみむめも',
+    'や': 'ゃやゅゆょよ',
+    'ら': 'らりるれろ',
+    'わ': 'ゎわゐゑをん',
+}
+
+# 先頭にあっても読みを持たない長音記号（次の文字で判定する）
+LONG_VOWEL_MARKS = 'ーｰ'
+
+def _build_initial_group_table():
+    """コードポイント → グループの対応表（ひらがな・カタカナ・英字）"""
+    table = {}
+    for group, chars in KANA_GROUPS.items():
+        for char in chars:
+            table[ord(char)] = group
+            table[ord(char) + 0x60] = group  # 対応するカタカナ（ァ〜ヶ）
+    for char in 'ヷヸヹヺ':  # ワ・ヰ・ヱ・ヲの濁音（対応するひらがながない）
+        table[ord(char)] = 'わ'
+    for code in range(ord('a'), ord('z') + 1):
+        table[code] = table[code - 0x20] = chr(code).upper()
+    return table
+
+INITIAL_GROUP_TABLE = _build_initial_group_table()
+
+def _group_of_reading(reading):
+    """読み（ふりがな）の先頭文字からグループを引く"""
+    if not reading:
+        return ''
+    group = INITIAL_GROUP_TABLE.get(ord(reading[0]))
+    if group:
+        return group
+    # 全角英字・半角カナなどは先頭1文字だけ正規化して引き直す
+    char = unicodedata.normalize('NFKC', reading[0])[:1]
+    return INITIAL_GROUP_TABLE.get(ord(char), char.lower()) if char else ''
 
 def get_initial_group(text):
     """文字列の先頭文字から五十音またはアルファベットグループを判定"""
     if not text:
         return ''
+    return _group_of_reading(get_furigana(text.lstrip(LONG_VOWEL_MARKS) or text))
 
-    # ひらがなに変換（例：漢字やカタカナを含む場合）
-    hira = get_furigana(text)
-    if not hira:
-        return ''
+def get_initial_groups(texts):
+    """複数の文字列の頭文字グループをまとめて判定する（入力順のリストを返す）"""
+    texts = [text.lstrip(LONG_VOWEL_MARKS) or text if text else '' for text in texts]
+    return [_group_of_reading(reading) for reading in get_furigana_many(texts)]
 
-    char = unicodedata.normalize('NFKC', hira)[0].lower()
-
-    # アルファベット判定
-    if re.match(r'[a-z]', char):
-        return char.upper()
-
-    # 五十音グループ判定（濁音・半濁音含む）
-    kana_groups = {
-        'あ': ['あ', 'い', 'う', 'え', 'お'],
-        'か': ['か', 'き', 'く', 'け', 'こ', 'が', 'ぎ', 'ぐ', 'げ', 'ご'],
-        'さ': ['さ', 'し', 'す', 'せ', 'そ', 'ざ', 'じ', 'ず', 'ぜ', 'ぞ'],
-        'た': ['た', 'ち', 'つ', 'て', 'と', 'だ', 'ぢ', 'づ', 'で', 'ど'],
-        'な': ['な', 'に', 'ぬ', 'ね', 'の'],
-        'は': ['は', 'ひ', 'ふ', 'へ', 'ほ', 'ば', 'び', 'ぶ', 'べ', 'ぼ', 'ぱ', 'ぴ', 'ぷ', 'ぺ', 'ぽ'],
-        'ま': ['ま', 'み', 'む', 'め', 'も'],
-        'や': ['や', 'ゆ', 'よ'],
-        'ら': ['ら', 'り', 'る', 'れ', 'ろ'],
-        'わ': ['わ', 'を', 'ん'],
-    }
+# ローマ字変換（検索用）も同様に初回利用時に生成する
+_romaji_converter = None
+_romaji_lock = threading.Lock()
+
+def _get_romaji_converter():
+    global _romaji_converter
+    if _romaji_converter is None:
+        with _romaji_lock:
+            if _romaji_converter is None:
+                import pykakasi
 
-    for group, chars in kana_groups.items():
-        if char in chars:
-            return group
+                kks = pykakasi.kakasi()
+                kks.setMode("H", "a")        # ひらがな → ローマ字
+                kks.setMode("K", "a")        # カタカナ → ローマ字
+                kks.setMode("J", "a")        # 漢字 → ローマ字
+                kks.setMode("r", "Hepburn")
+                _romaji_converter = kks.getConverter()
+    return _romaji_converter
 
-    return char  # fallback
\ No newline at end of file
+@lru_cache(maxsize=FURIGANA_CACHE_SIZE)
+def _convert_romaji(text):
+    converter = _get_romaji_converter()
+    with _romaji_lock:
+        return converter.do(text)
+
+def get_romaji(text):
+    """文字列をヘボン式ローマ字（小文字）に変換する（検索用）"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', text)
+    if text.isascii():
+        return text.lower()
+    return _convert_romaji(text).lower()
+
+def get_romaji_many(texts):
+    """複数の文字列をまとめてローマ字に変換する（入力順のリストを返す）"""
+    texts = list(texts)
+    romaji = {text: get_romaji(text) for text in dict.fromkeys(texts)}
+    return [romaji[text] for text in texts]
+
+def get_name_key(name):
+    """名前の同一判定用キー（全角・半角と大文字小文字、連続する空白の違いを無視する）"""
+    if not name:
+        return ''
+    return ' '.join(unicodedata.normalize('NFKC', name).casefold().split())
@@ -0,0 +1,309 @@
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.shortcuts import get_object_or_404
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+SLOT_MINUTES = 5  # タイムテーブルの1行の長さ（分）
+MINUTES_PER_DAY = 24 * 60
+
+
+@dataclass
+class TimetableColumn:
+    """表示列（ステージ内で時間が重なる出演は別レーンの列に分ける）"""
+    stage: object  # Stage または None（ステージ未定）
+    lane: int = 0
+
+    @property
+    def name(self):
+        return self.stage.name if self.stage else 'ステージ未定'
+
+    @property
+    def color_code(self):
+        return self.stage.color_code if self.stage else '#999999'
+
+
+@dataclass
+class TimetableEntry:
+    """1出演分の配置（分・スロットはタイムテーブル開始時刻からの相対値）"""
+    performance: object
+    column: int
+    start_minute: int
+    end_minute: int
+    start_slot: int
+    rowspan: int
+
+
+@dataclass
+class TimetableHeader:
+    """ステージ見出し（レーン数ぶん colspan する）"""
+    stage: object
+    name: str
+    color_code: str
+    colspan: int
+
+
+@dataclass
+class TimetableRow:
+    time: time
+    cells: list  # 描画するセルのみ（rowspan で覆われる位置は含まない）
+
+
+@dataclass
+class TimetableGrid:
+    origin: time | None
+    slot_minutes: int
+    slot_count: int
+    columns: list = field(default_factory=list)
+    entries: list = field(default_factory=list)
+
+    @property
+    def headers(self):
+        headers = []
+        for column in self.columns:
+            if column.lane and headers:
+                headers[-1].colspan += 1
+            else:
+                headers.append(TimetableHeader(column.stage, column.name, column.color_code, 1))
+        return headers
+
+    @property
+    def rows(self):
+        """<tr> ごとのセル（出演セルは rowspan 付き、空きスロットは rowspan=1 の空セル）"""
+        starts = {(entry.column, entry.start_slot): entry for entry in self.entries}
+        covered_until = [0] * len(self.columns)
+        rows = []
+        for slot in range(self.slot_count):
+            cells = []
+            for column in range(len(self.columns)):
+                entry = starts.get((column, slot))
+                if entry:
+                    covered_until[column] = slot + entry.rowspan
+                    cells.append({'entry': entry, 'column': self.columns[column], 'rowspan': entry.rowspan})
+                elif slot >= covered_until[column]:
+                    cells.append({'entry': None, 'column': self.columns[column], 'rowspan': 1})
+            rows.append(TimetableRow(time=self.time_at(slot), cells=cells))
+        return rows
+
+    @property
+    def matrix(self):
+        """列 × スロットの行列（各セルは entries のインデックス、空きは -1）"""
+        matrix = [[-1] * self.slot_count for _ in self.columns]
+        for index, entry in enumerate(self.entries):
+            matrix[entry.column][entry.start_slot:entry.start_slot + entry.rowspan] = [index] * entry.rowspan
+        return matrix
+
+    def time_at(self, slot):
+        return _add_minutes(self.origin, slot * self.slot_minutes)
+
+
+def _to_minutes(value):
+    return value.hour * 60 + value.minute
+
+def _add_minutes(value, minutes):
+    return (datetime.combine(datetime.min, value) + timedelta(minutes=minutes)).time()
+
+def timetable_origin(start_minutes):
+    """
+    タイムテーブルの開始時刻（分）を決める。
+    出演開始時刻を24時間の円周上に並べ、最も間隔が空いている区間の直後を開始とする
+    （深夜0時をまたぐオールナイトイベントでも 22:00 → 翌 05:00 の順に並ぶ）。
+    """
+    starts = sorted(set(m % MINUTES_PER_DAY for m in start_minutes))
+    if not starts:
+        return 0
+    best_gap, origin = -1, starts[0]
+    for i, start in enumerate(starts):
+        previous = starts[i - 1] - (MINUTES_PER_DAY if i == 0 else 0)
+        if start - previous > best_gap:
+            best_gap, origin = start - previous, start
+    return origin
+
+def build_timetable_grid(stages, performances, slot_minutes=SLOT_MINUTES):
+    """
+    ステージ × 時間スロットのタイムテーブルを組み立てる。
+    各出演の開始・終了を直接スロット番号に変換するので、計算量は出演数＋セル数に比例する。
+    - 終了が開始より前の出演は日付をまたぐものとして扱う（23:30〜00:30 など）
+    - 終了と開始が同じ出演は長さ 0 とし、開始スロットの 1 マスだけに置く
+    - ステージ未設定の出演は末尾の「ステージ未定」列に並べる
+    - 同じステージで時間が重なる出演は別レーン（列）に分ける
+    - 開始・終了時刻のない出演は表示しない
+    """
+    timed = [p for p in performances if p.start_time and p.end_time]
+    origin = timetable_origin(_to_minutes(p.start_time) for p in timed)
+    origin -= origin % slot_minutes  # 行の時刻をスロット境界にそろえる
+
+    spans = []
+    for perf in timed:
+        start = (_to_minutes(perf.start_time) - origin) % MINUTES_PER_DAY
+        end = (_to_minutes(perf.end_time) - origin) % MINUTES_PER_DAY
+        if end < start:
+            end += MINUTES_PER_DAY
+        spans.append((start, end, perf))
+    spans.sort(key=lambda span: (span[0], span[1]))
+
+    stage_order = list(stages)
+    stage_ids = {stage.pk for stage in stage_order}
+    by_stage = {stage.pk: [] for stage in stage_order}
+    unassigned = []
+    for span in spans:
+        stage_id = span[2].stage_id
+        if stage_id in stage_ids:
+            by_stage[stage_id].append(span)
+        else:
+            unassigned.append(span)
+
+    columns = []
+    entries = []
+
+    def place(stage, stage_spans):
+        # 開始順に、空いている最初のレーンへ入れる（区間分割の貪欲法）
+        # （重なり判定はスロット単位。同じセルに2組が入らないようにする）
+        lane_ends = []
+        first_column = len(columns)
+        for start, end, perf in stage_spans:
+            start_slot = start // slot_minutes
+            end_slot = max(start_slot + 1, -(-end // slot_minutes))
+            lane = next((i for i, lane_end in enumerate(lane_ends) if lane_end <= start_slot), None)
+            if lane is None:
+                lane = len(lane_ends)
+                lane_ends.append(end_slot)
+                columns.append(TimetableColumn(stage, lane))
+            lane_ends[lane] = end_slot
+            entries.append(TimetableEntry(
+                performance=perf, column=first_column + lane,
+                start_minute=start, end_minute=end,
+                start_slot=start_slot, rowspan=end_slot - start_slot,
+            ))
+        if not lane_ends:
+            columns.append(TimetableColumn(stage, 0))
+
+    for stage in stage_order:
+        place(stage, by_stage[stage.pk])
+    if unassigned:
+        place(None, unassigned)
+
+    slot_count = max((entry.start_slot + entry.rowspan for entry in entries), default=0)
+    return TimetableGrid(
+        origin=time(origin // 60, origin % 60) if timed else None,
+        slot_minutes=slot_minutes,
+        slot_count=slot_count,
+        columns=columns,
+        entries=entries,
+    )
+
+
+# レンダリング済みタイムテーブルのキャッシュ ==================================
+# Performance / Stage / Artist / EventDay の保存・削除シグナル（festival/signals.py）で無効化する。
+# bulk_create / bulk_update / QuerySet.update はシグナルが飛ばないので、
+# それらで出演を書き換える処理は invalidate_timetable_cache を直接呼ぶこと。
+
+TIMETABLE_CACHE_VARIANTS = ('public', 'staff', 'json')
+
+def _timetable_cache():
+    return caches[getattr(settings, 'TIMETABLE_CACHE_ALIAS', 'default')]
+
+def _cache_ttl():
+    return getattr(settings, 'TIMETABLE_CACHE_TTL', 60 * 60)
+
+def timetable_cache_key(event_day_id, variant):
+    # スタッフには編集ボタンが出るので HTML は public / staff で別キー、JSON API は json
+    return f"festival:timetable:{event_day_id}:{variant}"
+
+def invalidate_timetable_cache(event_day_ids):
+    """指定した EventDay のタイムテーブルキャッシュ（HTML・JSON）を破棄する"""
+    keys = [
+        timetable_cache_key(day_id, variant)
+        for day_id in set(event_day_ids) for variant in TIMETABLE_CACHE_VARIANTS
+    ]
+    if keys:
+        _timetable_cache().delete_many(keys)
+
+def load_timetable_grid(event_day):
+    """EventDay のステージ・出演を読み込んでグリッドを組み立てる"""
+    from festival.models import Performance, Stage
+
+    stages = Stage.objects.filter(event_id=event_day.event_id).order_by('order', 'id')
+    performances = Performance.objects.filter(event_day=event_day).select_related('artist', 'stage')
+    return build_timetable_grid(stages, performances)
+
+def render_timetable(event_day, is_staff=False):
+    """タイムテーブル本体のHTMLを返す（キャッシュがあればグリッドを組み立てずに返す）"""
+    cache = _timetable_cache()
+    key = timetable_cache_key(event_day.pk, 'staff' if is_staff else 'public')
+    html = cache.get(key)
+    if html is None:
+        grid = load_timetable_grid(event_day)
+        html = render_to_string('timetable_grid.html', {'grid': grid, 'is_staff': is_staff})
+        cache.set(key, str(html), _cache_ttl())
+    return mark_safe(html)
+
+def timetable_payload(event_day, grid):
+    """
+    JSON API 用の列指向ペイロード。
+    時刻は origin（タイムテーブル開始時刻）からの分、stage / artist は配列のインデックス
+    （stage が -1 の出演はステージ未定）。
+    """
+    stages = []
+    stage_index = {}
+    for column in grid.columns:
+        if column.stage is not None and column.stage.pk not in stage_index:
+            stage_index[column.stage.pk] = len(stages)
+            stages.append(column.stage)
+
+    artists = []
+    artist_index = {}
+    performances = {'id': [], 'artist': [], 'stage': [], 'lane': [], 'start': [], 'end': []}
+    for entry in sorted(grid.entries, key=lambda e: (e.start_minute, e.column)):
+        perf = entry.performance
+        if perf.artist_id not in artist_index:
+            artist_index[perf.artist_id] = len(artists)
+            artists.append(perf.artist)
+        column = grid.columns[entry.column]
+        performances['id'].append(perf.pk)
+        performances['artist'].append(artist_index[perf.artist_id])
+        performances['stage'].append(stage_index[column.stage.pk] if column.stage is not None else -1)
+        performances['lane'].append(column.lane)
+        performances['start'].append(entry.start_minute)
+        performances['end'].append(entry.end_minute)
+
+    return {
+        'event_day': {'id': event_day.pk, 'date': event_day.date, 'venue': event_day.venue},
+        'origin': grid.origin.strftime('%H:%M') if grid.origin else None,
+        'stages': {
+            'id': [stage.pk for stage in stages],
+            'name': [stage.name for stage in stages],
+            'color': [stage.color_code for stage in stages],
+        },
+        'artists': {
+            'id': [artist.pk for artist in artists],
+            'name': [artist.name for artist in artists],
+        },
+        'performances': performances,
+    }
+
+def timetable_json(event_day_id):
+    """
+    JSON API のレスポンス本体を (etag, body, gzip 済み body) で返す。
+    キャッシュ済みならDBにもアクセスしない。EventDay が無ければ Http404。
+    """
+    from festival.models import EventDay
+
+    cache = _timetable_cache()
+    key = timetable_cache_key(event_day_id, 'json')
+    cached = cache.get(key)
+    if cached is None:
+        event_day = get_object_or_404(EventDay, pk=event_day_id)
+        payload = timetable_payload(event_day, load_timetable_grid(event_day))
+        body = json.dumps(payload, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+        cached = (etag, body, gzip.compress(body))
+        cache.set(key, cached, _cache_ttl())
+    return cached
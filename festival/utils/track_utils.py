@@ -0,0 +1,97 @@
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from festival.models import TopTrackCache
+from festival.utils.spotify_utils import get_top_tracks_many
+
+def _ttl():
+    return timedelta(seconds=getattr(settings, 'SPOTIFY_TOP_TRACKS_TTL', 60 * 60 * 24))
+
+def _stale_ttl():
+    return timedelta(seconds=getattr(settings, 'SPOTIFY_TOP_TRACKS_STALE_TTL', 60 * 60 * 24 * 7))
+
+def store_top_tracks(results, market='JP'):
+    """get_top_tracks_many の結果のうち成功分をキャッシュへ一括保存（upsert）"""
+    now = timezone.now()
+    rows = [
+        TopTrackCache(spotify_id=r['spotify_id'], market=market, tracks=r['tracks'], fetched_at=now)
+        for r in results if not r['error']
+    ]
+    if rows:
+        TopTrackCache.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['spotify_id', 'market'],
+            update_fields=['tracks', 'fetched_at'],
+        )
+
+def refresh_top_tracks(spotify_ids, market='JP'):
+    """Spotifyから取り直してキャッシュを更新する"""
+    results = get_top_tracks_many(spotify_ids, market)
+    store_top_tracks(results, market)
+    return results
+
+# バックグラウンド更新中のキー（同じアーティストを重複して取りに行かない）
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+def _revalidate_in_background(spotify_ids, market):
+    """期限切れ（stale）エントリを別スレッドで更新する"""
+    with _revalidating_lock:
+        keys = [(spotify_id, market) for spotify_id in spotify_ids if (spotify_id, market) not in _revalidating]
+        _revalidating.update(keys)
+    if not keys:
+        return
+
+    def run():
+        try:
+            refresh_top_tracks([spotify_id for spotify_id, _ in keys], market)
+        finally:
+            with _revalidating_lock:
+                _revalidating.difference_update(keys)
+            close_old_connections()
+
+    threading.Thread(target=run, daemon=True).start()
+
+def get_cached_top_tracks_many(spotify_ids, market='JP'):
+    """
+    トップトラックをキャッシュ優先で取得する（戻り値は get_top_tracks_many と同じ形式・入力順）。
+    - TTL 内: キャッシュをそのまま返す
+    - TTL 超過だが stale 期間内: キャッシュを返しつつバックグラウンドで更新
+    - 未取得・stale 期間も超過: Spotifyからまとめて並行取得して保存
+    キャッシュの読み込みはクエリ1回。
+    """
+    spotify_ids = list(spotify_ids)
+    now = timezone.now()
+    fresh_limit = now - _ttl()
+    stale_limit = fresh_limit - _stale_ttl()
+
+    cached = {
+        entry.spotify_id: entry
+        for entry in TopTrackCache.objects.filter(market=market, spotify_id__in=set(spotify_ids))
+    }
+
+    results = {}
+    stale_ids = []
+    missing_ids = []
+    for spotify_id in dict.fromkeys(spotify_ids):
+        entry = cached.get(spotify_id)
+        if entry and entry.fetched_at >= stale_limit:
+            results[spotify_id] = {'spotify_id': spotify_id, 'tracks': entry.tracks, 'error': None}
+            if entry.fetched_at < fresh_limit:
+                stale_ids.append(spotify_id)
+        else:
+            missing_ids.append(spotify_id)
+
+    if missing_ids:
+        for result in refresh_top_tracks(missing_ids, market):
+            results[result['spotify_id']] = result
+
+    if stale_ids:
+        _revalidate_in_background(stale_ids, market)
+
+    return [results[spotify_id] for spotify_id in spotify_ids]
@@ -1,48 +1,121 @@
 from datetime import date
+from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.contrib.admin.views.decorators import staff_member_required
+from django.db import transaction
 from django.utils.timezone import localdate
 
 from ..models import Artist, Performance, EventDay
 from ..forms import ArtistForm, ArtistBulkEditForm, BulkArtistForm
-from ..utils.spotify_utils import save_artist_from_spotify
-from ..utils.text_utils import get_initial_group
-from ..utils.artist_utils import update_missing_artist_images
+from ..utils.artist_utils import parse_artist_names
+from ..utils.job_utils import enqueue_job
+from ..utils.pagination_utils import keyset_paginate, parse_page_size
+from ..utils.search_utils import SEARCH_ORDERING, search_artists
+from ..utils.timetable_utils import invalidate_timetable_cache
 
-def artist_list(request):
-    """アーティスト一覧ページ（検索・頭文字絞り込み付き）"""
+# 一覧の並び順（キーセットページネーションのキー。末尾の id で一意になる）
+ARTIST_LIST_ORDERING = ('furigana', 'id')
+
+def _artist_list_page(request, all_artists):
+    """q・initial・cursor・size を解釈して一覧の1ページを返す（cursor が不正なら ValueError）"""
     query = request.GET.get('q')
     initial = request.GET.get('initial')
-
-    # 全アーティスト（ふりがなあり）
-    all_artists = Artist.objects.exclude(furigana__isnull=True).exclude(furigana__exact='')
-
     artists = all_artists
 
-    # 検索フィルタ
+    # 頭文字フィルタ（保存済みの initial_group 列で絞り込み）
+    if initial:
+        artists = artists.filter(initial_group=initial)
+
+    # 検索（名前・ふりがな・ローマ字、関連度順）
     if query:
-        artists = artists.filter(name__icontains=query)
+        artists = search_artists(query, artists)
+        ordering = SEARCH_ORDERING
+    else:
+        ordering = ARTIST_LIST_ORDERING
+
+    return keyset_paginate(
+        artists, ordering,
+        cursor=request.GET.get('cursor'),
+        page_size=parse_page_size(request.GET.get('size')),
+    )
 
-    artists = artists.order_by('furigana')
+def _listed_artists():
+    """一覧の対象（ふりがなあり）"""
+    return Artist.objects.exclude(furigana__isnull=True).exclude(furigana__exact='')
 
-    # 頭文字フィルタ（Python側で最終的に絞り込み）
-    if initial:
-        artists = [a for a in artists if a.initial_group == initial]
+def artist_list(request):
+    """アーティスト一覧ページ（検索・頭文字絞り込み・キーセットページネーション付き）"""
+    query = request.GET.get('q')
+    initial = request.GET.get('initial')
+
+    # 全アーティスト（ふりがなあり）
+    all_artists = _listed_artists()
+
+    try:
+        page = _artist_list_page(request, all_artists)
+    except ValueError:
+        # 古い・壊れたカーソルは先頭ページに戻す
+        return redirect(f"{request.path}?{_without_cursor(request)}")
 
     # 初期グループ一覧生成（全件ベース）
     kana_order = ['あ', 'か', 'さ', 'た', 'な', 'は', 'ま', 'や', 'ら', 'わ']
     alpha_order = [chr(i) for i in range(ord('A'), ord('Z') + 1)]
-    initials = set(a.initial_group for a in all_artists if a.furigana)
+    initials = set(all_artists.order_by().values_list('initial_group', flat=True).distinct())
 
     initials_kana = [i for i in kana_order if i in initials]
     initials_alpha = [i for i in alpha_order if i in initials]
 
+    next_query = None
+    if page.has_next:
+        params = request.GET.copy()
+        params['cursor'] = page.next_cursor
+        next_query = params.urlencode()
+
     return render(request, 'artist_list.html', {
-        'artists': artists,
+        'artists': page.items,
         'query': query,
         'initial': initial,
         'initials_kana': initials_kana,
         'initials_alpha': initials_alpha,
+        'next_query': next_query,
+        'first_query': _without_cursor(request),
+        'is_first_page': not request.GET.get('cursor'),
+    })
+
+def _without_cursor(request):
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    return params.urlencode()
+
+def artist_list_json(request):
+    """アーティスト一覧のJSON版（フロントエンドから next_cursor を辿ってページ単位で読み込む）"""
+    try:
+        page = _artist_list_page(request, _listed_artists())
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    next_url = None
+    if page.has_next:
+        params = request.GET.copy()
+        params['cursor'] = page.next_cursor
+        next_url = f"{request.path}?{params.urlencode()}"
+
+    return JsonResponse({
+        'results': [
+            {
+                'id': artist.pk,
+                'name': artist.name,
+                'furigana': artist.furigana,
+                'initial_group': artist.initial_group,
+                'genres': artist.genres,
+                'image_url': artist.image_url,
+                'url': reverse('festival:artist_detail', args=[artist.pk]),
+            }
+            for artist in page.items
+        ],
+        'next_cursor': page.next_cursor,
+        'next': next_url,
     })
 
 def artist_detail(request, pk):
@@ -71,17 +144,27 @@ def artist_detail(request, pk):
 @staff_member_required
 def edit_artist_bulk(request):
     """アーティスト一括編集ビュー"""
-    artists = list(Artist.objects.all())
-    artists.sort(key=lambda a: a.initial_group)
+    artists = list(Artist.objects.order_by('initial_group', 'furigana'))
 
     form = ArtistBulkEditForm(request.POST or None, artists=artists)
     if request.method == 'POST' and form.is_valid():
         updated = []
+        renamed_ids = []
         for artist in artists:
+            old_name = artist.name
             artist.name = form.cleaned_data.get(f'name_{artist.id}', artist.name)
             artist.furigana = form.cleaned_data.get(f'furigana_{artist.id}', artist.furigana)
             updated.append(artist)
-        Artist.objects.bulk_update(updated, ['name', 'furigana'])
+            if artist.name != old_name:
+                renamed_ids.append(artist.id)
+        with transaction.atomic():
+            Artist.objects.bulk_update(updated, ['name', 'furigana'])
+            if renamed_ids:
+                # bulk_update はシグナルが飛ばないので、出演している日のタイムテーブルのキャッシュはここで破棄する
+                event_day_ids = list(
+                    Performance.objects.filter(artist_id__in=renamed_ids).values_list('event_day_id', flat=True)
+                )
+                transaction.on_commit(lambda: invalidate_timetable_cache(event_day_ids))
         return redirect('festival:artist_list')
 
     return render(request, 'artist_bulk_edit.html', {
@@ -92,22 +175,13 @@ def edit_artist_bulk(request):
 
 @staff_member_required
 def bulk_artist_register(request):
-    """Spotify APIを使ったアーティスト一括登録ビュー"""
+    """Spotify APIを使ったアーティスト一括登録ビュー（バックグラウンドジョブとして実行）"""
     message = ''
     form = BulkArtistForm(request.POST or None)
     if request.method == 'POST' and form.is_valid():
-        raw_names = form.cleaned_data['names']
-        name_list = [name.strip() for line in raw_names.splitlines() for name in line.split(',') if name.strip()]
-        created = 0
-        skipped = 0
-        for name in name_list:
-            if Artist.objects.filter(name__iexact=name).exists():
-                skipped += 1
-                continue
-            result = save_artist_from_spotify(name)
-            if result:
-                created += 1
-        message = f"{created} 件登録、{skipped} 件スキップしました。"
+        name_list = parse_artist_names(form.cleaned_data['names'])
+        job = enqueue_job('bulk_artist_register', names=name_list)
+        return redirect('festival:job_detail', job_id=job.pk)
 
     return render(request, 'bulk_artist_register.html', {
         'form': form,
@@ -131,6 +205,6 @@ def edit_artist(request, artist_id):
 
 @staff_member_required
 def update_artist_images_view(request):
-    """Spotifyから画像を取得して空のアーティストに登録"""
-    update_missing_artist_images()
-    return redirect('festival:artist_list')
+    """Spotifyから画像を取得して空のアーティストに登録（バックグラウンドジョブとして実行）"""
+    job = enqueue_job('update_artist_images')
+    return redirect('festival:job_detail', job_id=job.pk)
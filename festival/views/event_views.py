@@ -1,5 +1,6 @@
 from datetime import date
 from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Exists, OuterRef, Prefetch
 from django.shortcuts import render, get_object_or_404, redirect
 from ..models import Event, EventDay, Performance
 from ..forms import EventForm
@@ -41,14 +42,19 @@ def other_event_list(request):
 def event_detail(request, pk):
     """イベント詳細ページ"""
     event = get_object_or_404(Event, pk=pk)
-    event_days = event.eventday_set.all().order_by('date')
+    # 日程数に関係なくクエリ3回（イベント・日程・出演者）で取得する
+    event_days = event.eventday_set.order_by('date').annotate(
+        # start_time と end_time が両方設定されているパフォーマンスがあるか
+        has_timetable=Exists(Performance.objects.filter(
+            event_day=OuterRef('pk'), start_time__isnull=False, end_time__isnull=False,
+        )),
+    ).prefetch_related(Prefetch(
+        'performance_set',
+        queryset=Performance.objects.select_related('artist').order_by('artist__name'),
+        to_attr='ordered_performances',
+    ))
 
-    day_performances = []
-    for day in event_days:
-        performances = day.performance_set.select_related('artist').order_by('artist__name')
-        # start_time と end_time が両方設定されているパフォーマンスがあるかをチェック
-        has_timetable = performances.filter(start_time__isnull=False, end_time__isnull=False).exists()
-        day_performances.append((day, performances, has_timetable))
+    day_performances = [(day, day.ordered_performances, day.has_timetable) for day in event_days]
 
     return render(request, 'event_detail.html', {
         'event': event,
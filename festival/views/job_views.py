@@ -0,0 +1,40 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.shortcuts import render, get_object_or_404
+
+from ..models import BackgroundJob
+from ..utils.job_utils import job_status
+from ..utils.artist_utils import summarize_register_report
+
+JOB_LABELS = {
+    'update_artist_images': 'アーティスト画像登録',
+    'bulk_artist_register': 'アーティスト一括登録',
+}
+
+@staff_member_required
+def job_detail(request, job_id):
+    """バックグラウンドジョブの進捗ページ（実行中は自動更新）"""
+    job = get_object_or_404(BackgroundJob, pk=job_id)
+
+    report = []
+    message = ''
+    if job.status == 'DONE' and job.result:
+        if job.kind == 'bulk_artist_register':
+            report = job.result.get('report', [])
+            message = summarize_register_report(report)
+        elif job.kind == 'update_artist_images':
+            message = f"{job.result.get('updated', 0)} 件の画像を更新しました。"
+
+    return render(request, 'job_detail.html', {
+        'job': job,
+        'label': JOB_LABELS.get(job.kind, job.kind),
+        'percent': int(job.done * 100 / job.total) if job.total else 0,
+        'report': report,
+        'message': message,
+    })
+
+@staff_member_required
+def job_status_view(request, job_id):
+    """バックグラウンドジョブの進捗をJSONで返す（done/total、エラー、ETA）"""
+    job = get_object_or_404(BackgroundJob, pk=job_id)
+    return JsonResponse(job_status(job))
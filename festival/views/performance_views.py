@@ -1,17 +1,23 @@
-from collections import defaultdict
-
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
+from django.http import HttpResponse, HttpResponseNotModified
 from django.shortcuts import render, get_object_or_404, redirect
+from django.utils.cache import patch_vary_headers
 from django.utils.dateparse import parse_time
 from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
 from django.db.models import Q
+from django.views.decorators.http import require_safe
 
 from ..models import Event, EventDay, Performance, Stage, Artist
 from ..forms import EventDayPerformanceForm, ArtistSchedulePasteForm
+from ..utils.lineup_utils import save_performance_times, sync_lineup
+from ..utils.schedule_utils import DUPLICATE, ERROR, import_tour_schedule, summarize_schedule_import
+from ..utils.template_utils import id_map
+from ..utils.timetable_utils import render_timetable, timetable_json
 
 import json
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 @staff_member_required
 def register_event_day_and_performances(request):
@@ -42,16 +48,16 @@ def register_event_day_and_performances(request):
 
         if form.is_valid():
             # EventDay と Performance を登録
-            event_day = EventDay.objects.create(
-                event=form.cleaned_data['event'],
-                date=form.cleaned_data['date'],
-                venue=form.cleaned_data['venue']
-            )
-            for artist in form.cleaned_data['artists']:
-                Performance.objects.create(event_day=event_day, artist=artist)
+            with transaction.atomic():
+                event_day = EventDay.objects.create(
+                    event=form.cleaned_data['event'],
+                    date=form.cleaned_data['date'],
+                    venue=form.cleaned_data['venue']
+                )
+                result = sync_lineup(event_day, form.cleaned_data['artists'])
 
             # 成功メッセージをセッションに保存してリダイレクト（PRG）
-            request.session['message'] = f"{event_day} に {form.cleaned_data['artists'].count()} 組の出演者を登録しました。"
+            request.session['message'] = f"{event_day} に {result['added']} 組の出演者を登録しました。"
             return redirect(f"{request.path}?event_id={selected_event.id}")
 
     else:
@@ -104,13 +110,13 @@ def edit_event_day_performances(request, event_day_id):
         form.fields['date'].choices = [(event_day.date.strftime('%Y-%m-%d'), event_day.date.strftime('%Y-%m-%d'))]
 
         if form.is_valid():
-            # 出演者情報を更新
-            Performance.objects.filter(event_day=event_day).delete()
-            for artist in form.cleaned_data['artists']:
-                Performance.objects.create(event_day=event_day, artist=artist)
+            # 出演者情報を差分更新（残る出演者のステージ・出演時間は保持）
+            result = sync_lineup(event_day, form.cleaned_data['artists'])
 
             # 成功メッセージをセッションに保存してリダイレクト
-            request.session['message'] = f"{event_day} の出演者を更新しました。"
+            request.session['message'] = (
+                f"{event_day} の出演者を更新しました。（追加 {result['added']} 組・削除 {result['removed']} 組）"
+            )
             return redirect('festival:event_detail', pk=event.id)
 
     else:
@@ -148,51 +154,21 @@ def edit_event_day_performances(request, event_day_id):
 def paste_schedule_register(request):
     """ツアー日程登録ビュー"""
     message = ''
+    rows = []
     artist_id = request.GET.get('artist_id')
 
     if request.method == 'POST':
         form = ArtistSchedulePasteForm(request.POST)
         if form.is_valid():
             artist = form.cleaned_data['artist']
-            event_name = form.cleaned_data['event_name']
-            raw_text = form.cleaned_data['raw_text']
-
-            # 最初の有効な日付を取得して初期値に使う
-            first_valid_date = None
-            for line in raw_text.splitlines():
-                parts = line.strip().split(maxsplit=1)
-                if len(parts) == 2:
-                    try:
-                        first_valid_date = datetime.strptime(parts[0], '%Y-%m-%d').date()
-                        break
-                    except Exception:
-                        continue
-
-            event, _ = Event.objects.get_or_create(
-                name=event_name,
-                defaults={
-                    'start_date': first_valid_date or date.today(),
-                    'end_date': first_valid_date or date.today(),
-                    'event_type': 'FES'
-                }
-            )
-
-            count = 0
-            for line in raw_text.splitlines():
-                parts = line.strip().split(maxsplit=1)
-                if len(parts) != 2:
-                    continue
-                date_str, venue = parts
-                try:
-                    date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                    event_day = EventDay.objects.create(event=event, date=date, venue=venue)
-                    Performance.objects.create(event_day=event_day, artist=artist)
-                    count += 1
-                except Exception:
-                    continue  # 無効な行はスキップ
-
-            message = f"{count} 件の出演日程を登録しました。"
-            return redirect('festival:artist_detail', pk=form.cleaned_data['artist'].id)
+            result = import_tour_schedule(artist, form.cleaned_data['event_name'], form.cleaned_data['raw_text'])
+            message = summarize_schedule_import(result)
+            rows = result['rows']
+
+            # 全行を取り込めたらアーティスト詳細へ、読み取れない行があれば行ごとの結果を表示する
+            if not any(row['status'] in (ERROR, DUPLICATE) or row['message'] for row in rows):
+                messages.success(request, message)
+                return redirect('festival:artist_detail', pk=artist.id)
     else:
         initial = {}
         if artist_id:
@@ -202,6 +178,7 @@ def paste_schedule_register(request):
     return render(request, 'paste_schedule_register.html', {
         'form': form,
         'message': message,
+        'rows': rows,
     })
 
 def get_event_schedule_json(request):
@@ -224,12 +201,11 @@ def get_event_schedule_json(request):
             venue = form.cleaned_data['venue']
             artists = form.cleaned_data['artists']
 
-            event_day = EventDay.objects.create(event=event, date=date, venue=venue)
+            with transaction.atomic():
+                event_day = EventDay.objects.create(event=event, date=date, venue=venue)
+                result = sync_lineup(event_day, artists)
 
-            for artist in artists:
-                Performance.objects.create(event_day=event_day, artist=artist)
-
-            message = f"{event_day} に {artists.count()} 組の出演者を登録しました。"
+            message = f"{event_day} に {result['added']} 組の出演者を登録しました。"
             form = EventDayPerformanceForm()  # フォームをリセット
     else:
         # フォーム初期表示（GET）
@@ -258,7 +234,7 @@ def register_timetable(request):
     """タイムテーブル登録"""
     event_day_id = request.GET.get('event_day')
     event_day = get_object_or_404(EventDay, id=event_day_id) if event_day_id else None
-    stages = Stage.objects.filter(event=event_day.event) if event_day else []
+    stages = Stage.objects.filter(event_id=event_day.event_id) if event_day else []
     form_errors = []
     selected_artist_ids = []
     selected_stage_id = None
@@ -275,46 +251,36 @@ def register_timetable(request):
         selected_stage_id = request.POST.get('selected_stage')
         new_stage_name = request.POST.get('new_stage_name')
 
-        # ステージ選択または新規作成
-        if new_stage_name:
-            stage = Stage.objects.create(event=event_day.event, name=new_stage_name)
-        elif selected_stage_id:
-            stage = Stage.objects.filter(id=selected_stage_id).first()
-        else:
-            stage = None
-
-        if 'save_times' in request.POST:
-            for artist_id in selected_artist_ids:
-                start = request.POST.get(f'start_{artist_id}')
-                end = request.POST.get(f'end_{artist_id}')
-
-                # バリデーション
-                if start and end and parse_time(start) >= parse_time(end):
-                    artist = Artist.objects.filter(id=artist_id).first()
-                    form_errors.append(f"{artist.name} の開始時間は終了時間より前である必要があります。")
-                    continue
-
-                # Performance取得または作成
-                perf, _ = Performance.objects.get_or_create(
-                    event_day=event_day,
-                    artist_id=artist_id
-                )
-
-                perf.stage = stage
-                perf.start_time = parse_time(start) if start else None
-                perf.end_time = parse_time(end) if end else None
-                perf.save()
+        if 'save_times' in request.POST and event_day:
+            times = [
+                (artist_id, request.POST.get(f'start_{artist_id}'), request.POST.get(f'end_{artist_id}'))
+                for artist_id in selected_artist_ids if artist_id.isdigit()
+            ]
+            with transaction.atomic():
+                # ステージ選択または新規作成（保存できなかった場合は新規ステージも作らない）
+                if new_stage_name:
+                    stage = Stage.objects.create(event_id=event_day.event_id, name=new_stage_name)
+                elif selected_stage_id:
+                    stage = Stage.objects.filter(id=selected_stage_id).first()
+                else:
+                    stage = None
+
+                form_errors = save_performance_times(event_day, stage, times)
+                if form_errors:
+                    transaction.set_rollback(True)
 
             if not form_errors:
                 messages.success(request, "タイムテーブルを保存しました！")
                 return redirect(request.path + f"?event_day={event_day_id}")
 
+    artists = list(artists)
     context = {
         'event_days': EventDay.objects.order_by('date'),
         'selected_day_id': event_day_id,
         'event_day': event_day,
         'stages': stages,
         'artists': artists,
+        'artists_by_id': id_map(artists),  # 時間入力欄で ID からアーティストを引く
         'selected_artist_ids': selected_artist_ids,
         'selected_stage_id': selected_stage_id,
         'form_errors': form_errors,
@@ -325,50 +291,70 @@ def timetable_view(request):
     """タイムテーブル表示機能"""
     event_day_id = request.GET.get('event_day')
     event_day = None
-    stages = []
-    performances_by_stage_and_time = {}
-    time_slots = []
+    timetable_html = ''
 
     if event_day_id:
         event_day = get_object_or_404(EventDay, id=event_day_id)
-        stages = Stage.objects.filter(event=event_day.event)
-        performances = Performance.objects.filter(event_day=event_day).select_related('artist', 'stage')
-
-        # 出演時間の最小・最大を取得
-        start_times = [p.start_time for p in performances if p.start_time]
-        end_times = [p.end_time for p in performances if p.end_time]
-        if start_times and end_times:
-            min_time = min(start_times)
-            max_time = max(end_times)
-            time_slots = generate_time_slots(min_time, max_time, interval_minutes=5)
-
-            # ステージ×時間スロットのマッピング
-            performances_by_stage_and_time = defaultdict(lambda: defaultdict(list))
-            # スロットごとの出演者表示制御用セット
-            first_slot_map = {}
-            for perf in performances:
-                for slot in time_slots:
-                    if perf.start_time and perf.end_time and perf.start_time <= slot < perf.end_time:
-                        performances_by_stage_and_time[perf.stage.id][slot].append(perf)
-                        # 最初のスロットだけを記録
-                        if perf not in first_slot_map:
-                            if slot == perf.start_time:
-                                first_slot_map[perf] = slot
-    
-    # ステージ並び順
-    stages = Stage.objects.filter(event=event_day.event).order_by('order')
+        # グリッドはキャッシュ済みならそのまま使う（出演・ステージの変更で自動的に作り直す）
+        timetable_html = render_timetable(event_day, is_staff=request.user.is_staff)
 
     context = {
         'event_days': EventDay.objects.order_by('date'),
         'selected_day_id': event_day_id,
         'event_day': event_day,
-        'stages': stages,
-        'time_slots': time_slots,
-        'performances_by_stage_and_time': performances_by_stage_and_time,
-        'first_slot_map': first_slot_map,
+        'timetable_html': timetable_html,
     }
     return render(request, 'timetable_view.html', context)
 
+@require_safe
+def timetable_json_view(request, event_day_id):
+    """
+    タイムテーブルの読み取り専用JSON API（列指向・時刻はタイムテーブル開始からの分）。
+    ETag / If-None-Match に対応し、変更がなければ 304 を返す（キャッシュ済みならDBアクセスなし）。
+    Accept-Encoding が gzip を受け付ける（q=0 でない）場合は圧縮済みの本体を返す。
+    """
+    etag, body, gzipped = timetable_json(event_day_id)
+
+    if _etag_matches(request.headers.get('If-None-Match'), etag):
+        response = HttpResponseNotModified()
+    elif _accepts_gzip(request.headers.get('Accept-Encoding', '')):
+        response = HttpResponse(gzipped, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    patch_vary_headers(response, ('Accept-Encoding',))
+    response['Cache-Control'] = 'no-cache'  # 毎回 If-None-Match で再検証させる
+    return response
+
+def _accepts_gzip(accept_encoding):
+    """Accept-Encoding が gzip（または *）を q>0 で受け付けるか（gzip;q=0 は拒否の意味）"""
+    qualities = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # 弱い比較（W/ の有無は無視する）
+    candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return etag.removeprefix('W/') in candidates
+
 @staff_member_required
 def edit_performance(request, performance_id):
     """タイムテーブル修正ビュー"""
@@ -395,17 +381,3 @@ def edit_performance(request, performance_id):
         'stages': stages,
     }
     return render(request, 'edit_performance.html', context)
-
-def generate_time_slots(start_time, end_time, interval_minutes=10):
-    """出演時間(datetime.time型)から時間スロットを生成"""
-    slots = []
-    # 仮の日付を使ってdatetime型に変換
-    dummy_date = datetime.today().date()
-    current_dt = datetime.combine(dummy_date, start_time)
-    end_dt = datetime.combine(dummy_date, end_time)
-
-    while current_dt < end_dt:
-        slots.append(current_dt.time())  # time型に戻して格納
-        current_dt += timedelta(minutes=interval_minutes)
-
-    return slots
\ No newline at end of file
@@ -8,7 +8,8 @@ from django.utils.http import urlencode
 
 from festival.models import EventDay, Artist
 from festival.forms import PlaylistForm
-from festival.utils.spotify_utils import get_top_tracks, save_playlist_to_spotify
+from festival.utils.spotify_utils import save_playlist_to_spotify, PlaylistPartiallySavedError, PLAYLIST_MAX_TRACKS
+from festival.utils.track_utils import get_cached_top_tracks_many
 
 from spotipy.oauth2 import SpotifyOAuth
 
@@ -35,11 +36,17 @@ def create_playlist_view(request):
             track_count = int(request.POST.get("track_count", 1))
             selected_artists = form.cleaned_data['artists']
             total_tracks = len(selected_artists) * track_count
-            can_save_to_spotify = total_tracks <= 100
-
-            for artist in selected_artists:
-                tracks = get_top_tracks(artist.spotify_id)
-                for track in tracks[:track_count]:
+            can_save_to_spotify = total_tracks <= PLAYLIST_MAX_TRACKS
+
+            # 全アーティストのトップトラックをキャッシュ優先で取得（未取得分は並行取得、順序は選択順のまま）
+            selected_artists = list(selected_artists)
+            results = get_cached_top_tracks_many([artist.spotify_id for artist in selected_artists])
+            failed_artists = []
+            for artist, result in zip(selected_artists, results):
+                if result['error']:
+                    failed_artists.append(artist.name)
+                    continue
+                for track in result['tracks'][:track_count]:
                     playlist.append({
                         'name': track['name'],
                         'artist': artist.name,
@@ -47,6 +54,9 @@ def create_playlist_view(request):
                         'uri': track['uri']
                     })
                     track_uris.append(track['uri'])
+
+            if failed_artists:
+                messages.warning(request, f"⚠️ 次のアーティストの曲を取得できませんでした: {', '.join(failed_artists)}")
     else:
         form = PlaylistForm(artists_queryset=artists_qs)
 
@@ -61,7 +71,8 @@ def create_playlist_view(request):
         'selected_day_id': selected_day_id,
         'playlist_name': playlist_name,
         'selected_track_count': str(track_count),
-        'can_save_to_spotify': can_save_to_spotify
+        'can_save_to_spotify': can_save_to_spotify,
+        'playlist_max_tracks': PLAYLIST_MAX_TRACKS,
     })
 
 def save_playlist_to_spotify_view(request):
@@ -90,11 +101,21 @@ def save_playlist_to_spotify_view(request):
         selected_day_id = request.POST.get("event_day")
 
         if token and track_uris:
-            playlist_url = save_playlist_to_spotify(token, track_uris, playlist_name)
-            if playlist_url:
-                messages.success(request, f"✅ Spotifyに保存しました！<br><a href='{playlist_url}' target='_blank'>プレイリストを開く</a>")
+            try:
+                playlist_url = save_playlist_to_spotify(token, track_uris, playlist_name)
+            except PlaylistPartiallySavedError as e:
+                # プレイリストは作成済みで途中までの曲だけが入っている
+                messages.warning(
+                    request,
+                    f"⚠️ プレイリストは作成しましたが、楽曲の追加が途中で失敗しました"
+                    f"（{e.added_count}曲まで追加済み。失敗した分は入っていない可能性があります）。"
+                    f"<br><a href='{e.playlist_url}' target='_blank'>プレイリストを開く</a>"
+                )
             else:
-                messages.error(request, "❌ Spotifyへの保存に失敗しました")
+                if playlist_url:
+                    messages.success(request, f"✅ Spotifyに保存しました！<br><a href='{playlist_url}' target='_blank'>プレイリストを開く</a>")
+                else:
+                    messages.error(request, "❌ Spotifyへの保存に失敗しました")
         else:
             messages.error(request, "⚠️ Spotify認証が必要です")
             return redirect("festival:spotify_login")